@@ -0,0 +1,222 @@
+# .side_suction/cli.py
+"""Headless extraction without the Qt window (PySide6 is never imported).
+
+    python cli.py owner/repo#main --include "src/*" -o bundle.md
+    python cli.py ~/monorepo --include "packages/*" --dedup
+    python cli.py --selection "C:\\path\\to\\project"
+    python cli.py --selection "C:\\path\\to\\project" --changes
+    python cli.py --batch --filter "*tauri*" --out-dir bundles --jobs 8
+    python cli.py --grep "def main" --filter "*tauri*" --word
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import settings
+from logic.batch_runner import format_summary, load_selections, run_batch, worker_options
+from logic.exporter import WRITE_BUFFER
+from logic.project_grep import grep_items, grep_selections
+from logic.project_manager import ProjectManager
+from logic.project_source import parse_source_spec
+from logic.search_cache import SearchQuery
+from logic.selection_manager import SelectionManager
+from logic.status_manager import report_config
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Extract fenced project content to stdout or a file."
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        help="local folder, owner/repo[#branch] or GitHub API tree URL "
+        "(defaults to the project_path of --selection)",
+    )
+    parser.add_argument(
+        "-s", "--selection", help="saved selection name (key in selections.json)"
+    )
+    parser.add_argument(
+        "-i", "--include", action="append", default=[], help="glob of files to keep"
+    )
+    parser.add_argument(
+        "-e", "--exclude", action="append", default=[], help="glob of files to drop"
+    )
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument(
+        "-m", "--minify", action="store_true", help="minify while writing (per-language)"
+    )
+    parser.add_argument(
+        "--changes",
+        action="store_true",
+        help="only files changed since the previous --changes run of this project "
+        "(unified diffs; the first run emits everything)",
+    )
+    parser.add_argument(
+        "--closure",
+        action="store_true",
+        help="add every project file the selected Python/JS/TS files import, transitively",
+    )
+    parser.add_argument(
+        "--outline",
+        action="store_true",
+        help="signatures and docstrings instead of bodies (Python; others in full)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="emit identical files once, later copies reference the first path",
+    )
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="list files matched by .gitignore/.ignore too (local folders)",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--batch",
+        action="store_true",
+        help="extract every saved selection in parallel worker processes",
+    )
+    batch.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="glob over saved selection names (batch mode)",
+    )
+    batch.add_argument("--out-dir", default="bundles", help="per-project output dir")
+    batch.add_argument("-j", "--jobs", type=int, help="worker processes (default: CPUs)")
+    grep = parser.add_argument_group(
+        "search mode",
+        "print path:line:column: snippet for matching lines instead of extracting; "
+        "without a source or --selection, searches every saved selection (see --filter)",
+    )
+    grep.add_argument("-g", "--grep", metavar="PATTERN", help="text to search for")
+    grep.add_argument("--regex", action="store_true", help="PATTERN is a regular expression")
+    grep.add_argument("--case-sensitive", action="store_true", help="match case")
+    grep.add_argument("--word", action="store_true", help="match whole words only")
+    return parser
+
+
+async def load_selection(name):
+    if not settings.databasePath.exists():
+        return None
+    return await SelectionManager().loadSelection(name)
+
+
+async def resolve_items(manager, source, args):
+    """Файлы для выгрузки: сохранённая выборка (если есть), затем glob-фильтры."""
+    items = manager.filteredFiles
+    use_saved = args.selection or not (args.include or args.exclude)
+    if use_saved:
+        selection = await load_selection(args.selection or str(source))
+        if selection:
+            items = await manager.get_saved_selection_items(selection)
+        elif args.selection:
+            raise LookupError(f"No saved selection named {args.selection!r}")
+    return manager.get_globbed_files(items, args.include, args.exclude)
+
+
+def grep_query(args):
+    return SearchQuery(args.grep, args.regex, args.case_sensitive, args.word)
+
+
+async def run_grep(manager, items, args):
+    found = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        async for hit in grep_items(manager, items, grep_query(args), pool=pool):
+            print(hit.format(with_project=False))
+            found += 1
+    return 0 if found else 1
+
+
+async def run_grep_selections(args):
+    selections = await load_selections(args.filter)
+    if not selections:
+        print("No saved selections match", file=sys.stderr)
+        return 2
+    found = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        hits = grep_selections(selections, grep_query(args), pool, args.include, args.exclude)
+        async for hit in hits:
+            print(hit.format())
+            found += 1
+    return 0 if found else 1
+
+
+async def run(args):
+    spec = args.source
+    if spec is None and args.selection:
+        selection = await load_selection(args.selection)
+        if not selection:
+            print(f"No saved selection named {args.selection!r}", file=sys.stderr)
+            return 2
+        spec = selection.get("project_path")
+    source = parse_source_spec(spec) if spec else None
+    if source is None:
+        print(f"Invalid source: {spec!r}", file=sys.stderr)
+        return 2
+    try:
+        manager = ProjectManager(source)
+        await manager.scan_project()
+        items = await resolve_items(manager, source, args)
+        if args.closure:
+            items = await manager.import_closure([rel for rel, _ in items])
+        if args.grep is not None:
+            return await run_grep(manager, items, args)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+                await manager.write_content(items, out, args.minify, args.changes)
+        else:
+            await manager.write_content(items, sys.stdout, args.minify, args.changes)
+    except LookupError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        await source.close()
+    return 0
+
+
+def run_batch_mode(args):
+    selections = asyncio.run(load_selections(args.filter))
+    if not selections:
+        print("No saved selections match", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    options = worker_options(args.include, args.exclude, args.minify, args.changes, args.closure)
+    summaries = run_batch(selections, args.out_dir, args.jobs, options=options)
+    print(format_summary(summaries, time.perf_counter() - started))
+    return 1 if any(s["failure"] for s in summaries) else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Сообщения об ошибках — в stderr, чтобы не смешивать их с выгрузкой
+    report_config.stream = sys.stderr
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    if args.dedup:
+        settings.dedupFiles = True
+    if args.outline:
+        settings.outlineMode = True
+    if args.no_ignore:
+        settings.respectGitignore = False
+    if args.batch:
+        return run_batch_mode(args)
+    if args.grep is not None:
+        try:
+            SearchQuery(args.grep, args.regex).compile()
+        except re.error as e:
+            print(f"Invalid pattern: {e}", file=sys.stderr)
+            return 2
+        if not (args.source or args.selection):
+            return asyncio.run(run_grep_selections(args))
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
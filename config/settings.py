@@ -18,8 +18,21 @@ class Settings(BaseSettings):
     ]
     defaultFontName: str = "FantasqueSansM Nerd Font Mono"
     databasePath: Path = Path(__file__).parent.parent / "database\\selections.json"
+    # манифесты выгрузок — кэш пользователя, не файлы репозитория
+    manifestsPath: Path = (
+        Path(os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+        / "side_suction"
+        / "manifests"
+    )
     stylesheetPath: Path = Path(__file__).parent / "styles.qss"
     maxFileSize: int = 33554433  # (2 << (3 << 3)) + 1 | (1 << 25) + 1 | 2**25 + 1 |
+    nonTextPolicy: str = "summary"  # binary/generated files: summary | skip | include
+    tokenBudget: int = 0  # approximate LLM tokens per extraction, 0 = unlimited
+    budgetPolicy: str = "stop"  # over budget: stop | truncate | summary
+    outlineMode: bool = False  # вместо тел — сигнатуры и docstring (Python)
+    respectGitignore: bool = True  # .gitignore/.ignore исключают файлы ещё при сканировании
+    dedupFiles: bool = False  # одинаковые по содержимому файлы выводятся один раз
+    pagedThreshold: int = 64 << 20  # выгрузка длиннее (символов) открывается постранично
 
     GITHUB_TOKEN: str = Field(
         ..., description="GitHub Personal Access Token", env="GITHUB_TOKEN"
@@ -0,0 +1,279 @@
+# .side_suction/logic/archive_source.py
+"""Источники из архивов .zip и .tar[.gz|.bz2|.xz] без распаковки на диск.
+
+Таблица членов архива читается один раз при list_files; размеры известны
+заранее, поэтому max_size проверяется до чтения. zip и несжатый tar читаются
+произвольным доступом — распаковываются только выбранные файлы. У сжатого
+tar произвольного доступа нет: чтение — прямой проход по потоку, члены вне
+выборки пропускаются без копирования, результаты отдаются в порядке запроса.
+Прочитанные раньше своей очереди держатся в памяти до READY_BYTES, не
+поместившиеся читаются следующим проходом. zipfile и tarfile импортируются при первом
+открытии архива.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+from logic.project_source import FileTooLarge, IProjectSource, decode_text
+
+ZIP_SUFFIXES = (".zip", ".jar", ".whl")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+PLAIN_TAR_SUFFIXES = (".tar",)
+
+
+def member_path(name: str) -> Optional[Path]:
+    """Путь члена архива относительно корня; абсолютные и с ".." не показываются."""
+    parts = PurePosixPath(name.replace("\\", "/")).parts
+    parts = [part for part in parts if part not in ("/", ".")]
+    if not parts or ".." in parts:
+        return None
+    return Path(*parts)
+
+
+def open_archive_source(path: str) -> Optional["ArchiveSource"]:
+    name = path.lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return ZipSource(path)
+    if name.endswith(TAR_SUFFIXES):
+        return TarSource(path)
+    return None
+
+
+class ArchiveSource(IProjectSource):
+    """Общее для архивов: индекс членов, пакетное чтение в потоке, идентичности."""
+
+    BATCH_FILES = 64  # файлов на один переход в пул потоков
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.members: Dict[Path, Tuple[object, int]] = {}  # путь -> (ключ члена, размер)
+        self.archive = None
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    async def list_files(self) -> List[Path]:
+        self.members = await asyncio.to_thread(self._index)
+        return list(self.members)
+
+    def _index(self) -> Dict[Path, Tuple[object, int]]:
+        raise NotImplementedError
+
+    def _read_member(self, key) -> bytes:
+        raise NotImplementedError
+
+    def _member(self, rel_path, max_size=None):
+        found = self.members.get(Path(rel_path))
+        if found is None:
+            raise FileNotFoundError(f"{rel_path} not in {self}")
+        key, size = found
+        if max_size is not None and size > max_size:
+            raise FileTooLarge(f"{size} bytes")
+        return key, size
+
+    def _read_one(self, rel_path):
+        key, _ = self._member(rel_path)
+        return decode_text(self._read_member(key))
+
+    async def read_file(self, rel_path: Path) -> str:
+        return await asyncio.to_thread(self._read_one, rel_path)
+
+    def _read_batch(self, batch, max_size):
+        results = []
+        for rel_path in batch:
+            try:
+                key, size = self._member(rel_path, max_size)
+                results.append((rel_path, decode_text(self._read_member(key)), size))
+            except Exception as e:
+                results.append((rel_path, e, None))
+        return results
+
+    async def read_files(self, rel_paths, max_size=None):
+        rel_paths = list(rel_paths)
+        for i in range(0, len(rel_paths), self.BATCH_FILES):
+            batch = rel_paths[i : i + self.BATCH_FILES]
+            for result in await asyncio.to_thread(self._read_batch, batch, max_size):
+                yield result
+
+    async def file_identities(self, rel_paths):
+        # архив неизменен, пока не сменились его размер и mtime
+        try:
+            st = await asyncio.to_thread(self.path.stat)
+            archive = (str(self.path), st.st_size, st.st_mtime_ns)
+        except OSError:
+            archive = (str(self.path), None, None)
+        identities = {}
+        for rel_path in rel_paths:
+            found = self.members.get(Path(rel_path))
+            size = found[1] if found else None
+            identities[rel_path] = ((*archive, Path(rel_path).as_posix()), size)
+        return identities
+
+    async def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+
+class ZipSource(ArchiveSource):
+    """zip: центральный каталог даёт смещения, член распаковывается потоком при чтении."""
+
+    def _index(self):
+        import zipfile
+
+        self.archive = zipfile.ZipFile(self.path)
+        members = {}
+        for info in self.archive.infolist():
+            rel = None if info.is_dir() else member_path(info.filename)
+            if rel is not None:
+                members[rel] = (info, info.file_size)
+        return members
+
+    def _read_member(self, info) -> bytes:
+        with self.archive.open(info) as f:
+            return f.read()
+
+
+class TarSource(ArchiveSource):
+    """tar: несжатый — произвольный доступ, сжатый — прямые проходы по потоку."""
+
+    READY_BYTES = 32 << 20  # сжатый tar: тела, прочитанные раньше своей очереди
+    QUEUE_MEMBERS = 8  # членов между потоком распаковки и читателем
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.seekable = str(path).lower().endswith(PLAIN_TAR_SUFFIXES)
+        # у TarFile одна позиция в файле на все потоки: чтения членов идут по очереди
+        self.lock = threading.Lock()
+
+    def _index(self):
+        import tarfile
+
+        if self.seekable:
+            self.archive = tarfile.open(self.path, "r:")
+            infos = self.archive.getmembers()
+        else:
+            # потоковый режим: заголовки читаются без обратных перемоток gzip
+            with tarfile.open(self.path, "r|*") as tar:
+                infos = list(tar)
+        members = {}
+        for info in infos:
+            rel = member_path(info.name) if info.isfile() else None
+            if rel is not None:
+                members[rel] = (info.name, info.size)
+        return members
+
+    def _read_member(self, name) -> bytes:
+        if self.seekable:
+            with self.lock, self.archive.extractfile(name) as f:
+                return f.read()
+        # одиночное чтение сжатого архива — проход до нужного члена
+        for _, data in self._stream({name}, None):
+            return data
+        raise FileNotFoundError(name)
+
+    def _stream(self, wanted, max_size, stop=None):
+        """(имя, байты или исключение) для членов из wanted в порядке архива."""
+        import tarfile
+
+        with tarfile.open(self.path, "r|*") as tar:
+            for info in tar:
+                if stop is not None and stop.is_set():
+                    return
+                if info.name not in wanted or not info.isfile():
+                    continue
+                if max_size is not None and info.size > max_size:
+                    yield info.name, FileTooLarge(f"{info.size} bytes")
+                else:
+                    yield info.name, tar.extractfile(info).read()
+                wanted.discard(info.name)
+                if not wanted:
+                    return
+
+    async def read_files(self, rel_paths, max_size=None):
+        if self.seekable:
+            async for result in super().read_files(rel_paths, max_size):
+                yield result
+            return
+        # порядок запроса и порядок в архиве различаются: прочитанные раньше своей
+        # очереди ждут в ready, но не больше READY_BYTES — остальные берутся следующим проходом
+        order, names = list(rel_paths), {}
+        for rel_path in order:
+            found = self.members.get(Path(rel_path))
+            if found is not None:
+                names[found[0]] = rel_path
+        wanted = set(names)  # члены, которые ещё предстоит прочитать
+        deferred = set()  # прочитаны в этом проходе, но не поместились в ready
+        ready, held = {}, 0
+        stream = None
+        try:
+            for rel_path in order:
+                found = self.members.get(Path(rel_path))
+                name = found[0] if found else None
+                while rel_path not in ready and name in wanted:
+                    if stream is None:
+                        stream = self._pass(set(wanted), max_size)
+                    try:
+                        got, data = await stream.__anext__()
+                    except StopAsyncIteration:
+                        # не встретившиеся в проходе члены исчезли из архива
+                        stream, wanted, deferred = None, wanted & deferred, set()
+                        continue
+                    if got is None:
+                        # архив повреждён: оставшимся — та же ошибка
+                        for rest in wanted:
+                            ready.setdefault(names[rest], (names[rest], data, None))
+                        wanted.clear()
+                    elif isinstance(data, Exception):
+                        ready[names[got]] = (names[got], data, None)
+                        wanted.discard(got)
+                    elif got == name or held + len(data) <= self.READY_BYTES:
+                        ready[names[got]] = (names[got], decode_text(data), len(data))
+                        held += len(data)
+                        wanted.discard(got)
+                    else:
+                        deferred.add(got)
+                missing = FileNotFoundError(f"{rel_path} not in {self}")
+                result = ready.pop(rel_path, None) or (rel_path, missing, None)
+                held -= result[2] or 0
+                yield result
+        finally:
+            if stream is not None:
+                await stream.aclose()
+
+    async def _pass(self, wanted, max_size):
+        """Один проход по сжатому архиву в потоке; очередь ограничена — поток ждёт чтения."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_MEMBERS)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while not stop.is_set():
+                try:
+                    return future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError:
+                    continue
+            future.cancel()
+
+        def produce():
+            try:
+                for name, data in self._stream(wanted, max_size, stop):
+                    put((name, data))
+            except Exception as e:
+                put((None, e))
+            finally:
+                put((done, None))
+
+        task = loop.run_in_executor(None, produce)
+        try:
+            while (item := await queue.get())[0] is not done:
+                yield item
+        finally:
+            # прерванное чтение останавливает проход по архиву
+            stop.set()
+            await task
@@ -0,0 +1,136 @@
+# .side_suction/logic/batch_runner.py
+
+import asyncio
+import hashlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatch
+from pathlib import Path, PureWindowsPath
+
+from config.settings import settings
+from logic.project_manager import ProjectManager
+from logic.project_source import parse_source_spec
+from logic.selection_manager import SelectionManager
+from logic.status_manager import report_config
+
+
+# Настройки, которые CLI меняет флагами: процессы пула (spawn под Windows) их не наследуют
+WORKER_SETTINGS = ("dedupFiles", "outlineMode", "respectGitignore")
+
+
+def worker_options(include=(), exclude=(), minify=False, changes=False, closure=False) -> dict:
+    """Параметры выгрузки для процессов пула вместе со снимком WORKER_SETTINGS."""
+    return {
+        "settings": {name: getattr(settings, name) for name in WORKER_SETTINGS},
+        "include": list(include),
+        "exclude": list(exclude),
+        "minify": minify,
+        "changes": changes,
+        "closure": closure,
+    }
+
+
+def output_name(name: str) -> str:
+    """Имя файла выгрузки: последний компонент пути проекта + короткий хеш ключа."""
+    stem = PureWindowsPath(name).name or "project"
+    stem = re.sub(r"[^\w.\-]+", "_", stem).strip("_") or "project"
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}-{digest}.md"
+
+
+def filter_selections(selections: dict, patterns=()) -> dict:
+    """Оставляет выборки, имя которых подходит хотя бы под один glob (регистр не важен)."""
+    if not patterns:
+        return dict(selections)
+    return {
+        name: selection
+        for name, selection in selections.items()
+        if any(fnmatch(name.lower(), p.lower()) for p in patterns)
+    }
+
+
+async def _extract(name, selection, output, options):
+    spec = selection.get("project_path") or name
+    source = parse_source_spec(spec)
+    if source is None:
+        raise ValueError(f"Invalid source: {spec!r}")
+    try:
+        manager = ProjectManager(source)
+        await manager.scan_project()
+        items = await manager.get_saved_selection_items(selection)
+        items = manager.get_globbed_files(
+            items, options.get("include", ()), options.get("exclude", ())
+        )
+        if options.get("closure"):
+            items = await manager.import_closure([rel for rel, _ in items])
+        with open(output, "w", encoding="utf-8") as out:
+            await manager.write_content(
+                items, out, options.get("minify", False), options.get("changes", False)
+            )
+        return manager.extractStats
+    finally:
+        await source.close()
+
+
+def extract_selection(name: str, selection: dict, out_dir: str, options=None) -> dict:
+    """Выгрузка одной выборки; выполняется в отдельном процессе со своим ProjectManager."""
+    report_config.stream = sys.stderr
+    options = options or {}
+    for key, value in options.get("settings", {}).items():
+        setattr(settings, key, value)
+    output = Path(out_dir) / output_name(name)
+    started = time.perf_counter()
+    summary = {"name": name, "output": str(output), "files": 0, "bytes": 0}
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        stats = asyncio.run(_extract(name, selection, output, options))
+        summary.update(stats)
+        summary["failure"] = None
+    except Exception as e:
+        summary["errors"] = summary.get("errors", 0) + 1
+        summary["failure"] = f"{e.__class__.__name__}: {e}"
+    summary.setdefault("errors", 0)
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+async def load_selections(patterns=()):
+    return filter_selections(await SelectionManager().loadSelections(), patterns)
+
+
+def run_batch(selections: dict, out_dir, jobs=None, on_done=None, options=None):
+    """Выгружает выборки параллельно в пуле процессов; возвращает сводки в порядке завершения."""
+    options = options or worker_options()
+    jobs = jobs or os.cpu_count() or 1
+    summaries = []
+    with ProcessPoolExecutor(max_workers=min(jobs, max(1, len(selections)))) as pool:
+        futures = [
+            pool.submit(extract_selection, name, selection, str(out_dir), options)
+            for name, selection in selections.items()
+        ]
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            if on_done:
+                on_done(summary)
+    return summaries
+
+
+def format_summary(summaries, wall_seconds):
+    lines = [f"{'files':>6} {'bytes':>12} {'errors':>6} {'time, s':>8}  project"]
+    for s in sorted(summaries, key=lambda s: s["name"]):
+        line = f"{s['files']:>6} {s['bytes']:>12} {s['errors']:>6} {s['seconds']:>8.2f}  {s['name']}"
+        if s["failure"]:
+            line += f"  ({s['failure']})"
+        lines.append(line)
+    total_files = sum(s["files"] for s in summaries)
+    total_bytes = sum(s["bytes"] for s in summaries)
+    total_errors = sum(s["errors"] for s in summaries)
+    lines.append(
+        f"{total_files:>6} {total_bytes:>12} {total_errors:>6} {wall_seconds:>8.2f}  "
+        f"total ({len(summaries)} projects, wall time)"
+    )
+    return "\n".join(lines)
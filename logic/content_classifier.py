@@ -0,0 +1,72 @@
+# .side_suction/logic/content_classifier.py
+
+from fnmatch import fnmatch
+from pathlib import PurePath
+from typing import Optional, Tuple
+
+SNIFF_BYTES = 8192
+
+TEXT = "text"
+BINARY = "binary"
+GENERATED = "generated"
+
+BINARY_EXTENSIONS = set(
+    ".png .jpg .jpeg .gif .bmp .ico .webp .tiff .psd .pdf .zip .gz .tgz .bz2 .xz "
+    ".7z .rar .zst .so .dll .dylib .exe .bin .o .a .lib .obj .rlib .rmeta .pdb "
+    ".class .jar .wasm .pyc .pyd .woff .woff2 .ttf .otf .eot .mp3 .mp4 .wav .ogg "
+    ".sqlite .db".split()
+)
+
+GENERATED_PATTERNS = (
+    "package-lock.json yarn.lock pnpm-lock.yaml npm-shrinkwrap.json Cargo.lock "
+    "poetry.lock Pipfile.lock uv.lock composer.lock Gemfile.lock go.sum *.min.js "
+    "*.min.css *.map *.pb.go *_pb2.py *_pb2_grpc.py *.designer.cs *.g.dart".split()
+)
+
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"Code generated by")
+
+# Управляющие байты, которых не бывает в тексте (табуляции и переводы строк допустимы)
+_CONTROL = bytes(set(range(32)) - {8, 9, 10, 12, 13, 27}) + b"\x7f"
+MAX_CONTROL_RATIO = 0.1
+MAX_LINE_LENGTH = 2000  # строка длиннее — скорее всего минифицированный бандл
+
+
+def classify_name(rel_path) -> Optional[Tuple[str, str]]:
+    """Классификация только по имени: (вид, причина) или None, если нужно смотреть содержимое."""
+    path = PurePath(rel_path)
+    if path.suffix.lower() in BINARY_EXTENSIONS:
+        return BINARY, f"{path.suffix.lower()} file"
+    for pattern in GENERATED_PATTERNS:
+        if fnmatch(path.name, pattern):
+            return GENERATED, f"matches {pattern}"
+    return None
+
+
+def classify_sample(sample: bytes) -> Tuple[str, str]:
+    """Классификация по первым байтам файла: NUL, управляющие символы, длина строк, маркеры."""
+    if not sample:
+        return TEXT, ""
+    if b"\x00" in sample:
+        return BINARY, "NUL bytes"
+    control = len(sample) - len(sample.translate(None, _CONTROL))
+    if control / len(sample) > MAX_CONTROL_RATIO:
+        return BINARY, "control characters"
+    head = sample[:1024]
+    for marker in GENERATED_MARKERS:
+        if marker in head:
+            return GENERATED, f"{marker.decode()} marker"
+    longest = max(len(line) for line in sample.split(b"\n"))
+    if longest >= MAX_LINE_LENGTH:
+        return GENERATED, f"line of {longest}+ bytes"
+    return TEXT, ""
+
+
+def summarize(kind: str, reason: str, size: Optional[int]) -> str:
+    """Заглушка вместо тела файла, который не читается целиком."""
+    size_text = f", {size} bytes" if size is not None else ""
+    return f"[{kind} file skipped: {reason}{size_text}]"
+
+
+def summarize_duplicate(original) -> str:
+    """Заглушка вместо тела, побайтно совпадающего с уже выведенным файлом."""
+    return f"[duplicate of {original}]"
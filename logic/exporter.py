@@ -0,0 +1,56 @@
+# .side_suction/logic/exporter.py
+"""Выгрузка из кусков "```path ... ```", а не из QTextDocument.
+
+Источник истины — тела файлов, собранные ProjectManager при извлечении
+(и их минифицированные варианты). Документ редактора только отображает их,
+поэтому копирование и сохранение не сериализуют его через toPlainText.
+"""
+
+from typing import Iterable, Iterator, Tuple
+
+from logic.minifier import StreamingMinifier
+
+WRITE_BUFFER = 1 << 20
+
+
+def iter_chunks(files: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Куски выгрузки в том же виде, что даёт ProjectManager.extract_content."""
+    separator = ""
+    for rel, body in files:
+        yield f"{separator}```{rel}\n{body}\n```"
+        separator = "\n"
+
+
+def write_chunks(chunks: Iterable[str], out, minify=False, final_newline=False) -> int:
+    """Пишет куски в текстовый поток по мере поступления; возвращает число символов."""
+    minifier = StreamingMinifier() if minify else None
+    written = 0
+    for chunk in chunks:
+        if minifier:
+            chunk = minifier.feed(chunk)
+        out.write(chunk)
+        written += len(chunk)
+    tail = minifier.close() if minifier else ""
+    if final_newline and (written or tail):
+        tail += "\n"
+    out.write(tail)
+    out.flush()
+    return written + len(tail)
+
+
+def export_to_file(chunks: Iterable[str], path, minify=False) -> int:
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER) as out:
+        return write_chunks(chunks, out, minify, final_newline=True)
+
+
+def export_to_clipboard(chunks: Iterable[str], clipboard, minify=False) -> int:
+    """Буфер обмена принимает только целую строку: она собирается один раз из кусков."""
+    if minify:
+        minifier = StreamingMinifier()
+        text = "".join(minifier.feed(chunk) for chunk in chunks) + minifier.close()
+    else:
+        text = "".join(chunks)
+    clipboard.clear()
+    clipboard.setText(text)
+    return len(text)
+
@@ -0,0 +1,108 @@
+# .side_suction/logic/extraction_manifest.py
+"""Манифест последней выгрузки проекта: путь -> (идентичность, размер, хеш тела).
+
+Лежит в кэше пользователя, в settings.manifestsPath/<проект>/manifest.json;
+тела выведенных файлов хранятся там же в blobs/<хеш>.z (zlib, адресация по
+содержимому, поэтому неизменённый файл второй раз не пишется). По манифесту режим "изменения с
+прошлой выгрузки" читает только файлы с новой идентичностью (размер и mtime
+у LocalSource) и выводит для них unified diff к сохранённому телу.
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path, PureWindowsPath
+from typing import Dict, NamedTuple, Optional
+
+from config.settings import settings
+
+MANIFEST_VERSION = 1
+BLOB_LEVEL = 6  # zlib: выше — заметно медленнее при почти том же размере
+
+
+class ManifestEntry(NamedTuple):
+    identity: list  # идентичность файла из IProjectSource.file_identities (JSON-список)
+    size: Optional[int]
+    hash: str
+
+
+def manifest_dir(project: str) -> Path:
+    """Папка манифеста: последний компонент пути проекта + короткий хеш ключа."""
+    stem = PureWindowsPath(project).name or "project"
+    stem = re.sub(r"[^\w.\-]+", "_", stem).strip("_") or "project"
+    digest = hashlib.sha1(project.encode("utf-8")).hexdigest()[:8]
+    return settings.manifestsPath / f"{stem}-{digest}"
+
+
+def unified_diff(path: str, old: str, new: str) -> str:
+    lines = difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=f"a/{path}",
+        tofile=f"b/{path}",
+    )
+    # строки без "\n" в конце файла дополняются, чтобы diff не склеивал их
+    return "".join(line if line.endswith("\n") else f"{line}\n" for line in lines).rstrip("\n")
+
+
+class ExtractionManifest:
+    """Синхронный: загрузка и запись выполняются в потоке (asyncio.to_thread)."""
+
+    def __init__(self, project: str, root: Optional[Path] = None):
+        self.project = project
+        self.root = root or manifest_dir(project)
+        self.files: Dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def load(cls, project: str, root: Optional[Path] = None) -> "ExtractionManifest":
+        """Манифест проекта; отсутствующий или испорченный — пустой."""
+        manifest = cls(project, root)
+        try:
+            data = json.loads((manifest.root / "manifest.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+        if data.get("version") == MANIFEST_VERSION:
+            manifest.files = {
+                path: ManifestEntry(*entry) for path, entry in data.get("files", {}).items()
+            }
+        return manifest
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "project": self.project,
+            "files": {path: list(entry) for path, entry in self.files.items()},
+        }
+        temp = self.root / "manifest.json.tmp"
+        temp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        temp.replace(self.root / "manifest.json")  # прерванная запись не портит прежний манифест
+        self.prune_blobs()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / f"{digest}.z"
+
+    def read_blob(self, digest: str) -> Optional[str]:
+        try:
+            return zlib.decompress(self.blob_path(digest).read_bytes()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+
+    def write_blob(self, digest: str, text: str) -> None:
+        path = self.blob_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(zlib.compress(text.encode("utf-8"), BLOB_LEVEL))
+
+    def prune_blobs(self) -> None:
+        """Удаляет тела, на которые манифест больше не ссылается."""
+        live = {entry.hash for entry in self.files.values()}
+        blobs = self.root / "blobs"
+        if not blobs.is_dir():
+            return
+        for blob in blobs.glob("*.z"):
+            if blob.stem not in live:
+                blob.unlink(missing_ok=True)
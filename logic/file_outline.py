@@ -0,0 +1,125 @@
+# .side_suction/logic/file_outline.py
+"""Оглавление выгрузки: запись на файл, отсортированная по первой строке.
+
+Строится при извлечении из тел файлов (from_files), а для произвольного текста —
+по строкам-оградам (from_text, правила те же, что у StreamingMinifier). Номера
+строк совпадают с номерами блоков QTextDocument: разделитель — только "\\n".
+Текущий файл строки ищется бинарным поиском, начало файла — по словарю.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from logic.minifier import utf8_len
+
+_FENCE_LINE = re.compile(r"^```[^\n]*", re.MULTILINE)
+
+
+class OutlineEntry(NamedTuple):
+    path: str
+    start: int  # строка "```path"
+    end: int  # строка закрывающей "```" (последняя строка, если ограда не закрыта)
+    size: int  # байт тела в UTF-8
+    lines: int  # строк тела
+
+
+class FileOutline:
+    def __init__(self, entries: Iterable[OutlineEntry] = ()):
+        self.entries: List[OutlineEntry] = list(entries)
+        self.starts = [entry.start for entry in self.entries]
+        self.byStart = {entry.start: i for i, entry in enumerate(self.entries)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[OutlineEntry]:
+        return iter(self.entries)
+
+    @classmethod
+    def from_files(cls, files: Iterable[Tuple[str, str]]) -> "FileOutline":
+        """По (путь, тело) в порядке iter_chunks: "```path", тело, "```", следующий файл."""
+        outline = cls()
+        for path, body in files:
+            outline.append(path, body)
+        return outline
+
+    def append(self, path, body: str) -> OutlineEntry:
+        """Добавляет следующий файл выгрузки (по мере извлечения)."""
+        line = self.entries[-1].end + 1 if self.entries else 0
+        lines = body.count("\n") + 1
+        entry = OutlineEntry(str(path), line, line + lines + 1, utf8_len(body), lines)
+        self.byStart[line] = len(self.entries)
+        self.entries.append(entry)
+        self.starts.append(line)
+        return entry
+
+    @classmethod
+    def from_text(cls, text: str) -> "FileOutline":
+        """По строкам-оградам уже собранного текста (правленого или минифицированного)."""
+        entries = []
+        line, pos = 0, 0
+        opened = None  # (путь, строка, начало тела)
+        for fence in _FENCE_LINE.finditer(text):
+            line += text.count("\n", pos, fence.start())
+            pos = fence.start()
+            fence_line = fence.group()
+            if opened is None:
+                if not fence_line.endswith("```"):
+                    opened = (fence_line.strip("`").strip(), line, fence.end() + 1)
+            else:
+                path, start, body_start = opened
+                body = text[body_start : max(body_start, fence.start() - 1)]
+                entries.append(OutlineEntry(path, start, line, utf8_len(body), line - start - 1))
+                opened = None
+        if opened is not None:
+            path, start, body_start = opened
+            last = line + text.count("\n", pos)
+            body = text[body_start:]
+            entries.append(OutlineEntry(path, start, last, utf8_len(body), last - start))
+        return cls(entries)
+
+    def file_at(self, line: int) -> Optional[OutlineEntry]:
+        """Файл, которому принадлежит строка (включая строки оград), или None."""
+        i = bisect_right(self.starts, line) - 1
+        if i >= 0 and line <= self.entries[i].end:
+            return self.entries[i]
+        return None
+
+    def starting_at(self, line: int) -> Optional[OutlineEntry]:
+        i = self.byStart.get(line)
+        return None if i is None else self.entries[i]
+
+    def fuzzy(self, query: str, limit: int = 200) -> List[OutlineEntry]:
+        """Файлы, путь которых содержит символы запроса по порядку; лучшие — первыми."""
+        if not query:
+            return self.entries[:limit]
+        scored = []
+        for i, entry in enumerate(self.entries):
+            score = fuzzy_score(query, entry.path)
+            if score is not None:
+                scored.append((-score, i))
+        scored.sort()
+        return [self.entries[i] for _, i in scored[:limit]]
+
+
+def fuzzy_score(query: str, path: str) -> Optional[int]:
+    """Очки совпадения подпоследовательностью: подряд идущие символы, начала слов и имя файла."""
+    query, path = query.lower(), path.lower().replace("\\", "/")
+    name_start = path.rfind("/") + 1
+    score, pos, prev = 0, 0, -2
+    for char in query:
+        found = path.find(char, pos)
+        if found < 0:
+            return None
+        if found == prev + 1:
+            score += 5
+        if found == 0 or path[found - 1] in "/_-. ":
+            score += 3
+        if found >= name_start:
+            score += 1
+        prev, pos = found, found + 1
+    name = path[name_start:]
+    if query in name:
+        score += 20 if name.startswith(query) else 10
+    return score * 16 - len(path)
@@ -0,0 +1,509 @@
+# .side_suction/logic/git_source.py
+"""Источник из локального git-репозитория: дерево ревизии читается прямо из .git.
+
+Поддерживаются loose-объекты, pack-файлы с индексом v2 (ofs- и ref-дельты),
+ссылки в refs/ и packed-refs, сокращённые хеши и objects/info/alternates.
+Pack и индекс открываются через mmap; распакованные базы дельт кэшируются,
+поэтому цепочки дельт соседних файлов не разворачиваются заново. Сеть и
+бинарник git не используются.
+"""
+
+import asyncio
+import mmap
+import re
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from logic.project_source import FileTooLarge, IProjectSource, decode_text
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA, REF_DELTA = 6, 7
+CACHE_BYTES = 32 << 20  # распакованных объектов pack-файлов в кэше
+CACHE_OBJECT_BYTES = 1 << 20  # крупнее — не кэшируются
+MAX_REF_DEPTH = 8  # вложенность символических ссылок
+TREE_MODE, GITLINK_MODE, SYMLINK_MODE = b"40000", b"160000", b"120000"
+
+
+class GitError(Exception):
+    """Репозиторий, ссылка или объект не найдены либо повреждены."""
+
+
+def find_git_dir(path) -> Optional[Path]:
+    """Папка объектов репозитория: path/.git, gitdir из файла .git или сам path (bare)."""
+    path = Path(path)
+    dot_git = path / ".git"
+    if dot_git.is_file():
+        # рабочая копия worktree/submodule: ".git" — файл со ссылкой
+        line = dot_git.read_text(encoding="utf-8").strip()
+        if line.startswith("gitdir:"):
+            dot_git = (path / line[len("gitdir:") :].strip()).resolve()
+    for candidate in (dot_git, path):
+        if (candidate / "HEAD").is_file() and (
+            (candidate / "objects").is_dir() or (candidate / "commondir").is_file()
+        ):
+            return candidate
+    return None
+
+
+def _inflate(buffer, pos: int, size: int, want: Optional[int] = None) -> bytes:
+    """Распаковывает zlib-поток с позиции pos: все size байт или только первые want.
+
+    Длина сжатого потока заранее неизвестна, поэтому вход подаётся кусками;
+    первый кусок с запасом покрывает size, и обычно хватает одного шага.
+    """
+    limit = size if want is None else min(want, size)
+    step = 256 if want is not None else size + (size >> 10) + 64
+    inflater = zlib.decompressobj()
+    parts, got, tail = [], 0, b""
+    while got < limit and not inflater.eof:
+        chunk = tail + buffer[pos : pos + step]
+        if not chunk:
+            raise GitError("truncated object data")
+        pos += step
+        data = inflater.decompress(chunk, limit - got)
+        tail = inflater.unconsumed_tail
+        parts.append(data)
+        got += len(data)
+    return b"".join(parts)
+
+
+def _delta_size(delta: bytes, pos: int) -> Tuple[int, int]:
+    size = shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Собирает объект по базе и дельте git (инструкции copy/insert)."""
+    source_size, pos = _delta_size(delta, 0)
+    target_size, pos = _delta_size(delta, pos)
+    if source_size != len(base):
+        raise GitError("delta base size mismatch")
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise GitError("invalid delta opcode")
+    if len(out) != target_size:
+        raise GitError("delta result size mismatch")
+    return bytes(out)
+
+
+class PackFile:
+    """pack-*.pack и его индекс v2, открытые через mmap."""
+
+    def __init__(self, idx_path: Path):
+        self.idxPath = idx_path
+        self.packPath = idx_path.with_suffix(".pack")
+        self._files = [open(idx_path, "rb"), open(self.packPath, "rb")]
+        self.idx = mmap.mmap(self._files[0].fileno(), 0, access=mmap.ACCESS_READ)
+        self.pack = mmap.mmap(self._files[1].fileno(), 0, access=mmap.ACCESS_READ)
+        if self.idx[:8] != b"\xfftOc\x00\x00\x00\x02":
+            raise GitError(f"unsupported pack index: {idx_path}")
+        if self.pack[:4] != b"PACK":
+            raise GitError(f"not a pack file: {self.packPath}")
+        self.fanout = [
+            int.from_bytes(self.idx[8 + 4 * i : 12 + 4 * i], "big") for i in range(256)
+        ]
+        self.count = self.fanout[255]
+        self.namesAt = 8 + 256 * 4
+        self.offsetsAt = self.namesAt + self.count * 24  # имена (20) + crc32 (4)
+        self.largeAt = self.offsetsAt + self.count * 4
+
+    def close(self) -> None:
+        self.idx.close()
+        self.pack.close()
+        for f in self._files:
+            f.close()
+
+    def name(self, i: int) -> bytes:
+        at = self.namesAt + 20 * i
+        return self.idx[at : at + 20]
+
+    def _bounds(self, first_byte: int) -> Tuple[int, int]:
+        return (self.fanout[first_byte - 1] if first_byte else 0), self.fanout[first_byte]
+
+    def find(self, sha: bytes) -> Optional[int]:
+        """Смещение объекта в pack по двоичному поиску в индексе или None."""
+        lo, hi = self._bounds(sha[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.name(mid)
+            if name < sha:
+                lo = mid + 1
+            elif name > sha:
+                hi = mid
+            else:
+                return self.offset(mid)
+        return None
+
+    def with_prefix(self, prefix: bytes, hex_prefix: str) -> List[bytes]:
+        lo, hi = self._bounds(prefix[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < self.count and self.name(lo).hex().startswith(hex_prefix):
+            found.append(self.name(lo))
+            lo += 1
+        return found
+
+    def offset(self, i: int) -> int:
+        at = self.offsetsAt + 4 * i
+        offset = int.from_bytes(self.idx[at : at + 4], "big")
+        if offset & 0x80000000:
+            # смещения за 2 ГБ лежат в таблице 8-байтовых
+            at = self.largeAt + 8 * (offset & 0x7FFFFFFF)
+            offset = int.from_bytes(self.idx[at : at + 8], "big")
+        return offset
+
+    def header(self, offset: int) -> Tuple[int, int, int]:
+        """(тип, размер, позиция данных) записи pack по смещению."""
+        byte = self.pack[offset]
+        kind, size, shift, pos = (byte >> 4) & 7, byte & 0x0F, 4, offset + 1
+        while byte & 0x80:
+            byte = self.pack[pos]
+            pos += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return kind, size, pos
+
+    def delta_base(self, kind: int, offset: int, pos: int):
+        """(смещение базы или её хеш, позиция данных дельты)."""
+        if kind == REF_DELTA:
+            return self.pack[pos : pos + 20], pos + 20
+        byte = self.pack[pos]
+        pos += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            byte = self.pack[pos]
+            pos += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+        return offset - distance, pos
+
+
+class GitRepository:
+    """Чтение объектов и ссылок; синхронное — вызывается из потока."""
+
+    def __init__(self, git_dir: Path):
+        self.gitDir = Path(git_dir)
+        common = self.gitDir / "commondir"
+        self.commonDir = (
+            (self.gitDir / common.read_text(encoding="utf-8").strip()).resolve()
+            if common.is_file()
+            else self.gitDir
+        )
+        self.objectDirs = [self.commonDir / "objects"]
+        alternates = self.commonDir / "objects" / "info" / "alternates"
+        if alternates.is_file():
+            for line in alternates.read_text(encoding="utf-8").splitlines():
+                if line.strip() and not line.startswith("#"):
+                    self.objectDirs.append((self.objectDirs[0] / line.strip()).resolve())
+        self.packs = [
+            PackFile(idx)
+            for objects in self.objectDirs
+            for idx in sorted((objects / "pack").glob("pack-*.idx"))
+            if idx.with_suffix(".pack").is_file()
+        ]
+        self.packedRefs: Optional[Dict[str, str]] = None
+        self.cache: "OrderedDict[Tuple[int, int], Tuple[str, bytes]]" = OrderedDict()
+        self.cacheBytes = 0
+
+    def close(self) -> None:
+        for pack in self.packs:
+            pack.close()
+        self.packs = []
+        self.cache.clear()
+
+    # Ссылки
+    def _packed_refs(self) -> Dict[str, str]:
+        if self.packedRefs is None:
+            self.packedRefs = {}
+            path = self.commonDir / "packed-refs"
+            if path.is_file():
+                for line in path.read_text(encoding="utf-8").splitlines():
+                    if line and line[0] not in "#^":
+                        sha, _, name = line.partition(" ")
+                        self.packedRefs[name.strip()] = sha
+        return self.packedRefs
+
+    def read_ref(self, name: str, depth: int = 0) -> Optional[str]:
+        """Хеш по имени ссылки (HEAD, refs/heads/main, ...) или None."""
+        if depth > MAX_REF_DEPTH:
+            raise GitError(f"symbolic ref loop at {name}")
+        # HEAD и прочие *_HEAD принадлежат рабочей копии, остальные ссылки — общие
+        base = self.gitDir if "/" not in name else self.commonDir
+        path = base / name
+        if path.is_file():
+            value = path.read_text(encoding="utf-8").strip()
+            if value.startswith("ref:"):
+                return self.read_ref(value[4:].strip(), depth + 1)
+            return value
+        return self._packed_refs().get(name)
+
+    def expand(self, prefix: str) -> List[bytes]:
+        """Все объекты, хеш которых начинается с prefix (не короче 4 hex-символов)."""
+        found = set()
+        for objects in self.objectDirs:
+            folder = objects / prefix[:2]
+            if folder.is_dir():
+                found.update(
+                    bytes.fromhex(prefix[:2] + f.name)
+                    for f in folder.iterdir()
+                    if f.name.startswith(prefix[2:]) and len(f.name) == 38
+                )
+        even = bytes.fromhex(prefix[: len(prefix) & ~1])
+        for pack in self.packs:
+            found.update(pack.with_prefix(even, prefix))
+        return sorted(found)
+
+    def resolve(self, ref: str) -> bytes:
+        """Хеш объекта по ревизии: ссылка (в порядке git rev-parse) или (сокращённый) хеш."""
+        for name in (
+            ref,
+            f"refs/{ref}",
+            f"refs/tags/{ref}",
+            f"refs/heads/{ref}",
+            f"refs/remotes/{ref}",
+            f"refs/remotes/{ref}/HEAD",
+        ):
+            sha = self.read_ref(name)
+            if sha:
+                return bytes.fromhex(sha)
+        ref = ref.lower()
+        if re.fullmatch(r"[0-9a-f]{4,40}", ref):
+            matches = self.expand(ref)
+            if len(matches) == 1:
+                return matches[0]
+            if matches:
+                raise GitError(f"ambiguous revision: {ref}")
+        raise GitError(f"unknown revision: {ref}")
+
+    # Объекты
+    def _cache_put(self, key, value) -> None:
+        size = len(value[1])
+        if size > CACHE_OBJECT_BYTES:
+            return
+        self.cache[key] = value
+        self.cacheBytes += size
+        while self.cacheBytes > CACHE_BYTES:
+            _, (_, evicted) = self.cache.popitem(last=False)
+            self.cacheBytes -= len(evicted)
+
+    def _locate(self, sha: bytes):
+        for i, pack in enumerate(self.packs):
+            offset = pack.find(sha)
+            if offset is not None:
+                return i, offset
+        for objects in self.objectDirs:
+            hex_sha = sha.hex()
+            path = objects / hex_sha[:2] / hex_sha[2:]
+            if path.is_file():
+                return path, None
+        raise GitError(f"object not found: {sha.hex()}")
+
+    def _read_loose(self, path: Path, want: Optional[int] = None) -> Tuple[str, int, bytes]:
+        raw = path.read_bytes()
+        # заголовок "тип размер\0" короче 32 байт; want ограничивает распаковку
+        data = _inflate(raw, 0, 1 << 62, None if want is None else 32 + want)
+        header, _, body = data.partition(b"\0")
+        kind, _, size = header.decode("ascii").partition(" ")
+        return kind, int(size), body
+
+    def _read_packed(self, index: int, offset: int) -> Tuple[str, bytes]:
+        pack = self.packs[index]
+        chain = []  # (смещение, дельта) от объекта к базе
+        while True:
+            cached = self.cache.get((index, offset))
+            if cached is not None:
+                self.cache.move_to_end((index, offset))
+                kind, data = cached
+                break
+            code, size, pos = pack.header(offset)
+            if code in OBJECT_TYPES:
+                kind, data = OBJECT_TYPES[code], _inflate(pack.pack, pos, size)
+                self._cache_put((index, offset), (kind, data))
+                break
+            if code not in (OFS_DELTA, REF_DELTA):
+                raise GitError(f"bad pack entry type {code} at {offset}")
+            base, pos = pack.delta_base(code, offset, pos)
+            chain.append((offset, _inflate(pack.pack, pos, size)))
+            if code == OFS_DELTA:
+                offset = base
+            else:
+                kind, data = self.read_object(base)
+                break
+        for offset, delta in reversed(chain):
+            data = apply_delta(data, delta)
+            self._cache_put((index, offset), (kind, data))
+        return kind, data
+
+    def read_object(self, sha: bytes) -> Tuple[str, bytes]:
+        where, offset = self._locate(sha)
+        if offset is not None:
+            return self._read_packed(where, offset)
+        kind, _, body = self._read_loose(where)
+        return kind, body
+
+    def object_size(self, sha: bytes) -> int:
+        """Размер объекта без распаковки тела (для дельты — из её заголовка)."""
+        where, offset = self._locate(sha)
+        if offset is None:
+            return self._read_loose(where, want=0)[1]
+        cached = self.cache.get((where, offset))
+        if cached is not None:
+            return len(cached[1])
+        pack = self.packs[where]
+        code, size, pos = pack.header(offset)
+        if code in OBJECT_TYPES:
+            return size
+        _, pos = pack.delta_base(code, offset, pos)
+        head = _inflate(pack.pack, pos, size, want=20)
+        return _delta_size(head, _delta_size(head, 0)[1])[0]
+
+    def tree_of(self, sha: bytes) -> bytes:
+        """Дерево ревизии: метки разворачиваются до коммита, коммит — до дерева."""
+        for _ in range(MAX_REF_DEPTH):
+            kind, data = self.read_object(sha)
+            if kind == "tree":
+                return sha
+            if kind == "commit":
+                return bytes.fromhex(data[5:45].decode("ascii"))  # "tree <hex>"
+            if kind != "tag":
+                raise GitError(f"{sha.hex()} is a {kind}, not a revision")
+            sha = bytes.fromhex(data[7:47].decode("ascii"))  # "object <hex>"
+        raise GitError(f"tag chain too long at {sha.hex()}")
+
+    def walk(self, tree: bytes) -> Dict[Path, bytes]:
+        """Все файлы дерева: путь -> хеш blob (подмодули и символические ссылки пропускаются)."""
+        files = {}
+        stack = [(tree, "")]
+        while stack:
+            sha, prefix = stack.pop()
+            kind, data = self.read_object(sha)
+            if kind != "tree":
+                raise GitError(f"{sha.hex()} is not a tree")
+            pos, end = 0, len(data)
+            while pos < end:
+                space = data.index(b" ", pos)
+                nul = data.index(b"\0", space)
+                mode, name = data[pos:space], data[space + 1 : nul].decode("utf-8", "replace")
+                child = data[nul + 1 : nul + 21]
+                pos = nul + 21
+                if mode == TREE_MODE:
+                    stack.append((child, f"{prefix}{name}/"))
+                elif mode not in (GITLINK_MODE, SYMLINK_MODE):
+                    files[Path(prefix + name)] = child
+        return files
+
+
+class GitSource(IProjectSource):
+    """Дерево ревизии локального репозитория: "/path/repo#ref" (по умолчанию HEAD)."""
+
+    BATCH_FILES = 64  # файлов на один переход в пул потоков
+
+    def __init__(self, path: str, ref: str = "HEAD"):
+        self.path = path
+        self.ref = ref or "HEAD"
+        self.repo: Optional[GitRepository] = None
+        self.blobs: Dict[Path, bytes] = {}
+
+    def __str__(self) -> str:
+        return f"{self.path}#{self.ref}"
+
+    def _open(self) -> GitRepository:
+        if self.repo is None:
+            git_dir = find_git_dir(self.path)
+            if git_dir is None:
+                raise GitError(f"not a git repository: {self.path}")
+            self.repo = GitRepository(git_dir)
+        return self.repo
+
+    def _list(self) -> List[Path]:
+        repo = self._open()
+        self.blobs = repo.walk(repo.tree_of(repo.resolve(self.ref)))
+        return sorted(self.blobs)
+
+    async def list_files(self) -> List[Path]:
+        return await asyncio.to_thread(self._list)
+
+    def _blob(self, rel_path) -> bytes:
+        sha = self.blobs.get(Path(rel_path))
+        if sha is None:
+            raise FileNotFoundError(f"{rel_path} not in {self}")
+        return sha
+
+    def _read_one(self, rel_path, max_size=None):
+        repo, sha = self._open(), self._blob(rel_path)
+        if max_size is not None:
+            size = repo.object_size(sha)
+            if size > max_size:
+                raise FileTooLarge(f"{size} bytes")
+        _, data = repo.read_object(sha)
+        return decode_text(data), len(data)
+
+    async def read_file(self, rel_path: Path) -> str:
+        text, _ = await asyncio.to_thread(self._read_one, rel_path)
+        return text
+
+    def _read_batch(self, batch, max_size):
+        results = []
+        for rel_path in batch:
+            try:
+                text, size = self._read_one(rel_path, max_size)
+                results.append((rel_path, text, size))
+            except (OSError, GitError, FileTooLarge) as e:
+                results.append((rel_path, e, None))
+        return results
+
+    async def read_files(self, rel_paths, max_size=None):
+        rel_paths = list(rel_paths)
+        for i in range(0, len(rel_paths), self.BATCH_FILES):
+            batch = rel_paths[i : i + self.BATCH_FILES]
+            for result in await asyncio.to_thread(self._read_batch, batch, max_size):
+                yield result
+
+    def _identities(self, rel_paths):
+        # хеш blob — идентичность по содержимому: кэши и манифест верны между ревизиями
+        identities = {}
+        for rel_path in rel_paths:
+            sha = self.blobs.get(Path(rel_path))
+            if sha is None:
+                identities[rel_path] = ((str(self), str(rel_path)), None)
+            else:
+                identities[rel_path] = (("git", sha.hex()), self.repo.object_size(sha))
+        return identities
+
+    async def file_identities(self, rel_paths):
+        return await asyncio.to_thread(self._identities, list(rel_paths))
+
+    async def close(self):
+        if self.repo is not None:
+            self.repo.close()
+            self.repo = None
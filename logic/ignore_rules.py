@@ -0,0 +1,158 @@
+# .side_suction/logic/ignore_rules.py
+"""Правила .gitignore / .ignore, скомпилированные для отсечения при обходе.
+
+Все шаблоны одного файла правил собираются в одно регулярное выражение
+(отдельно для файлов и для папок, шаблоны "x/" — только папки). Шаблоны
+идут в обратном порядке, поэтому первая совпавшая альтернатива — последнее
+подходящее правило, как у git; её номер говорит, было ли оно отрицанием.
+Вложенные файлы правил проверяются от самого глубокого к корню: решает
+первый совпавший. Игнорируемые папки отсекаются в os.walk и не читаются
+вовсе — отрицание внутри них, как и у git, файл не возвращает.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+IGNORE_FILES = (".gitignore", ".ignore")  # .ignore читается позже и поэтому важнее
+ALWAYS_PRUNED = {".git"}
+
+
+def _translate(pattern: str) -> str:
+    """Шаблон gitignore без "!" и конечного "/" -> регулярное выражение по пути от базы."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if i + 2 == n:
+                out.append(".*")  # "x/**" — всё внутри x
+                i += 2
+                continue
+            if pattern[i + 2] == "/":
+                out.append("(?:.*/)?")  # "**/" — ноль и больше папок
+                i += 3
+                continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1 : i + 2] in ("!", "^", "]") else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                body = body.replace("\\", "\\\\").replace("[", "\\[")
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    prefix = "" if anchored else "(?:.*/)?"  # без "/" — на любой глубине
+    return prefix + "".join(out)
+
+
+def parse_rules(text: str) -> List[Tuple[str, bool, bool]]:
+    """Строки файла правил -> (регулярное выражение, отрицание, только папки)."""
+    rules = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # конечные пробелы не значимы, если не экранированы
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        negated = stripped.startswith("!")
+        if negated or stripped.startswith(("\\!", "\\#")):
+            stripped = stripped[1:]
+        dir_only = stripped.endswith("/")
+        stripped = stripped.rstrip("/")
+        if stripped:
+            rules.append((_translate(stripped), negated, dir_only))
+    return rules
+
+
+class IgnoreMatcher:
+    """Правила одного набора файлов в одной папке: два выражения на все шаблоны."""
+
+    def __init__(self, rules):
+        rules = list(reversed(rules))
+        self.fileNegated = [negated for _, negated, dir_only in rules if not dir_only]
+        self.dirNegated = [negated for _, negated, _ in rules]
+        self.fileRegex = self._compile([rx for rx, _, dir_only in rules if not dir_only])
+        self.dirRegex = self._compile([rx for rx, _, _ in rules])
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile("|".join(f"({rx})" for rx in patterns), re.DOTALL)
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """True — игнорировать, False — возвращён отрицанием, None — правила молчат."""
+        regex, negated = (
+            (self.dirRegex, self.dirNegated) if is_dir else (self.fileRegex, self.fileNegated)
+        )
+        found = regex.fullmatch(rel) if regex is not None else None
+        if found is None:
+            return None
+        return not negated[found.lastindex - 1]
+
+
+def load_matcher(directory: str, names=IGNORE_FILES) -> Optional[IgnoreMatcher]:
+    rules = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                rules += parse_rules(f.read())
+        except OSError:
+            continue
+    return IgnoreMatcher(rules) if rules else None
+
+
+def is_ignored(stack, rel: str, is_dir: bool) -> bool:
+    """stack — (база, matcher) от корня вглубь; rel — путь от корня через "/"."""
+    for base, matcher in reversed(stack):
+        decision = matcher.match(rel[len(base) :], is_dir)
+        if decision is not None:
+            return decision
+    return False
+
+
+def walk_files(root, respect_ignore: bool = True) -> List[Path]:
+    """Файлы под root (относительные пути); игнорируемые папки не обходятся."""
+    root = str(root)
+    files = []
+    stacks = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        stack = stacks.pop(dirpath, [])
+        if respect_ignore:
+            if not prefix:
+                # исключения репозитория — как .gitignore корня, но с меньшим приоритетом
+                exclude = load_matcher(os.path.join(root, ".git", "info"), ("exclude",))
+                stack = [("", exclude)] if exclude else []
+            if any(name in filenames for name in IGNORE_FILES):
+                matcher = load_matcher(dirpath)
+                if matcher is not None:
+                    stack = stack + [(prefix, matcher)]
+            dirnames[:] = [
+                name
+                for name in dirnames
+                if name not in ALWAYS_PRUNED and not is_ignored(stack, prefix + name, True)
+            ]
+            filenames = [name for name in filenames if not is_ignored(stack, prefix + name, False)]
+        for name in dirnames:
+            stacks[os.path.join(dirpath, name)] = stack
+        files.extend(Path(prefix + name) for name in filenames)
+    return files
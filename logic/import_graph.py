@@ -0,0 +1,181 @@
+# .side_suction/logic/import_graph.py
+"""Граф импортов проекта (Python, JS/TS) для выборки "файл и всё, что он импортирует".
+
+Импорты каждого файла разбираются один раз и кэшируются по идентичности файла
+(размер и mtime у LocalSource, хеш blob у GitSource): при повторном сканировании
+читаются только изменённые файлы. Разбор — в пуле (процессов для больших
+проектов), разрешение имён в пути проекта — по индексу модулей, без чтения.
+Внешние пакеты (не найденные в проекте) в граф не попадают.
+"""
+
+import ast
+import asyncio
+import posixpath
+import re
+from collections import deque
+from pathlib import PurePath
+from typing import Dict, Iterable, List, Set, Tuple
+
+PYTHON_EXTS = (".py", ".pyi", ".pyw")
+JS_EXTS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+IMPORT_BATCH_FILES = 256  # файлов на одну задачу пула
+
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s+(?:type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?"""
+    r"""|\bexport\s+(?:type\s+)?[\w*{}\s,$]+?\s+from\s+"""
+    r"""|\brequire\s*\(\s*|\bimport\s*\(\s*)["']([^"'\n]+)["']"""
+)
+
+
+def supports_imports(path) -> bool:
+    return PurePath(str(path)).suffix.lower() in PYTHON_EXTS + JS_EXTS
+
+
+def parse_imports(path: str, text: str) -> tuple:
+    """Импорты файла: ("py", уровень, модуль, имена) или ("js", спецификатор)."""
+    if PurePath(path).suffix.lower() in JS_EXTS:
+        return tuple(("js", spec) for spec in _JS_IMPORT.findall(text))
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return ()  # глубоко вложенный сгенерированный код — как неразбираемый
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(("py", 0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != "*")
+            imports.append(("py", node.level, node.module or "", names))
+    return tuple(imports)
+
+
+def parse_batch(files) -> List[Tuple[str, tuple]]:
+    """Пакет (путь, текст) -> (путь, импорты); выполняется в пуле, поэтому на уровне модуля."""
+    return [(path, parse_imports(path, text)) for path, text in files]
+
+
+class ImportGraph:
+    def __init__(self, parsed=None):
+        # путь -> (идентичность, импорты); разбор прежнего графа переиспользуется
+        self.parsed: Dict[str, Tuple[tuple, tuple]] = dict(parsed or {})
+        self.edges: Dict[str, Set[str]] = {}
+        self.modules: Dict[str, str] = {}  # модуль Python -> путь
+
+    async def update(self, source, rel_paths, max_size=None, pool=None) -> int:
+        """Обновляет граф по файлам проекта; возвращает число заново разобранных файлов."""
+        rel_paths = [rel for rel in rel_paths if supports_imports(rel)]
+        identities = await source.file_identities(rel_paths)
+        current = {rel.as_posix(): rel for rel in rel_paths}
+        stale = [
+            rel
+            for key, rel in current.items()
+            if self.parsed.get(key, (None,))[0] != identities[rel][0]
+        ]
+        for key in self.parsed.keys() - current.keys():
+            del self.parsed[key]
+
+        loop = asyncio.get_running_loop()
+        futures, batch = [], []
+        reads = source.read_files(stale, max_size)
+        try:
+            async for rel, text, _ in reads:
+                if isinstance(text, str):
+                    batch.append((rel.as_posix(), text))
+                if len(batch) >= IMPORT_BATCH_FILES:
+                    futures.append(loop.run_in_executor(pool, parse_batch, batch))
+                    batch = []
+        finally:
+            await reads.aclose()
+        if batch:
+            futures.append(loop.run_in_executor(pool, parse_batch, batch))
+        for results in await asyncio.gather(*futures):
+            for key, imports in results:
+                self.parsed[key] = (identities[current[key]][0], imports)
+        self.resolve_all()
+        return len(stale)
+
+    def resolve_all(self) -> None:
+        """Пересчитывает рёбра: набор файлов мог измениться, а разбор — нет."""
+        paths = set(self.parsed)
+        packages = {
+            posixpath.dirname(path)
+            for path in paths
+            if posixpath.basename(path) in ("__init__.py", "__init__.pyi")
+        }
+        self.modules = {}
+        # корни модулей — корень проекта и папки, не являющиеся пакетами (src/, tests/...)
+        for path in sorted(paths, key=lambda p: (p.count("/"), p)):
+            stem, ext = posixpath.splitext(path)
+            if ext not in PYTHON_EXTS:
+                continue
+            parts = stem.split("/")
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            for start in range(len(parts)):
+                if start and "/".join(parts[:start]) in packages:
+                    continue
+                self.modules.setdefault(".".join(parts[start:]), path)
+        self.edges = {
+            path: {
+                target
+                for spec in imports
+                for target in self._resolve(path, spec, paths)
+                if target != path
+            }
+            for path, (_, imports) in self.parsed.items()
+        }
+
+    def _resolve(self, path: str, spec: tuple, paths: Set[str]) -> Iterable[str]:
+        if spec[0] == "js":
+            return self._resolve_js(path, spec[1], paths)
+        _, level, module, names = spec
+        if level:
+            # относительный импорт: от пакета файла вверх на level - 1
+            parts = path.split("/")[:-1]
+            if level - 1 > len(parts):
+                return ()  # выше корня проекта
+            base = "/".join(parts[: len(parts) - level + 1])
+            stem = posixpath.join(base, *module.split(".")) if module else base
+            candidates = [stem] + [posixpath.join(stem, name) for name in names]
+            return [
+                found
+                for candidate in candidates
+                for ext in PYTHON_EXTS[:2]
+                for found in (f"{candidate}{ext}", f"{candidate}/__init__{ext}")
+                if found in paths
+            ]
+        # абсолютный: сам модуль, его пакеты-родители и импортированные подмодули
+        parts = module.split(".")
+        candidates = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        candidates += [f"{module}.{name}" for name in names]
+        return [self.modules[name] for name in candidates if name in self.modules]
+
+    @staticmethod
+    def _resolve_js(path: str, spec: str, paths: Set[str]) -> Iterable[str]:
+        if not spec.startswith("."):
+            return ()  # пакет из node_modules или alias
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(path), spec))
+        stem, ext = posixpath.splitext(target)
+        candidates = [target]
+        if ext in (".js", ".jsx", ".mjs", ".cjs"):
+            # ESM в TypeScript: "./x.js" указывает на x.ts
+            candidates += [f"{stem}{ts}" for ts in (".ts", ".tsx", ".mts", ".cts")]
+        candidates += [f"{target}{ext}" for ext in JS_EXTS]
+        candidates += [f"{target}/index{ext}" for ext in JS_EXTS]
+        for candidate in candidates:
+            if candidate in paths:
+                return (candidate,)
+        return ()
+
+    def closure(self, paths: Iterable[str]) -> List[str]:
+        """Файлы и всё, что они импортируют транзитивно, в порядке обхода в ширину."""
+        order = list(dict.fromkeys(paths))
+        seen = set(order)
+        queue = deque(order)
+        while queue:
+            for target in sorted(self.edges.get(queue.popleft(), ())):
+                if target not in seen:
+                    seen.add(target)
+                    order.append(target)
+                    queue.append(target)
+        return order
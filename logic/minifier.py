@@ -0,0 +1,496 @@
+# .side_suction/logic/minifier.py
+"""Однопроходный потоковый минификатор выгрузки.
+
+Заменяет цепочку split/join + replace + двух re.sub в ProjectManager.minify_content:
+все правила собраны в одно регулярное выражение, поэтому неизменный текст
+копируется на уровне C, а Python вызывается только на совпадениях.
+
+Строки-ограды "```path" и "```" распознаются и выводятся как есть: склейка
+по запятой и свёртка тегов не пересекают границы файлов. Текст подаётся
+кусками через feed(); обработанный префикс отдаётся сразу, как только найдена
+безопасная точка разреза (начало строки, через которую не тянется ни одно правило).
+"""
+
+import io
+import json
+import re
+import tokenize
+from pathlib import PurePath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Каждое правило начинается с литерала (",", "<", "\n"): regex-движок находит кандидатов
+# по набору первых символов и пропускает обычный текст, не пробуя правила на каждом символе.
+RULES = {
+    # ",\n" с пробелами вокруг -> ", " (как ", ".join(p.strip() for p in split(",\n")));
+    # пробелы перед запятой срезаются с предыдущего отрезка текста
+    "join": r",(?P<join>\n\s*(?=\S))",
+    # <tag  attr\n  attr /> -> <tag attr attr/>
+    "tag": r"<(?P<tag>(?P<tag_name>/?[A-Za-z][A-Za-z0-9\-]*)(?P<tag_inner>.*?)(?P<tag_slash>/?)>)",
+    # пары пустых строк, как replace("\n\n", "\n"), если их не поглощает склейка по запятой
+    "blank": r"\n(?P<blank>\n+)(?!\s*,\n)(?P<blank_indent>[ \t]+(?=<))?",
+    # пробелы в конце строки
+    "trailing": r"(?P<trailing>[ \t]+)(?=\n)",
+    # отступ перед "<" в начале строки
+    "indent": r"\n(?P<indent>[ \t]+(?=<))",
+    # HTML-комментарии выбрасываются; комментарий на отдельной строке — вместе со строкой
+    "comment": r"\n[ \t]*<!--(?P<comment_line>.*?)-->(?=[ \t]*\n)|<!--(?P<comment>.*?)-->",
+    # содержимое, где пробелы значимы или записано на другом языке, копируется как есть
+    "raw": r"<(?P<raw>(?P<raw_name>pre|textarea|script|style)\b.*?</(?P=raw_name)\s*>)",
+}
+FINAL_JOIN = r",(?P<join>\n\s*(?=\S|\Z))"  # в конце документа склейка возможна и без продолжения
+_LEADING_INDENT = re.compile(r"[ \t]+(?=<)")
+
+LEGACY_RULES = ("join", "tag", "blank", "indent")
+# Склейка по запятой меняет смысл кода ("1, // c,\n2" в Rust/JS, YAML), поэтому в
+# профиле по умолчанию остаются только пустые строки и пробелы в конце строк вне литералов
+CODE_RULES = ("blank", "trailing")
+MARKUP_RULES = ("join", "comment", "raw", "tag", "blank", "indent")
+MARKUP_EXTENSIONS = ".html .htm .xhtml .xml .svg .vue .svelte .astro .qss .ui".split()
+# в тексте и данных пробелы значимы: "  \n" в Markdown — перенос, пустые строки в YAML |-блоке
+VERBATIM_EXTENSIONS = (
+    ".md .markdown .rst .txt .adoc .tex .yaml .yml .toml .ini .cfg .env .csv .tsv .patch .diff"
+).split()
+PYTHON_EXTENSIONS = ".py .pyw .pyi".split()
+JSON_EXTENSIONS = ".json".split()
+
+_INNER_JOIN = re.compile(r"\s*,\n\s*")
+_INNER_NEWLINES = re.compile(r"[\r\n]+")
+_INNER_SPACES = re.compile(r"\s{2,}")
+_INNER_COLLAPSIBLE = re.compile(r"[\r\n]|\s\s")
+_TAG_START = re.compile(r"</?[A-Za-z]")
+_FENCE = re.compile(r"^```[^\n]*\n", re.MULTILINE)
+# строковые литералы и комментарии C-подобных языков; "'" — только в пределах строки
+# ('a в Rust, апостроф в комментарии), остальные литералы могут тянуться через строки
+_LITERAL = re.compile(
+    r"//[^\n]*|/\*.*?(?:\*/|\Z)"
+    r'|"""(?:[^\\]|\\.)*?(?:"""|\Z)'
+    r"|'''(?:[^\\]|\\.)*?(?:'''|\Z)"
+    r"|`(?:[^`\\]|\\.)*(?:`|\Z)"
+    r'|"(?:[^"\\]|\\.)*(?:"|\Z)'
+    r"|'(?:[^'\\\n]|\\.)*'",
+    re.DOTALL,
+)
+
+
+def collapse_tag(name: str, inner: str, slash: str) -> str:
+    if _INNER_COLLAPSIBLE.search(inner):
+        inner = _INNER_JOIN.sub(", ", inner).replace("\n\n", "\n")
+        inner = _INNER_NEWLINES.sub(" ", inner)
+        inner = _INNER_SPACES.sub(" ", inner)
+    inner = inner.strip()
+    return f"<{name} {inner}{slash}>" if inner else f"<{name}{slash}>"
+
+
+class MinifyProfile:
+    """Набор правил для одного вида файлов, скомпилированный в одно выражение."""
+
+    streamable = True  # можно ли обрабатывать файл кусками по безопасным разрезам
+
+    def __init__(self, name: str, rules: Tuple[str, ...]):
+        self.name = name
+        self.rules = rules
+        self.pattern = self._compile(RULES["join"])
+        self.final_pattern = self._compile(FINAL_JOIN)
+
+    def _compile(self, join):
+        rules = dict(RULES, join=join)
+        if "indent" not in self.rules:
+            rules["blank"] = rules["blank"].replace(r"(?P<blank_indent>[ \t]+(?=<))?", "")
+        return re.compile("|".join(rules[rule] for rule in self.rules), re.DOTALL)
+
+    def literals(self, text: str) -> List[Tuple[int, int]]:
+        """Отрезки текста, которые правила не трогают."""
+        return []
+
+    def minify(self, text: str, final: bool = False) -> str:
+        pattern = self.final_pattern if final else self.pattern
+        out = []
+        append = out.append
+        pos = 0
+        spans = iter(self.literals(text))
+        span = next(spans, None)
+        if "indent" in self.rules and text[:1] in " \t":
+            # отступ в самой первой строке: перед ней нет "\n", на который опирается правило
+            lead = _LEADING_INDENT.match(text)
+            if lead:
+                pos = lead.end()
+        for match in pattern.finditer(text, pos):
+            start, end = match.span()
+            while span is not None and span[1] <= start:
+                span = next(spans, None)
+            if span is not None and span[0] < end:
+                continue  # правка задела бы литерал: отрезок копируется как есть
+            rule = match.lastgroup
+            if rule == "join":
+                append(text[pos:start].rstrip())
+                append(", ")
+            elif rule == "tag":
+                name, inner, slash = match.group("tag_name", "tag_inner", "tag_slash")
+                replaced = collapse_tag(name, inner, slash)
+                if replaced == match.group():
+                    continue  # тег уже в свёрнутом виде: копируется вместе с отрезком
+                append(text[pos:start])
+                append(replaced)
+            elif rule == "raw":
+                continue
+            elif rule in ("comment", "comment_line", "trailing"):
+                append(text[pos:start])
+            elif rule == "indent":
+                append(text[pos:start])
+                append("\n")
+            else:  # blank, blank_indent
+                append(text[pos:start])
+                append("\n" * ((len(match.group("blank")) + 2) // 2))
+            pos = end
+        if not out:
+            return text
+        append(text[pos:])
+        return "".join(out)
+
+    def safe_cut(self, text: str) -> int:
+        """Последняя позиция, до которой текст можно обработать независимо от остатка."""
+        i = text.rfind("\n", 0, len(text) - 1)
+        while i >= 0:
+            cut = i + 1
+            if text[cut].isspace() or text[cut] == ",":
+                i = text.rfind("\n", 0, i)
+                continue
+            j = i
+            while j >= 0 and text[j].isspace():
+                j -= 1
+            if j >= 0 and text[j] == "," and text[j + 1] == "\n":
+                i = text.rfind("\n", 0, j)  # склейка по запятой тянется через разрез
+                continue
+            if "tag" in self.rules:
+                opened = _TAG_START.search(text, text.rfind(">", 0, cut) + 1, cut)
+                if opened:
+                    i = text.rfind("\n", 0, opened.start())  # тег ещё не закрыт
+                    continue
+            return cut
+        return 0
+
+
+class CodeProfile(MinifyProfile):
+    """Код без своего профиля: правила не заходят в многострочные литералы и комментарии."""
+
+    streamable = False  # разрез по строкам может прийтись на середину литерала
+
+    def literals(self, text: str) -> List[Tuple[int, int]]:
+        if "\n" not in text:
+            return []
+        return [m.span() for m in _LITERAL.finditer(text) if "\n" in m.group()]
+
+
+class VerbatimProfile(MinifyProfile):
+    """Текст и данные (Markdown, YAML, ...): пробелы значимы, файл не меняется."""
+
+    def __init__(self, name: str = "verbatim"):
+        super().__init__(name, ())
+
+    def _compile(self, join):
+        return None
+
+    def minify(self, text: str, final: bool = False) -> str:
+        return text
+
+
+_TRIVIA = {tokenize.COMMENT, tokenize.NL}
+_STATEMENT_BOUNDARY = {None, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT}
+_STRING_START = {"FSTRING_START", "TSTRING_START"}
+_STRING_END = {"FSTRING_END", "TSTRING_END"}
+
+
+def strip_python(text: str) -> str:
+    """Убирает комментарии, докстроки и пустые строки; отступы и строковые литералы не трогает."""
+    lines = io.StringIO(text).readlines()
+    tokens = [t for t in tokenize.generate_tokens(io.StringIO(text).readline)]
+    comments = {}  # строка -> столбец, с которого начинается комментарий
+    dropped = {}  # строка -> замена ("" или "pass", если блок остался пустым)
+    verbatim = set()  # строки, которые продолжаются внутри многострочного литерала
+    blocks = []  # [строка первой выброшенной докстроки, есть ли в блоке код]
+    fstrings = []
+    prev = None
+    for i, tok in enumerate(tokens):
+        kind, name = tok.type, tokenize.tok_name[tok.type]
+        if kind == tokenize.COMMENT:
+            comments[tok.start[0]] = tok.start[1]
+        if kind in _TRIVIA:
+            continue
+        if name in _STRING_START:
+            fstrings.append(tok.start[0])
+        elif name in _STRING_END:
+            verbatim.update(range(fstrings.pop(), tok.end[0]))
+        elif kind == tokenize.STRING:
+            verbatim.update(range(tok.start[0], tok.end[0]))
+        if kind == tokenize.INDENT:
+            blocks.append([None, False])
+        elif kind == tokenize.DEDENT:
+            first, has_code = blocks.pop()
+            if first and not has_code:
+                indent = lines[first - 1][: len(lines[first - 1]) - len(lines[first - 1].lstrip())]
+                dropped[first] = f"{indent}pass\n"
+        elif prev in _STATEMENT_BOUNDARY and kind not in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            after = next(t.type for t in tokens[i + 1 :] if t.type not in _TRIVIA)
+            if kind == tokenize.STRING and after in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                # строка-выражение сама по себе (докстрока) ничего не делает
+                for row in range(tok.start[0], tok.end[0] + 1):
+                    dropped.setdefault(row, "")
+                if blocks and blocks[-1][0] is None:
+                    blocks[-1][0] = tok.start[0]
+            elif blocks:
+                blocks[-1][1] = True
+        prev = kind
+
+    out = []
+    for row, line in enumerate(lines, 1):
+        if row in dropped:
+            out.append(dropped[row])
+        elif row in verbatim:
+            out.append(line)
+        else:
+            line = line[: comments.get(row, len(line))].rstrip()
+            if line:
+                out.append(line + "\n")
+    result = "".join(out)
+    return result if text.endswith("\n") else result[:-1]
+
+
+class PythonProfile(MinifyProfile):
+    """Python по токенам: семантика кода сохраняется, непонятный файл остаётся как был."""
+
+    streamable = False
+
+    def __init__(self, name: str = "python"):
+        self.name = name
+        self.rules = ()
+
+    def minify(self, text: str, final: bool = False) -> str:
+        try:
+            return strip_python(text)
+        except (tokenize.TokenError, SyntaxError):
+            return text
+
+
+_JSON_WHITESPACE = re.compile(r'("(?:[^"\\]|\\.)*")|\s+')
+
+
+class JsonProfile(MinifyProfile):
+    """JSON без пробелов вне строк; всё, что не разбирается как JSON, не трогается."""
+
+    streamable = False
+
+    def __init__(self, name: str = "json"):
+        self.name = name
+        self.rules = ()
+
+    def minify(self, text: str, final: bool = False) -> str:
+        try:
+            json.loads(text)
+        except ValueError:
+            return text
+        compact = _JSON_WHITESPACE.sub(r"\1", text)
+        return compact + "\n" if text.endswith("\n") else compact
+
+
+class MarkupProfile(MinifyProfile):
+    """HTML/Vue: свёртка тегов без <pre>/<script>/<style>; файл обрабатывается целиком."""
+
+    streamable = False
+
+
+LEGACY = MinifyProfile("legacy", LEGACY_RULES)
+CODE = CodeProfile("code", CODE_RULES)
+MARKUP = MarkupProfile("markup", MARKUP_RULES)
+PYTHON = PythonProfile()
+JSON = JsonProfile()
+VERBATIM = VerbatimProfile()
+
+PROFILES: Dict[str, MinifyProfile] = {}
+PROFILES.update(dict.fromkeys(MARKUP_EXTENSIONS, MARKUP))
+PROFILES.update(dict.fromkeys(PYTHON_EXTENSIONS, PYTHON))
+PROFILES.update(dict.fromkeys(JSON_EXTENSIONS, JSON))
+PROFILES.update(dict.fromkeys(VERBATIM_EXTENSIONS, VERBATIM))
+
+
+def profile_for(path: Optional[str], profiles: Optional[Dict[str, MinifyProfile]] = None):
+    """Профиль по расширению файла из ограды; текст вне оград — прежние правила целиком."""
+    if path is None:
+        return LEGACY
+    suffix = PurePath(path.strip()).suffix.lower()
+    return (profiles or PROFILES).get(suffix, CODE)
+
+
+def utf8_len(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def format_savings(stats: Dict[str, List[int]]) -> str:
+    """'saved 12345 bytes (31%): python -20%, json -45%' по статистике минификатора."""
+    before = sum(b for b, _ in stats.values())
+    after = sum(a for _, a in stats.values())
+    if not before:
+        return "nothing to minify"
+    parts = [
+        f"{name} -{(b - a) * 100 // b}%"
+        for name, (b, a) in sorted(stats.items())
+        if b and b != a
+    ]
+    detail = f": {', '.join(parts)}" if parts else ""
+    return f"saved {before - after} bytes ({(before - after) * 100 // before}%){detail}"
+
+
+class StreamingMinifier:
+    """Конечный автомат поверх потока: вне файла / внутри файла (```path ... ```)."""
+
+    def __init__(self, profiles: Optional[Dict[str, MinifyProfile]] = None, chunk_size=1 << 16):
+        self.profiles = profiles
+        self.chunk_size = chunk_size
+        self._pending = ""  # незавершённая строка, которая может оказаться оградой
+        self._at_line_start = True
+        self._region = []  # текст между оградами, ещё не обработанный
+        self._region_size = 0
+        self._profile = LEGACY
+        self._path = None  # файл, внутри которого находимся
+        self._started = False
+        self.stats: Dict[str, List[int]] = {}  # профиль -> [байт до, байт после]
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        self._pending = ""
+        if not self._started:
+            # как strip() первого куска в прежней реализации
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        out = []
+        complete = text.rfind("\n") + 1
+        pos = 0
+        if not self._at_line_start:
+            # продолжение строки, начатой в прошлом куске, оградой быть не может
+            pos = complete and text.find("\n") + 1
+            if not pos:
+                self._add(text, out)
+                return "".join(out)
+            self._add(text[:pos], out)
+        for fence in _FENCE.finditer(text, pos, complete):
+            self._add(text[pos : fence.start()], out)
+            self._fence(fence.group(), out)
+            pos = fence.end()
+        self._add(text[pos:complete], out)
+        tail = text[complete:]
+        if tail.startswith("```"[: len(tail[:3])]):
+            self._pending = tail  # ограду можно распознать только целой строкой
+            self._at_line_start = True
+        else:
+            self._add(tail, out)
+            self._at_line_start = not tail
+        return "".join(out)
+
+    def close(self) -> str:
+        out = []
+        tail, self._pending = self._pending, ""
+        if tail and not self._started:
+            tail = tail.lstrip()
+        if tail.startswith("```") and self._fence_kind(tail):
+            self._fence(tail, out)
+        else:
+            self._add(tail, out)
+        raw = "".join(self._region)
+        region = raw.rstrip()
+        self._region, self._region_size = [], 0
+        if region:
+            # "a,\n" в конце документа прежняя реализация превращала в "a, "
+            if region.endswith(",") and raw[len(region) : len(region) + 1] == "\n":
+                region += "\n"
+            out.append(self._minify(region, final=True))
+        return "".join(out)
+
+    def minify(self, text: str) -> str:
+        return self.feed(text) + self.close()
+
+    def _fence_kind(self, line: str) -> Optional[str]:
+        """Правила ограды те же, что у FileOutline.from_text."""
+        stripped = line.rstrip("\n")
+        if self._path is not None:
+            return "close"
+        if not stripped.endswith("```"):
+            return "open"
+        return None
+
+    def _fence(self, line: str, out: list):
+        kind = self._fence_kind(line)
+        if kind is None:
+            self._add(line, out)
+            return
+        self._flush(out)
+        if kind == "open":
+            out.append(line)
+            self._path = line.rstrip("\n").strip("`").strip()
+            self._profile = profile_for(self._path, self.profiles)
+        else:
+            # перевод строки после "```" — часть следующего текста: в конце документа он срезается
+            out.append(line.rstrip("\n"))
+            self._path = None
+            self._profile = LEGACY
+            self._add(line[len(line.rstrip("\n")) :], out)
+
+    def _add(self, text: str, out: list):
+        if not text:
+            return
+        self._region.append(text)
+        self._region_size += len(text)
+        if self._region_size >= self.chunk_size and self._profile.streamable:
+            region = "".join(self._region)
+            cut = self._profile.safe_cut(region)
+            if cut:
+                out.append(self._minify(region[:cut]))
+                region = region[cut:]
+            self._region, self._region_size = [region], len(region)
+
+    def _flush(self, out: list):
+        if self._region:
+            out.append(self._minify("".join(self._region)))
+            self._region, self._region_size = [], 0
+
+    def _minify(self, text: str, final: bool = False) -> str:
+        result = self._profile.minify(text, final)
+        counts = self.stats.setdefault(self._profile.name, [0, 0])
+        counts[0] += utf8_len(text)
+        counts[1] += utf8_len(result)
+        return result
+
+
+def minify_stream(chunks: Iterable[str], **kwargs) -> Iterator[str]:
+    """Потоковая минификация: куски на входе, куски на выходе."""
+    minifier = StreamingMinifier(**kwargs)
+    for chunk in chunks:
+        piece = minifier.feed(chunk)
+        if piece:
+            yield piece
+    piece = minifier.close()
+    if piece:
+        yield piece
+
+
+def minify_text(text: str, **kwargs) -> str:
+    return StreamingMinifier(**kwargs).minify(text)
+
+
+def minify_file(path: str, text: str) -> Tuple[str, int, int]:
+    """Тело одного файла из выгрузки: (минифицированный текст, байт до, байт после).
+
+    Функция верхнего уровня — её можно отдавать в пул процессов по файлу на задачу.
+    """
+    result = profile_for(path).minify(text + "\n")
+    result = result[:-1] if result.endswith("\n") else result
+    return result, utf8_len(text), utf8_len(result)
+
+
+def minify_files(files: List[Tuple[str, str]], executor=None) -> List[Tuple[str, int, int]]:
+    """Минификация набора (путь, текст) — последовательно или в переданном пуле."""
+    paths = [path for path, _ in files]
+    texts = [text for _, text in files]
+    if executor is None:
+        return list(map(minify_file, paths, texts))
+    return list(executor.map(minify_file, paths, texts, chunksize=8))
@@ -0,0 +1,77 @@
+# .side_suction/logic/paged_document.py
+"""Постраничная модель выгрузки для больших документов.
+
+Виртуальный документ — "".join(iter_chunks(files)), но в редакторе лежит только
+окно из нескольких страниц вокруг видимой строки. Страница — подряд идущие
+файлы, не больше PAGE_LINES строк или PAGE_CHARS символов (файл не делится,
+поэтому страница из одного большого файла может быть больше). Номера строк и
+позиции символов окна переводятся в координаты всего документа через Page.
+"""
+
+from bisect import bisect_right
+from typing import List, NamedTuple, Sequence, Tuple
+
+from logic.exporter import iter_chunks
+from logic.file_outline import FileOutline
+
+PAGE_LINES = 4096
+PAGE_CHARS = 1 << 20
+WINDOW_PAGES = 1  # страниц окна по обе стороны от текущей
+
+
+class Page(NamedTuple):
+    first: int  # индекс первого файла
+    last: int  # индекс за последним файлом
+    line: int  # первая строка в виртуальном документе
+    char: int  # позиция первого символа в виртуальном документе
+
+
+class PagedDocument:
+    def __init__(
+        self,
+        files: Sequence[Tuple[str, str]],
+        page_lines: int = PAGE_LINES,
+        page_chars: int = PAGE_CHARS,
+    ):
+        self.files = files
+        self.outline = FileOutline.from_files(files)
+        self.pages: List[Page] = []
+        self.lines = self.outline.entries[-1].end + 1 if files else 1
+        char = 0
+        page_start = None
+        for i, ((path, body), entry) in enumerate(zip(files, self.outline)):
+            if page_start is None or (
+                entry.start - page_start.line >= page_lines or char - page_start.char >= page_chars
+            ):
+                if page_start is not None:
+                    self.pages.append(page_start._replace(last=i))
+                page_start = Page(i, i, entry.start, char)
+            # "```path\n" + тело + "\n```" и "\n" перед следующим куском
+            char += len(path) + len(body) + 9
+        if page_start is not None:
+            self.pages.append(page_start._replace(last=len(files)))
+        self.length = max(0, char - 1)
+        self.pageLines = [page.line for page in self.pages]
+
+    def page_at(self, line: int) -> int:
+        return max(0, bisect_right(self.pageLines, line) - 1)
+
+    def window(self, line: int, radius: int = WINDOW_PAGES) -> Page:
+        """Окно из страниц вокруг страницы строки line."""
+        if not self.pages:
+            return Page(0, 0, 0, 0)
+        center = self.page_at(line)
+        first = self.pages[max(0, center - radius)]
+        last = self.pages[min(len(self.pages) - 1, center + radius)]
+        return first._replace(last=last.last)
+
+    def contains(self, window: Page, line: int) -> bool:
+        if line < window.line:
+            return False
+        return window.last >= len(self.files) or line < self.outline.entries[window.last].start
+
+    def window_files(self, window: Page) -> Sequence[Tuple[str, str]]:
+        return self.files[window.first : window.last]
+
+    def text(self, window: Page) -> str:
+        return "".join(iter_chunks(self.window_files(window)))
@@ -0,0 +1,168 @@
+# .side_suction/logic/project_grep.py
+"""Поиск по сохранённым выборкам без выгрузки в редактор.
+
+Файлы проекта читаются источником (пакетами, параллельно), тексты собираются
+в пакеты ~GREP_BATCH_BYTES и сопоставляются в пуле (потоков по умолчанию,
+процессов — если он передан). Результаты отдаются по мере готовности, по одному
+на строку, как у grep. Выборка файлов — та же, что у выгрузки: фильтры
+ProjectManager, glob-шаблоны и пропуск двоичных файлов.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, List, NamedTuple, Tuple
+
+from config.settings import settings
+from logic.content_classifier import TEXT
+from logic.project_manager import ProjectManager
+from logic.project_source import parse_source_spec
+from logic.search_cache import SearchQuery
+from logic.status_manager import report_result
+
+SNIPPET_CHARS = 160
+GREP_BATCH_BYTES = 1 << 20
+MAX_PENDING_BATCHES = 4  # пакетов одного проекта в пуле одновременно
+MAX_PROJECTS = 4  # проектов, которые читаются одновременно
+
+
+class GrepHit(NamedTuple):
+    project: str
+    path: str
+    line: int
+    column: int
+    snippet: str
+
+    def format(self, with_project=True) -> str:
+        prefix = f"{self.project}:" if with_project else ""
+        return f"{prefix}{self.path}:{self.line}:{self.column}: {self.snippet}"
+
+
+def grep_text(query: SearchQuery, text: str) -> List[Tuple[int, int, str]]:
+    """(строка, колонка, фрагмент строки) для первого совпадения в каждой строке."""
+    hits = []
+    line, pos, last_line = 1, 0, 0
+    for match in query.compile().finditer(text):
+        start = match.start()
+        if match.end() == start:
+            continue
+        line += text.count("\n", pos, start)
+        pos = start
+        if line == last_line:
+            continue
+        last_line = line
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        snippet = text[line_start : line_end if line_end >= 0 else len(text)]
+        hits.append((line, start - line_start + 1, snippet.strip()[:SNIPPET_CHARS]))
+    return hits
+
+
+def grep_files(query: SearchQuery, files) -> List[Tuple[str, list]]:
+    """Пакет (путь, текст) -> (путь, совпадения); выполняется в пуле, поэтому на уровне модуля."""
+    results = []
+    for path, text in files:
+        hits = grep_text(query, text)
+        if hits:
+            results.append((path, hits))
+    return results
+
+
+async def grep_items(
+    manager: ProjectManager, items, query: SearchQuery, project="", pool=None
+) -> AsyncIterator[GrepHit]:
+    """Совпадения в файлах (rel, full) проекта в порядке чтения."""
+    query.compile()  # неверный шаблон — ошибка сразу, а не в пуле
+    loop = asyncio.get_running_loop()
+    rel_paths = [rel for rel, _ in items]
+    kinds = await manager.classify_files(rel_paths)
+    readable = [rel for rel in rel_paths if kinds[rel][0] == TEXT]
+    pending, batch, size = deque(), [], 0
+
+    def submit():
+        pending.append(loop.run_in_executor(pool, grep_files, query, batch))
+
+    async def drain(keep):
+        # отдаём готовые пакеты по порядку; ждём, если их в работе больше keep
+        while pending and (len(pending) > keep or pending[0].done()):
+            for path, hits in await pending.popleft():
+                for line, column, snippet in hits:
+                    yield GrepHit(project, path, line, column, snippet)
+
+    reads = manager.source.read_files(readable, settings.maxFileSize)
+    try:
+        async for rel, text, _ in reads:
+            if isinstance(text, Exception):
+                continue
+            if kinds[rel][1] is None and manager.classify_text(rel, text)[0] != TEXT:
+                continue
+            batch.append((rel.as_posix(), text))
+            size += len(text)
+            if size >= GREP_BATCH_BYTES:
+                submit()
+                batch, size = [], 0
+                async for hit in drain(MAX_PENDING_BATCHES - 1):
+                    yield hit
+    finally:
+        await reads.aclose()
+    if batch:
+        submit()
+    async for hit in drain(0):
+        yield hit
+
+
+async def grep_selection(
+    name, selection, query: SearchQuery, pool=None, include=(), exclude=()
+) -> AsyncIterator[GrepHit]:
+    spec = selection.get("project_path") or name
+    source = parse_source_spec(spec)
+    if source is None:
+        raise ValueError(f"Invalid source: {spec!r}")
+    try:
+        manager = ProjectManager(source)
+        await manager.scan_project()
+        items = await manager.get_saved_selection_items(selection)
+        items = manager.get_globbed_files(items, include, exclude)
+        async with aclosing(grep_items(manager, items, query, name, pool)) as hits:
+            async for hit in hits:
+                yield hit
+    finally:
+        await source.close()
+
+
+async def grep_selections(
+    selections: dict, query: SearchQuery, pool=None, include=(), exclude=(), errors=None
+) -> AsyncIterator[GrepHit]:
+    """Совпадения по нескольким выборкам; проекты ищутся параллельно, порядок — по готовности.
+
+    Ошибки проектов (папка удалена, источник недоступен) собираются в errors как
+    (имя, сообщение); без переданного списка — одно сообщение по окончании поиска.
+    """
+    report = errors is None
+    errors = [] if report else errors
+    query.compile()
+    queue = asyncio.Queue(maxsize=1024)
+    limit = asyncio.Semaphore(MAX_PROJECTS)
+    done = object()
+
+    async def run(name, selection):
+        async with limit:
+            try:
+                async for hit in grep_selection(name, selection, query, pool, include, exclude):
+                    await queue.put(hit)
+            except Exception as e:
+                errors.append((name, str(e)))
+
+    async def run_all():
+        await asyncio.gather(*(run(name, sel) for name, sel in selections.items()))
+        await queue.put(done)
+
+    task = asyncio.ensure_future(run_all())
+    try:
+        while (hit := await queue.get()) is not done:
+            yield hit
+    finally:
+        task.cancel()
+        if report and errors:
+            details = "\n".join(f"{name}: {message}" for name, message in errors)
+            report_result(details, "Search Error", 1)
@@ -1,13 +1,40 @@
 # .side_suction/logic/project_manager.py
 
-import re
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
 
-import aiofiles
 from config.settings import settings
-from logic.project_source import LocalSource
-from logic.status_manager import progress, report_result
-from PySide6.QtCore import Qt
+from logic.content_classifier import (
+    SNIFF_BYTES,
+    TEXT,
+    classify_name,
+    classify_sample,
+    summarize,
+    summarize_duplicate,
+)
+from logic.exporter import iter_chunks
+from logic.extraction_manifest import ExtractionManifest, ManifestEntry, unified_diff
+from logic.file_outline import FileOutline
+from logic.import_graph import ImportGraph, supports_imports
+from logic.minifier import StreamingMinifier, format_savings, minify_files, profile_for
+from logic.project_source import FileTooLarge, LocalSource
+from logic.symbol_outline import outline_text, supports_outline
+from logic.token_estimator import (
+    TokenEstimator,
+    content_hash,
+    estimate_tokens,
+    format_tokens,
+)
+from logic.status_manager import Listeners, progress, report_result
+
+# Меньшие выгрузки дешевле минифицировать в потоке, чем поднимать пул процессов
+MINIFY_POOL_BYTES = 4 << 20
+OUTLINE_POOL_BYTES = 4 << 20  # то же для разбора в режиме сигнатур
+OUTLINE_PENDING = 32  # файлов в разборе одновременно, пока выгрузка ждёт первый
+IMPORT_POOL_FILES = 512  # с какого числа файлов граф импортов разбирается в пуле процессов
 
 
 class ProjectManager:
@@ -19,6 +46,20 @@ class ProjectManager:
         self.filteredDirs = set()
         self.filteredExts = set()
         self.filteredFiles = []
+        self.extractStats = {"files": 0, "bytes": 0, "errors": 0}
+        self.contentKinds = {}  # идентичность файла -> (вид, причина)
+        self.tokenEstimator = TokenEstimator()
+        self.minifyStats = {}  # профиль минификации -> [байт до, байт после]
+        self.extractedFiles = []  # (путь, тело) последней выгрузки в порядке вывода
+        self.extractedSources = []  # (путь, исходный текст) тех же файлов — для манифеста
+        self.minifiedCache = {}  # (путь, хеш тела) -> (минифицированное тело, до, после)
+        self.outlineCache = {}  # (расширение, хеш тела) -> скелет или None
+        self.minifiedFiles = []  # (путь, минифицированное тело) в том же порядке
+        self.minifiedContent = None
+        self._minifyTask = None
+        self.importGraph = ImportGraph()  # переживает пересканирование: разбор по идентичности
+        self._graphTask = None
+        self.graphUpdated = Listeners()  # статус фоновой сборки графа: общая шкала не занимается
 
     def set_project_path(self, path):
         self.projectPath = Path(path)
@@ -29,6 +70,8 @@ class ProjectManager:
         self.filteredExts.clear()
         self.filteredDirs.clear()
 
+        if hasattr(self.source, "respectIgnore"):
+            self.source.respectIgnore = settings.respectGitignore
         rel_paths = await self.source.list_files()
         async for rel in progress(rel_paths, "Scanning Project"):
             # для локального source.read_file понадобится full_path, но фильтровать будем по rel
@@ -41,6 +84,7 @@ class ProjectManager:
             self.filteredDirs.update(rel.parents)
 
         self.filteredDirs.discard(Path("."))
+        self.cancel_import_graph()  # граф обновится по новому списку файлов
         return {
             "filteredFiles": self.filteredFiles,
             "filteredExts": self.filteredExts,
@@ -70,45 +114,503 @@ class ProjectManager:
     def get_filtered_exts(self):
         return {f.suffix for _, f in self.filteredFiles}
 
+    @staticmethod
+    def normalize_rel(path) -> str:
+        """Ключ пути для сравнения: выборки могли быть сохранены под Windows."""
+        return str(path).replace("\\", "/")
+
+    def get_selected_items(self, selected_paths):
+        """Подбирает из filteredFiles только те rel, которые выбраны (в порядке сканирования)."""
+        wanted = {self.normalize_rel(p) for p in selected_paths}
+        return [
+            (rel, full)
+            for rel, full in self.filteredFiles
+            if self.normalize_rel(rel) in wanted
+        ]
+
+    async def get_saved_selection_items(self, selection):
+        """(rel, full) по сохранённой выборке: её файлы, а без них — фильтры папок и расширений."""
+        if selection.get("files"):
+            return self.get_selected_items(selection["files"])
+        dirs = {Path(self.normalize_rel(d)) for d in selection.get("directories", [])}
+        exts = set(selection.get("extensions", []))
+        return await self.get_filtered_files(exts, dirs)
+
+    def get_globbed_files(self, items, include=(), exclude=()):
+        """Фильтрует (rel, full) по glob-шаблонам относительно корня проекта."""
+        globbed = []
+        for rel, full in items:
+            key = rel.as_posix()
+            if include and not any(fnmatch(key, pattern) for pattern in include):
+                continue
+            if any(fnmatch(key, pattern) for pattern in exclude):
+                continue
+            globbed.append((rel, full))
+        return globbed
+
+    async def build_import_graph(self):
+        """Собирает граф импортов по filteredFiles; разбираются только изменённые файлы.
+
+        Сборка идёт в новый граф, который заменяет прежний только по завершении:
+        отменённая или упавшая сборка не оставляет наполовину обновлённый граф.
+        """
+        rel_paths = [rel for rel, _ in self.filteredFiles if supports_imports(rel)]
+        graph = ImportGraph(self.importGraph.parsed)
+        if len(rel_paths) >= IMPORT_POOL_FILES:
+            pool = ProcessPoolExecutor()
+            try:
+                parsed = await graph.update(self.source, rel_paths, settings.maxFileSize, pool)
+            finally:
+                # при отмене не ждём пакеты, которые уже не нужны
+                pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            parsed = await graph.update(self.source, rel_paths, settings.maxFileSize)
+        self.importGraph = graph
+        self.graphUpdated.emit(f"Import Graph | {len(rel_paths)} files, {parsed} parsed")
+        return graph
+
+    def start_import_graph(self):
+        """Строит граф импортов в фоне сразу после сканирования."""
+        if self._graphTask is None:
+            self._graphTask = asyncio.ensure_future(self.build_import_graph())
+            self._graphTask.add_done_callback(self._graph_done)
+        return self._graphTask
+
+    def cancel_import_graph(self):
+        """Останавливает фоновую сборку по устаревшему списку файлов."""
+        if self._graphTask is not None:
+            self._graphTask.cancel()
+            self._graphTask = None
+
+    def _graph_done(self, task):
+        # неудачная сборка не кэшируется: следующий запрос замыкания начнёт её заново
+        if task.cancelled() or task.exception() is not None:
+            if self._graphTask is task:
+                self._graphTask = None
+            if not task.cancelled():
+                report_result(f"Import graph: {task.exception()}", "Import Graph Error", 1)
+
+    async def import_closure(self, selected_paths):
+        """(rel, full) выбранных файлов и всего, что они импортируют в пределах проекта."""
+        while True:
+            task = self.start_import_graph()
+            try:
+                # shield: отмена ожидающего не останавливает общую сборку
+                graph = await asyncio.shield(task)
+                break
+            except asyncio.CancelledError:
+                # сборку отменило пересканирование — ждём новую
+                if not task.cancelled() or self._graphTask is task:
+                    raise
+        by_key = {self.normalize_rel(rel): (rel, full) for rel, full in self.filteredFiles}
+        keys = [self.normalize_rel(path) for path in selected_paths]
+        return [by_key[key] for key in graph.closure(keys) if key in by_key]
+
     def get_files_indexes(self, selectedFiles):
+        from PySide6.QtCore import Qt
+
         return {
             item.data(Qt.UserRole + 1): i + 1 for i, item in enumerate(selectedFiles)
         }
 
-    async def extract_content(self, selected_items):
-        content_pieces = []
-        async for rel_path, _ in progress(selected_items, "Extracting Content"):
-            try:
-                text = await self.source.read_file(rel_path)
-            except Exception as e:
-                report_result(f"Cannot read {rel_path}: {e}", "Read Error", 1)
-                continue
+    async def classify_files(self, rel_paths):
+        """(вид, причина, размер) по каждому файлу.
+
+        Сначала имя, затем первые SNIFF_BYTES байт; результат кэшируется по
+        идентичности файла, поэтому повторная выгрузка не читает его снова.
+        Файлы источников без read_heads получают причину None — их текст
+        проверяется уже после чтения.
+        """
+        identities = await self.source.file_identities(rel_paths)
+        kinds = {}
+        to_sniff = []
+        for rel in rel_paths:
+            identity, size = identities[rel]
+            known = self.contentKinds.get(identity) or classify_name(rel)
+            if known:
+                self.contentKinds[identity] = known
+                kinds[rel] = (*known, size)
+            else:
+                to_sniff.append(rel)
+        async for rel, head in self.source.read_heads(to_sniff, SNIFF_BYTES):
+            identity, size = identities[rel]
+            if isinstance(head, bytes):
+                self.contentKinds[identity] = classify_sample(head)
+                kinds[rel] = (*self.contentKinds[identity], size)
+            else:
+                kinds[rel] = (TEXT, None, size)
+        return kinds
+
+    def classify_text(self, rel_path, text):
+        """Проверка уже прочитанного текста для источников без read_heads."""
+        return classify_name(rel_path) or classify_sample(
+            text[:SNIFF_BYTES].encode("utf-8", "replace")
+        )
+
+    def fit_budget(self, text, tokens, used, budget):
+        """Тело файла с учётом бюджета токенов: (текст или None — остановиться, токены)."""
+        if not budget or used + tokens <= budget:
+            return text, tokens
+        policy = settings.budgetPolicy
+        if policy == "stop":
+            return None, 0
+        left = budget - used
+        if policy == "truncate" and left > 0:
+            head = self.tokenEstimator.truncate(text, left)
+            kept = self.tokenEstimator.estimate(head)
+            return f"{head}\n[... truncated: ~{tokens - kept} more tokens]", kept
+        summary = f"[over token budget: ~{tokens} tokens]"
+        return summary, self.tokenEstimator.estimate(summary)
+
+    async def iter_content(self, selected_items):
+        """Отдаёт обрамлённые куски "```path" по мере чтения файлов."""
+        stats = self.extractStats = {
+            "files": 0,
+            "bytes": 0,
+            "errors": 0,
+            "skipped": 0,
+            "tokens": 0,
+            "duplicates": 0,
+            "savedBytes": 0,
+            "savedTokens": 0,
+            "outlined": 0,
+        }
+        self.extractedFiles = extracted = []
+        # исходный текст каждого выведенного файла — до сигнатур, бюджета и дедупликации
+        self.extractedSources = sources = []
+        self.minifiedContent = self._minifyTask = None
+        rel_paths = [rel for rel, _ in selected_items]
+        policy = settings.nonTextPolicy
+        budget = settings.tokenBudget
+        seen = {} if settings.dedupFiles else None  # хеш тела -> первый путь с ним
+        kinds = await self.classify_files(rel_paths) if policy != "include" else {}
+        readable = [rel for rel in rel_paths if kinds.get(rel, (TEXT,))[0] == TEXT]
+        label = "Extracting Content"
+        pool = None
+        if settings.outlineMode:
+            outline_bytes = sum(
+                size or 0 for rel, (_, _, size) in kinds.items() if supports_outline(rel)
+            )
+            if outline_bytes >= OUTLINE_POOL_BYTES:
+                pool = ProcessPoolExecutor()
+        async with progress.progress_context(len(rel_paths), label) as step:
+            reads = self.source.read_files(readable, settings.maxFileSize)
+            if settings.outlineMode:
+                reads = self.outline_reads(reads, pool)
+            limit = f"/{format_tokens(budget)}" if budget else ""
+            for rel in rel_paths:
+                step(status=f"{label} | {format_tokens(stats['tokens'])}{limit} tokens")
+                kind, reason, size = kinds.get(rel, (TEXT, "", None))
+                if kind == TEXT:
+                    # outline_reads добавляет исходный текст четвёртым элементом
+                    rel_path, text, size, *original = await reads.__anext__()
+                    raw = original[0] if original else text
+                    if reason is None and isinstance(text, str):
+                        kind, reason = self.classify_text(rel_path, text)
+                if kind != TEXT:
+                    stats["skipped"] += 1
+                    if policy == "summary":
+                        summary = summarize(kind, reason, size)
+                        extracted.append((str(rel), summary))
+                        sources.append((str(rel), summary))
+                        yield f"```{rel}\n{summary}\n```"
+                    continue
 
-            # пусть размер считается уже по строке
-            if len(text.encode("utf-8")) > settings.maxFileSize:
-                report_result(f"File {rel_path} is too large", "File Size Limit", 1)
+                if isinstance(text, FileTooLarge):
+                    stats["errors"] += 1
+                    report_result(f"File {rel_path} is too large", "File Size Limit", 1)
+                    continue
+                if isinstance(text, Exception):
+                    stats["errors"] += 1
+                    report_result(f"Cannot read {rel_path}: {text}", "Read Error", 1)
+                    continue
+
+                # источник без stat: размер считается уже по строке
+                if size is None:
+                    size = len(text.encode("utf-8"))
+                if size > settings.maxFileSize:
+                    stats["errors"] += 1
+                    report_result(f"File {rel_path} is too large", "File Size Limit", 1)
+                    continue
+
+                digest = None
+                if seen is not None:
+                    # хеш в потоке: крупные файлы не задерживают цикл событий
+                    digest = await asyncio.to_thread(content_hash, text)
+                tokens = self.tokenEstimator.estimate(text, size, digest)
+                if seen is not None:
+                    original = seen.setdefault(digest, rel_path)
+                    if original is not rel_path:
+                        reference = summarize_duplicate(original)
+                        stats["duplicates"] += 1
+                        stats["savedBytes"] += size - len(reference.encode("utf-8"))
+                        stats["savedTokens"] += tokens - estimate_tokens(reference)
+                        extracted.append((str(rel_path), reference))
+                        sources.append((str(rel_path), raw))
+                        yield f"```{rel_path}\n{reference}\n```"
+                        continue
+                text, tokens = self.fit_budget(text, tokens, stats["tokens"], budget)
+                if text is None:
+                    report_result(
+                        f"Token budget of {budget} reached after {stats['files']} files",
+                        "Token Budget",
+                        1,
+                    )
+                    break
+
+                stats["files"] += 1
+                stats["bytes"] += size
+                stats["tokens"] += tokens
+                extracted.append((str(rel_path), text))
+                sources.append((str(rel_path), raw))
+                yield f"```{rel_path}\n{text}\n```"
+            await reads.aclose()
+            status = f"{label} | {format_tokens(stats['tokens'])}{limit} tokens"
+            if stats["outlined"]:
+                status += f" | {stats['outlined']} outlined"
+            if stats["duplicates"]:
+                status += (
+                    f" | {stats['duplicates']} duplicates, saved {stats['savedBytes']} bytes"
+                    f" / {format_tokens(stats['savedTokens'])} tokens"
+                )
+        # шкала уже на 100%: update() не выдал бы итог, поэтому он отправляется напрямую
+        progress.updated.emit(100, status)
+
+    async def iter_changes(self, selected_items):
+        """Куски только для изменённых с прошлой выгрузки файлов.
+
+        Файлы с прежней идентичностью (размер и mtime) не читаются; прочитанные
+        сравниваются по хешу исходного текста — режим сигнатур, бюджет и
+        дедупликация меняют только вывод. Изменённый файл выводится unified diff
+        к тексту из манифеста, новый — как обычно при выгрузке, удалённый из
+        проекта — заглушкой "[removed]". Манифест общий для выборок проекта:
+        файлы вне текущей выборки не трогаются.
+        """
+        manifest = await asyncio.to_thread(ExtractionManifest.load, str(self.source))
+        rel_paths = [rel for rel, _ in selected_items]
+        identities = await self.source.file_identities(rel_paths)
+        current = {}
+        stats = self.changeStats = {"unchanged": 0, "modified": 0, "added": 0, "removed": 0}
+        to_read = []
+        for rel, full in selected_items:
+            key = self.normalize_rel(rel)
+            identity, size = current[key] = identities[rel]
+            prior = manifest.files.get(key)
+            # без размера идентичность — только путь, изменение видно лишь по хешу
+            if prior and size is not None and prior.identity == list(identity):
+                stats["unchanged"] += 1
+            else:
+                to_read.append((rel, full))
+
+        changed, emitted = [], []
+        async for _ in self.iter_content(to_read):
+            path, body = self.extractedFiles[-1]
+            raw = self.extractedSources[-1][1]
+            key = self.normalize_rel(path)
+            digest = await asyncio.to_thread(content_hash, raw)
+            prior = manifest.files.get(key)
+            changed.append((key, raw, digest))
+            if prior and prior.hash == digest:
+                stats["unchanged"] += 1
                 continue
+            old = await asyncio.to_thread(manifest.read_blob, prior.hash) if prior else None
+            if old is None:
+                stats["added"] += 1
+                text = body
+            else:
+                stats["modified"] += 1
+                text = await asyncio.to_thread(unified_diff, key, old, raw)
+            emitted.append((path, text))
+            yield f"```{path}\n{text}\n```"
+        existing = await self.project_keys()
+        for key in sorted(manifest.files.keys() - current.keys() - existing):
+            stats["removed"] += 1
+            emitted.append((key, "[removed]"))
+            yield f"```{key}\n[removed]\n```"
+        # копирование, экспорт и минификация работают с тем, что выведено
+        self.extractedFiles = emitted
 
-            content_pieces.append(f"```{rel_path}\n{text}\n```")
+        def update():
+            # непрочитанные (ошибка, бюджет) и файлы других выборок сохраняют прежнюю запись
+            manifest.files = {
+                k: e for k, e in manifest.files.items() if k in current or k in existing
+            }
+            for key, raw, digest in changed:
+                manifest.write_blob(digest, raw)
+                identity, size = current[key]
+                manifest.files[key] = ManifestEntry(list(identity), size, digest)
+            manifest.save()
 
-        return "\n".join(content_pieces)
+        await asyncio.to_thread(update)
+        progress.updated.emit(
+            100,
+            f"Changes | {stats['modified']} modified, {stats['added']} added, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged",
+        )
+
+    async def project_keys(self):
+        """Пути всех файлов проекта: по последнему сканированию или списку источника."""
+        rel_paths = [rel for rel, _ in self.filteredFiles] or await self.source.list_files()
+        return {self.normalize_rel(rel) for rel in rel_paths}
+
+    async def record_manifest(self):
+        """Запоминает исходные тексты последней выгрузки как основу для iter_changes."""
+        files = [(self.normalize_rel(path), raw) for path, raw in self.extractedSources]
+        identities = await self.source.file_identities([Path(key) for key, _ in files])
+        existing = await self.project_keys()
+
+        def record():
+            manifest = ExtractionManifest.load(str(self.source))
+            # записи других выборок остаются, пока их файлы есть в проекте
+            manifest.files = {k: e for k, e in manifest.files.items() if k in existing}
+            for key, raw in files:
+                identity, size = identities[Path(key)]
+                digest = content_hash(raw)
+                manifest.write_blob(digest, raw)
+                manifest.files[key] = ManifestEntry(list(identity), size, digest)
+            manifest.save()
+
+        await asyncio.to_thread(record)
 
-    def minify_web_tags(self, content: str) -> str:
-        tag_pattern = re.compile(r"<(/?[A-Za-z][A-Za-z0-9\-]*)(.*?)(/?)>", re.DOTALL)
+    async def write_content(self, selected_items, out, minify=False, changes=False):
+        """Пишет куски в поток по мере чтения, не собирая выгрузку целиком в памяти."""
+        minifier = StreamingMinifier() if minify else None
+        written = 0
+        pieces = self.iter_changes if changes else self.iter_content
+        async for piece in pieces(selected_items):
+            chunk = f"\n{piece}" if written else piece
+            out.write(minifier.feed(chunk) if minifier else chunk)
+            written += 1
+        if minifier:
+            out.write(minifier.close())
+        if written:
+            out.write("\n")
+        out.flush()
+        return written
 
-        def repl(m: re.Match) -> str:
-            tag_name, inner, slash = m.groups()
-            inner = re.sub(r"[\r\n]+", " ", inner)
-            inner = re.sub(r"\s{2,}", " ", inner).strip()
-            return f"<{tag_name} {inner}{slash}>" if inner else f"<{tag_name}{slash}>"
+    async def outline_reads(self, reads, pool=None):
+        """Заменяет тела поддерживаемых языков скелетами (settings.outlineMode).
 
-        minified_content = tag_pattern.sub(repl, content)
-        leading_spaces_pattern = re.compile(r"^[ \t]+(?=<)", re.MULTILINE)
-        return leading_spaces_pattern.sub("", minified_content)
+        Разбор идёт в пуле (процессов, если он передан), до OUTLINE_PENDING файлов
+        одновременно; порядок read_files сохраняется. Скелеты кэшируются по хешу
+        тела. Размер скелета неизвестен источнику — отдаётся None. Переданный
+        пул закрывается вместе с чтением.
+        """
+        loop = asyncio.get_running_loop()
+        pending = deque()  # (rel, текст, размер, задача или None)
+        parsing = {}  # ключ кэша -> future разбора, пока он идёт (одинаковые тела — один разбор)
+        stats = self.extractStats
+
+        async def skeleton_of(rel, text):
+            # хеш — тоже вне цикла событий: hashlib отпускает GIL на больших телах
+            key = (rel.suffix.lower(), await asyncio.to_thread(content_hash, text))
+            if key not in self.outlineCache:
+                if key not in parsing:
+                    parsing[key] = loop.run_in_executor(pool, outline_text, rel.as_posix(), text)
+                try:
+                    self.outlineCache[key] = await parsing[key]
+                finally:
+                    parsing.pop(key, None)
+            return self.outlineCache[key]
+
+        async def pop():
+            rel, text, size, task = pending.popleft()
+            skeleton = await task if task is not None else None
+            if skeleton is None:
+                return rel, text, size, text
+            stats["outlined"] += 1
+            return rel, skeleton, None, text
+
+        try:
+            async for rel, text, size in reads:
+                task = None
+                if isinstance(text, str) and supports_outline(rel):
+                    task = asyncio.ensure_future(skeleton_of(rel, text))
+                pending.append((rel, text, size, task))
+                while pending and (
+                    len(pending) > OUTLINE_PENDING
+                    or pending[0][3] is None
+                    or pending[0][3].done()
+                ):
+                    yield await pop()
+            while pending:
+                yield await pop()
+        finally:
+            for *_, task in pending:
+                if task is not None:
+                    task.cancel()
+            await reads.aclose()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract_content(self, selected_items):
+        content_pieces = [piece async for piece in self.iter_content(selected_items)]
+        return "\n".join(content_pieces)
 
     def minify_content(self, content: str) -> str:
         if not content:
             return content
-        content = ", ".join([line.strip() for line in content.split(",\n")])
-        content = content.replace("\n\n", "\n").replace(" ", " ")
-        return self.minify_web_tags(content)
+        minifier = StreamingMinifier()
+        content = minifier.minify(content)
+        self.minifyStats = minifier.stats
+        # update() не пропускает смену одного статуса без смены процента
+        progress.updated.emit(100, f"Minified | {format_savings(minifier.stats)}")
+        return content
+
+    def build_minified(self, files, pool=None):
+        """Минифицированная выгрузка из тел файлов; повторно тела не минифицируются."""
+        keys = [(rel, content_hash(body)) for rel, body in files]
+        missing = {}
+        for key, (rel, body) in zip(keys, files):
+            if key not in self.minifiedCache:
+                missing[key] = (rel, body)
+        if missing:
+            results = minify_files(list(missing.values()), pool)
+            self.minifiedCache.update(zip(missing, results))
+        stats = {}
+        minified = []
+        for rel, digest in keys:
+            body, before, after = self.minifiedCache[(rel, digest)]
+            counts = stats.setdefault(profile_for(rel).name, [0, 0])
+            counts[0] += before
+            counts[1] += after
+            minified.append((rel, body))
+        return minified, stats
+
+    async def minify_extracted(self):
+        """Минифицирует последнюю выгрузку вне цикла событий, большие — в пуле процессов."""
+        files = self.extractedFiles
+        if sum(len(body) for _, body in files) >= MINIFY_POOL_BYTES and len(files) > 1:
+            with ProcessPoolExecutor() as pool:
+                minified, stats = await asyncio.to_thread(self.build_minified, files, pool)
+        else:
+            minified, stats = await asyncio.to_thread(self.build_minified, files)
+        content = "".join(iter_chunks(minified))
+        if files is self.extractedFiles:
+            self.minifiedFiles = minified
+            self.minifiedContent = content
+            self.minifyStats = stats
+        progress.updated.emit(100, f"Minified | {format_savings(stats)}")
+        return content
+
+    def start_minify(self):
+        """Запускает минификацию выгрузки в фоне, не дожидаясь копирования."""
+        if self._minifyTask is None:
+            self._minifyTask = asyncio.ensure_future(self.minify_extracted())
+        return self._minifyTask
+
+    async def get_minified_content(self):
+        if self.minifiedContent is not None:
+            return self.minifiedContent
+        return await self.start_minify()
+
+    def build_outline(self, minified=False) -> FileOutline:
+        """Оглавление последней выгрузки (или её минифицированного варианта) без разбора текста."""
+        return FileOutline.from_files(self.minifiedFiles if minified else self.extractedFiles)
+
+    async def export_files(self, minified=False):
+        """(путь, тело) последней выгрузки — источник для записи в буфер, файл или stdout."""
+        if minified:
+            await self.get_minified_content()
+            return self.minifiedFiles
+        return self.extractedFiles
@@ -1,16 +1,33 @@
 # logic/project_source.py
 
+import asyncio
+import mmap
+import os
 from abc import ABC, abstractmethod
+from collections import deque
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
-import aiofiles
-import aiohttp
+from logic.ignore_rules import walk_files
+
+
+class FileTooLarge(Exception):
+    """Файл больше допустимого размера — его содержимое не читается."""
+
+
+def decode_text(data) -> str:
+    """Декодирование как у текстового режима open(): utf-8 с заменой и универсальные переводы строк."""
+    text = str(data, "utf-8", "replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 class IProjectSource(ABC):
     """Интерфейс источника проекта: список файлов и чтение их содержимого."""
 
+    CONCURRENT_READS = 16  # одновременных read_file в read_files по умолчанию
+
     @abstractmethod
     def __str__(self) -> str:
         """Человекочитаемое представление (например, путь или owner/repo#branch)."""
@@ -30,6 +47,48 @@ class IProjectSource(ABC):
         """
         pass
 
+    async def read_files(
+        self, rel_paths, max_size: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Path, Union[str, Exception], Optional[int]]]:
+        """
+        Пакетное чтение: отдаёт (rel_path, текст или исключение, размер в байтах или None).
+        Источники, знающие размер заранее, проверяют max_size до чтения (FileTooLarge).
+        По умолчанию до CONCURRENT_READS файлов читаются одновременно, порядок сохраняется.
+        """
+
+        async def fetch(rel_path):
+            try:
+                return rel_path, await self.read_file(rel_path), None
+            except Exception as e:
+                return rel_path, e, None
+
+        pending = deque()
+        try:
+            for rel_path in rel_paths:
+                pending.append(asyncio.ensure_future(fetch(rel_path)))
+                if len(pending) >= self.CONCURRENT_READS:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def file_identities(self, rel_paths) -> Dict[Path, Tuple[tuple, Optional[int]]]:
+        """
+        Идентичность файла для кэшей и его размер (None, если неизвестен без чтения).
+        По умолчанию — путь в рамках источника.
+        """
+        return {rel: ((str(self), str(rel)), None) for rel in rel_paths}
+
+    async def read_heads(self, rel_paths, limit: int):
+        """
+        Первые limit байт каждого файла без полного чтения.
+        None вместо байт — источник так не умеет, содержимое проверяется после чтения.
+        """
+        for rel_path in rel_paths:
+            yield rel_path, None
+
     async def close(self):
         """
         Опциональная очистка ресурсов (например, закрытие HTTP-сессии).
@@ -40,19 +99,92 @@ class IProjectSource(ABC):
 class LocalSource(IProjectSource):
     """Источник из локальной папки."""
 
-    def __init__(self, root: str):
+    BATCH_FILES = 64  # файлов на один переход в пул потоков
+    MMAP_THRESHOLD = 1 << 20  # файлы крупнее читаются через mmap, мельче — в общий буфер
+
+    def __init__(self, root: str, respect_ignore: bool = True):
         self.root = Path(root)
+        self.respectIgnore = respect_ignore  # .gitignore/.ignore отсекают папки при обходе
 
     def __str__(self) -> str:
         return str(self.root)
 
     async def list_files(self) -> List[Path]:
-        return [p.relative_to(self.root) for p in self.root.rglob("*") if p.is_file()]
+        return await asyncio.to_thread(walk_files, self.root, self.respectIgnore)
 
     async def read_file(self, rel_path: Path) -> str:
-        p = self.root / rel_path
-        async with aiofiles.open(p, "r", encoding="utf-8", errors="replace") as f:
-            return await f.read()
+        text, _ = await asyncio.to_thread(self._read_one, rel_path, None, None)
+        return text
+
+    async def read_files(self, rel_paths, max_size=None):
+        # Буфер переиспользуется между пакетами: пакеты читаются строго по очереди
+        buffer = bytearray(self.MMAP_THRESHOLD)
+        rel_paths = list(rel_paths)
+        for i in range(0, len(rel_paths), self.BATCH_FILES):
+            batch = rel_paths[i : i + self.BATCH_FILES]
+            for result in await asyncio.to_thread(
+                self._read_batch, batch, max_size, buffer
+            ):
+                yield result
+
+    def _read_batch(self, batch, max_size, buffer):
+        results = []
+        for rel_path in batch:
+            try:
+                text, size = self._read_one(rel_path, max_size, buffer)
+                results.append((rel_path, text, size))
+            except Exception as e:
+                results.append((rel_path, e, None))
+        return results
+
+    async def file_identities(self, rel_paths):
+        return await asyncio.to_thread(self._stat_all, list(rel_paths))
+
+    def _stat_all(self, rel_paths):
+        identities = {}
+        for rel_path in rel_paths:
+            full = self.root / rel_path
+            try:
+                st = os.stat(full)
+                identities[rel_path] = ((str(full), st.st_size, st.st_mtime_ns), st.st_size)
+            except OSError:
+                identities[rel_path] = ((str(full), None, None), None)
+        return identities
+
+    async def read_heads(self, rel_paths, limit):
+        rel_paths = list(rel_paths)
+        for i in range(0, len(rel_paths), self.BATCH_FILES):
+            batch = rel_paths[i : i + self.BATCH_FILES]
+            for result in await asyncio.to_thread(self._read_heads, batch, limit):
+                yield result
+
+    def _read_heads(self, batch, limit):
+        results = []
+        for rel_path in batch:
+            try:
+                with open(self.root / rel_path, "rb") as f:
+                    results.append((rel_path, f.read(limit)))
+            except OSError as e:
+                results.append((rel_path, e))
+        return results
+
+    def _read_one(self, rel_path, max_size, buffer):
+        """Размер проверяется по stat до чтения; байты декодируются один раз."""
+        with open(self.root / rel_path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if max_size is not None and size > max_size:
+                raise FileTooLarge(f"{size} bytes")
+            if size > self.MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return decode_text(mapped), size
+            view = memoryview(buffer if buffer is not None else bytearray(size))
+            read = 0
+            while read < size:
+                chunk = f.readinto(view[read:size])
+                if not chunk:
+                    break
+                read += chunk
+            return decode_text(view[:read]), read
 
 
 class GitHubSource(IProjectSource):
@@ -62,7 +194,8 @@ class GitHubSource(IProjectSource):
         self.owner = owner
         self.repo = repo
         self.branch = branch
-        self.session = aiohttp.ClientSession()
+        # aiohttp импортируется при первом запросе: локальным источникам HTTP-стек не нужен
+        self.session = None
         # URL для получения дерева файлов
         self.api_url = (
             f"https://api.github.com/repos/{owner}/{repo}"
@@ -90,8 +223,15 @@ class GitHubSource(IProjectSource):
         owner, repo, branch = m.groups()
         return cls(owner, repo, branch)
 
+    def _get_session(self):
+        if self.session is None:
+            import aiohttp
+
+            self.session = aiohttp.ClientSession()
+        return self.session
+
     async def list_files(self) -> List[Path]:
-        async with self.session.get(self.api_url) as resp:
+        async with self._get_session().get(self.api_url) as resp:
             resp.raise_for_status()
             data = await resp.json()
 
@@ -105,9 +245,44 @@ class GitHubSource(IProjectSource):
         # GitHub raw URLs всегда используют прямые слэши
         rel = rel_path.as_posix() if isinstance(rel_path, Path) else str(rel_path)
         url = f"{self.raw_base}{rel}"
-        async with self.session.get(url) as resp:
+        async with self._get_session().get(url) as resp:
             resp.raise_for_status()
             return await resp.text()
 
     async def close(self):
-        await self.session.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def parse_source_spec(spec: str) -> Optional[IProjectSource]:
+    """Источник по строке: папка, архив, /path/repo#ref, owner/repo[#branch] или GitHub API URL."""
+    # 1) Локальная папка
+    if Path(spec).is_dir():
+        return LocalSource(spec)
+
+    # 2) Архив: .zip, .tar, .tar.gz, ...
+    if Path(spec).is_file():
+        from logic.archive_source import open_archive_source
+
+        return open_archive_source(spec)
+
+    # 3) Ревизия локального git-репозитория: /path/repo#ref
+    path, sep, ref = spec.rpartition("#")
+    if sep and ref and Path(path).is_dir():
+        from logic.git_source import GitSource, find_git_dir
+
+        if find_git_dir(path) is not None:
+            return GitSource(path, ref)
+
+    # 4) owner/repo[#branch]
+    if "/" in spec and not spec.startswith("http"):
+        owner_repo, _, branch = spec.partition("#")
+        owner, _, repo = owner_repo.partition("/")
+        return GitHubSource(owner, repo, branch or "main")
+
+    # 5) GitHub API URL
+    if spec.startswith("https://api.github.com/"):
+        return GitHubSource.from_tree_url(spec)
+
+    return None
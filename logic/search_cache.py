@@ -0,0 +1,188 @@
+# .side_suction/logic/search_cache.py
+"""Поиск по выгрузке: кэш совпадений на запрос поверх полного прохода по тексту.
+
+Это не индекс: структуры, по которой запрос находит кандидатов без чтения
+текста, нет. Каждый новый запрос — один проход скомпилированного
+регулярного выражения (на уровне C), поэтому регулярные выражения, регистр
+и целые слова работают одинаково. Позиции совпадений кэшируются на запрос:
+переход к следующему совпадению — bisect, а не новый проход по документу.
+Пока пользователь дописывает литеральный запрос, новые совпадения
+проверяются только в позициях совпадений предыдущего (если их мало
+относительно длины текста). QTextDocument считает позиции в UTF-16,
+Python — в кодовых точках; to_document/from_document переводят одни в другие
+(различаются они только после символов вне BMP, например эмодзи).
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import List, NamedTuple, Optional, Tuple
+
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+DENSITY_BUCKETS = 512
+# уточнение по прежним совпадениям выгодно, пока их намного меньше символов текста
+REFINE_RATIO = 64
+
+
+class SearchQuery(NamedTuple):
+    pattern: str
+    regex: bool = False
+    case: bool = False
+    word: bool = False
+
+    def compile(self) -> re.Pattern:
+        """re.error для неверного регулярного выражения пробрасывается вызывающему."""
+        pattern = self.pattern if self.regex else re.escape(self.pattern)
+        if self.word:
+            # \b не срабатывает у краёв вида "(x" — проверяем соседние символы явно
+            pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+        return re.compile(pattern, 0 if self.case else re.IGNORECASE)
+
+    def refines(self, other: "SearchQuery") -> bool:
+        """Совпадения self — подмножество позиций совпадений other (литерал дописан)."""
+        if self.regex or self.word or other != (other.pattern, False, self.case, False):
+            return False
+        prefix, pattern = other.pattern, self.pattern
+        if not self.case:
+            prefix, pattern = prefix.lower(), pattern.lower()
+        if not (prefix.isascii() and 0 < len(prefix) < len(pattern)):
+            return False
+        # у префикса без бордюра вхождения не перекрываются — finditer нашёл все
+        return pattern.startswith(prefix) and not any(
+            prefix[:k] == prefix[-k:] for k in range(1, len(prefix))
+        )
+
+
+class Matches:
+    """Отсортированные начала и концы совпадений одного запроса."""
+
+    def __init__(self, starts: List[int], ends: List[int]):
+        self.starts = starts
+        self.ends = ends
+        self.density: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        return self.starts[index], self.ends[index]
+
+    def next_index(self, pos: int, backwards: bool = False) -> Optional[int]:
+        """Совпадение после pos (или перед ним), с переходом через конец документа."""
+        if not self.starts:
+            return None
+        if backwards:
+            return (bisect_left(self.starts, pos) - 1) % len(self.starts)
+        return bisect_right(self.starts, pos) % len(self.starts)
+
+    def between(self, start: int, end: int) -> range:
+        """Индексы совпадений, пересекающих [start, end) — например, видимую область."""
+        return range(bisect_left(self.ends, start + 1), bisect_left(self.starts, end))
+
+
+class SearchCache:
+    """Текст выгрузки и совпадения последних cache_size запросов по нему."""
+
+    def __init__(self, text: str, cache_size: int = 16):
+        self.text = text
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[SearchQuery, Matches]" = OrderedDict()
+        # find_all вызывается из фоновых потоков (поиск по мере ввода)
+        self._lock = threading.Lock()
+        self._line_starts: Optional[List[int]] = None
+        self._astral: Optional[List[int]] = None
+        self._astral_doc: List[int] = []
+
+    @property
+    def line_starts(self) -> List[int]:
+        if self._line_starts is None:
+            lengths = (len(line) + 1 for line in self.text.split("\n"))
+            self._line_starts = [0, *accumulate(lengths)][:-1]
+        return self._line_starts
+
+    @property
+    def astral(self) -> List[int]:
+        if self._astral is None:
+            if self.text.isascii():
+                self._astral = []
+            else:
+                self._astral = [m.start() for m in _ASTRAL.finditer(self.text)]
+            self._astral_doc = [pos + i for i, pos in enumerate(self._astral)]
+        return self._astral
+
+    def line_of(self, pos: int) -> int:
+        return bisect_right(self.line_starts, pos) - 1
+
+    def find_all(self, query: SearchQuery) -> Matches:
+        """Все непустые совпадения запроса в кодовых точках; повторный запрос — из кэша."""
+        with self._lock:
+            matches = self._cache.get(query)
+            if matches is not None:
+                self._cache.move_to_end(query)
+                return matches
+            base = self._refine_base(query)
+        if not query.pattern:
+            matches = Matches([], [])
+        elif base is not None:
+            matches = self._refine(query, base)
+        else:
+            matches = self._scan(query)
+        with self._lock:
+            self._cache[query] = matches
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return matches
+
+    def _refine_base(self, query: SearchQuery) -> Optional[Matches]:
+        """Самый длинный закэшированный префикс запроса, по совпадениям которого дешевле пройти."""
+        candidates = [
+            (len(q.pattern), matches)
+            for q, matches in self._cache.items()
+            if query.refines(q) and len(matches) * REFINE_RATIO < len(self.text)
+        ]
+        return max(candidates, key=lambda c: c[0])[1] if candidates else None
+
+    def _scan(self, query: SearchQuery) -> Matches:
+        starts, ends = [], []
+        for match in query.compile().finditer(self.text):
+            start, end = match.span()
+            if end > start:
+                starts.append(start)
+                ends.append(end)
+        return Matches(starts, ends)
+
+    def _refine(self, query: SearchQuery, base: Matches) -> Matches:
+        match, text = query.compile().match, self.text
+        starts, ends, last_end = [], [], 0
+        for start in base.starts:
+            # как и finditer, не берём совпадения, перекрывающие предыдущее
+            if start >= last_end and (found := match(text, start)):
+                last_end = found.end()
+                starts.append(start)
+                ends.append(last_end)
+        return Matches(starts, ends)
+
+    def density(self, matches: Matches, buckets: int = DENSITY_BUCKETS) -> List[int]:
+        """Число совпадений в каждой из равных по строкам полос документа (для миникарты)."""
+        if matches.density is None or len(matches.density) != buckets:
+            line_starts = self.line_starts
+            lines = len(line_starts)
+            bounds = [line_starts[i * lines // buckets] for i in range(buckets)]
+            bounds.append(len(self.text) + 1)
+            cuts = [bisect_left(matches.starts, bound) for bound in bounds]
+            matches.density = [cuts[i + 1] - cuts[i] for i in range(buckets)]
+        return matches.density
+
+    def to_document(self, pos: int) -> int:
+        """Позиция в кодовых точках -> позиция QTextDocument (UTF-16)."""
+        astral = self.astral
+        return pos + bisect_left(astral, pos) if astral else pos
+
+    def from_document(self, pos: int) -> int:
+        """Позиция QTextDocument (UTF-16) -> позиция в кодовых точках."""
+        if not self.astral:
+            return pos
+        # символ вне BMP занимает в документе две позиции
+        return pos - bisect_right(self._astral_doc, pos - 2)
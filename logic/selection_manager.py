@@ -33,6 +33,15 @@ class SelectionManager:
         data[path].update(selections)
         await self._save_db(data)
 
+    async def loadSelections(self):
+        """Все сохранённые выборки; отсутствие базы — не ошибка."""
+        if not settings.databasePath.exists():
+            return {}
+        return await self._load_db()
+
+    async def listProjects(self):
+        return list((await self.loadSelections()).keys())
+
     async def loadSelection(self, path):
         data = await self._load_db()
         return data.get(path)
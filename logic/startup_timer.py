@@ -0,0 +1,130 @@
+# .side_suction/logic/startup_timer.py
+
+import os
+import sys
+import time
+
+STARTUP_REPORT_FLAG = "--startup-report"
+STARTUP_REPORT_ENV = "SIDE_SUCTION_STARTUP_REPORT"
+IMPORT_REPORT_FLAG = "--import-report"
+IMPORT_REPORT_ENV = "SIDE_SUCTION_IMPORT_REPORT"
+
+
+def _requested(flag, env, argv=None):
+    argv = sys.argv if argv is None else argv
+    return flag in argv or bool(os.environ.get(env))
+
+
+def startup_report_requested(argv=None):
+    """Флаг отчёта: аргумент командной строки или переменная окружения."""
+    return _requested(STARTUP_REPORT_FLAG, STARTUP_REPORT_ENV, argv)
+
+
+def import_report_requested(argv=None):
+    return _requested(IMPORT_REPORT_FLAG, IMPORT_REPORT_ENV, argv)
+
+
+class StartupTimer:
+    """Collects durations of named startup phases and prints them once."""
+
+    def __init__(self, enabled=False, stream=None):
+        self.enabled = enabled
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+        self.reported = False
+
+    def mark(self, phase):
+        """Закрывает текущую фазу: длительность считается от предыдущей отметки."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def finish(self, phase):
+        """Последняя фаза (например, первая отрисовка) — отмечает и печатает отчёт."""
+        if self.reported:
+            return
+        self.mark(phase)
+        self.report()
+
+    def format_report(self):
+        width = max([len(name) for name, _ in self.phases] + [len("total")])
+        lines = ["Startup timing:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}} {seconds * 1000:9.1f} ms")
+        total = self.last - self.started
+        lines.append(f"  {'total':<{width}} {total * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+    def report(self):
+        self.reported = True
+        if self.enabled:
+            print(self.format_report(), file=self.stream or sys.stderr, flush=True)
+
+
+class ImportTimer:
+    """Аналог `python -X importtime`: время загрузки каждого модуля.
+
+    Оборачивает importlib._bootstrap._find_and_load, через который интерпретатор
+    загружает модули, ещё не попавшие в sys.modules. Вложенные импорты
+    учитываются в cumulative родителя и вычитаются из его self.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.records = []  # (depth, name, self_us, cumulative_us) в порядке завершения
+        self._stack = []
+        self._bootstrap = sys.modules["importlib._bootstrap"]
+        self._original = None
+
+    def install(self):
+        if self._original is not None:
+            return self
+        self._original = original = self._bootstrap._find_and_load
+
+        def timed_find_and_load(name, import_):
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return original(name, import_)
+            finally:
+                cumulative = time.perf_counter() - started
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += cumulative
+                self.records.append(
+                    (
+                        len(self._stack),
+                        name,
+                        int((cumulative - children) * 1e6),
+                        int(cumulative * 1e6),
+                    )
+                )
+
+        self._bootstrap._find_and_load = timed_find_and_load
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            self._bootstrap._find_and_load = self._original
+            self._original = None
+
+    def format_report(self, top=None):
+        lines = ["import time:      self [us] | cumulative | imported package"]
+        for depth, name, self_us, cumulative_us in self.records:
+            lines.append(
+                f"import time: {self_us:>14} | {cumulative_us:>10} | {'  ' * depth}{name}"
+            )
+        if top:
+            heaviest = sorted(
+                (r for r in self.records if r[0] == 0), key=lambda r: -r[3]
+            )[:top]
+            lines.append(f"Top {len(heaviest)} top-level imports by cumulative time:")
+            for _, name, _, cumulative_us in heaviest:
+                lines.append(f"  {name:<40} {cumulative_us / 1000:9.1f} ms")
+        return "\n".join(lines)
+
+    def report(self, top=15):
+        self.uninstall()
+        print(self.format_report(top), file=self.stream or sys.stderr, flush=True)
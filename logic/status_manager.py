@@ -1,14 +1,13 @@
 # .side_suction/logic/status_manager.py
 
 import asyncio
+import threading
 import time
 from contextlib import asynccontextmanager
 from enum import IntEnum
 from typing import AsyncIterable
 
 from config.colors import Colors
-from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QMessageBox, QProgressBar
 
 
 class Levels(IntEnum):
@@ -21,6 +20,9 @@ class Levels(IntEnum):
 class ReportConfig:
     parent = None
     callback = None
+    alert = None  # например QMessageBox.warning; без него сообщение только печатается
+    stream = None  # куда печатать сообщения (None — stdout)
+    loop = None  # цикл событий GUI: emit из других потоков выполняется в нём
 
 
 report_config = ReportConfig()
@@ -31,8 +33,9 @@ def report_result(message="", title="", level=Levels.PASS):
     callback = report_config.callback
     color = Colors.PASS
     if message and level in (Levels.FAIL, Levels.WARN):
-        print(message)
-        QMessageBox.warning(parent, title or "Alert", message)
+        print(message, file=report_config.stream)
+        if report_config.alert:
+            report_config.alert(parent, title or "Alert", message)
         color = Colors.FAIL if level == Levels.FAIL else Colors.WARN
 
     if callback:
@@ -48,22 +51,43 @@ def handle_error(context):
     report_result(message, title, 0)
 
 
-# Set up the global handler
-loop = asyncio.get_event_loop()
-loop.set_exception_handler(handle_error)
+def install_exception_handler(loop: asyncio.AbstractEventLoop):
+    """Set up the global handler on the loop the application actually runs."""
+    loop.set_exception_handler(handle_error)
 
 
-class StatusManager(QObject):
-    updated = Signal(int, str)
+class Listeners(list):
+    """Минимальная замена Qt Signal (connect/emit), чтобы не тянуть PySide6 в logic.
 
+    Как у queued-соединения Qt: emit из рабочего потока (to_thread, колбэк пула)
+    при заданном report_config.loop выполняется в главном потоке — слушатели
+    трогают виджеты. Без цикла GUI (CLI) слушатели вызываются сразу.
+    """
+
+    def connect(self, callback):
+        self.append(callback)
+
+    def emit(self, *args):
+        loop = report_config.loop
+        if loop is not None and threading.current_thread() is not threading.main_thread():
+            loop.call_soon_threadsafe(self._notify, args)
+        else:
+            self._notify(args)
+
+    def _notify(self, args):
+        for callback in list(self):
+            callback(*args)
+
+
+class StatusManager:
     def __init__(self, min_interval=0.2, enum_mult=10):
-        super().__init__()
+        self.updated = Listeners()
         self.progress_bar = None
         self.min_interval = min_interval
         self.enum_mult = enum_mult
         self.reset()
 
-    def set_progress_bar(self, progress_bar: QProgressBar):
+    def set_progress_bar(self, progress_bar):
         self.progress_bar = progress_bar
         self.updated.connect(self.update_progress_bar)
 
@@ -112,11 +136,13 @@ class StatusManager(QObject):
     def progress_callback(self, total, label):
         current = 0
 
-        def callback(step=1):
+        def callback(step=1, status=None):
             nonlocal current
             current = min(current + step, total)
-            self.step(current, total, label)
+            callback.status = status or label
+            self.step(current, total, callback.status)
 
+        callback.status = label
         return callback
 
     @asynccontextmanager
@@ -125,7 +151,7 @@ class StatusManager(QObject):
         callback = self.progress_callback(total, label)
         try:
             yield callback
-            self.update(100, f"{label} - Complete")
+            self.update(100, f"{callback.status} - Complete")
         except Exception as e:
             self.update(0, f"{label} - Error: {str(e)}")
             raise
@@ -0,0 +1,75 @@
+# .side_suction/logic/symbol_outline.py
+"""Скелет файла для режима выгрузки "только сигнатуры".
+
+Python разбирается через ast: остаются docstring, импорты, константы модуля
+и класса, классы и функции с сигнатурами и docstring, тела заменяются на
+"...". Функции — на уровне модуля, чтобы выполняться в пуле процессов.
+Файл, который не разбирается, выводится целиком (outline_text -> None).
+"""
+
+import ast
+from pathlib import PurePath
+from typing import Optional
+
+MAX_VALUE_CHARS = 60  # длиннее — значение константы заменяется на "..."
+
+
+def _docstring(body) -> list:
+    first = body[0] if body else None
+    if (
+        isinstance(first, ast.Expr)
+        and isinstance(first.value, ast.Constant)
+        and isinstance(first.value.value, str)
+    ):
+        return [first]
+    return []
+
+
+def _short_value(node):
+    value = getattr(node, "value", None)
+    if value is not None and len(ast.unparse(value)) > MAX_VALUE_CHARS:
+        node.value = ast.Constant(Ellipsis)
+    return node
+
+
+def _skeleton(body, in_class=False) -> list:
+    kept = _docstring(body)
+    for node in body[len(kept) :]:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = _docstring(node.body) + [ast.Expr(ast.Constant(Ellipsis))]
+            kept.append(node)
+        elif isinstance(node, ast.ClassDef):
+            node.body = _skeleton(node.body, in_class=True) or [ast.Expr(ast.Constant(Ellipsis))]
+            kept.append(node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            kept.append(_short_value(node))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) and not in_class:
+            kept.append(node)
+    return kept
+
+
+def python_skeleton(text: str) -> Optional[str]:
+    try:
+        tree = ast.parse(text)
+        tree.body = _skeleton(tree.body)
+        return ast.unparse(tree)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # глубоко вложенный (сгенерированный) код разбирается, но не обходится рекурсией
+        return None
+
+
+SKELETONS = {
+    ".py": python_skeleton,
+    ".pyi": python_skeleton,
+    ".pyw": python_skeleton,
+}
+
+
+def supports_outline(path) -> bool:
+    return PurePath(str(path)).suffix.lower() in SKELETONS
+
+
+def outline_text(path, text: str) -> Optional[str]:
+    """Скелет по расширению пути или None (язык не поддерживается, файл не разбирается)."""
+    skeleton = SKELETONS.get(PurePath(str(path)).suffix.lower())
+    return skeleton(text) if skeleton else None
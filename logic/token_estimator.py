@@ -0,0 +1,49 @@
+# .side_suction/logic/token_estimator.py
+
+import hashlib
+from typing import Dict, Optional
+
+CHARS_PER_TOKEN = 4  # ASCII-код в BPE-токенизаторах: ~4 символа на токен
+EXTRA_BYTES_PER_TOKEN = 3  # не-ASCII (кириллица и т.п.) режется на токены заметно мельче
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def estimate_tokens(text: str, size: Optional[int] = None) -> int:
+    """Приближённое число токенов без токенизатора: O(1), если размер в байтах уже известен."""
+    if not text:
+        return 0
+    size = len(text.encode("utf-8")) if size is None else size
+    chars = len(text)
+    return -(-chars // CHARS_PER_TOKEN) + max(0, size - chars) // EXTRA_BYTES_PER_TOKEN
+
+
+def format_tokens(count: int) -> str:
+    return f"{count / 1000:.1f}k" if count >= 1000 else str(count)
+
+
+class TokenEstimator:
+    """Оценки токенов, закэшированные по уже посчитанному хешу содержимого."""
+
+    def __init__(self):
+        self.cache: Dict[str, int] = {}
+
+    def estimate(self, text: str, size: Optional[int] = None, digest=None) -> int:
+        if digest is None:
+            # хешировать ради кэша дороже самой оценки
+            return estimate_tokens(text, size)
+        if digest not in self.cache:
+            self.cache[digest] = estimate_tokens(text, size)
+        return self.cache[digest]
+
+    def truncate(self, text: str, tokens: int) -> str:
+        """Начало текста примерно на tokens токенов, обрезанное по концу строки."""
+        if tokens <= 0:
+            return ""
+        head = text[: tokens * CHARS_PER_TOKEN]
+        while head and estimate_tokens(head) > tokens:
+            head = head[: len(head) * 3 // 4]
+        cut = head.rfind("\n")
+        return head[:cut] if cut > 0 else head
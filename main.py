@@ -3,12 +3,37 @@
 import asyncio
 import sys
 
-from logic.selection_manager import SelectionManager
-from logic.status_manager import progress, report_config, report_result
-from PySide6.QtWidgets import QApplication, QWidget
-from qasync import QEventLoop
-from ui.ui_builder import UIBuilder
-from ui.ui_handler import UIHandler
+from logic.startup_timer import (
+    ImportTimer,
+    StartupTimer,
+    import_report_requested,
+    startup_report_requested,
+)
+
+# Таймеры создаются до остальных импортов, чтобы в отчёт попало их время
+startup = StartupTimer(enabled=startup_report_requested())
+imports = ImportTimer().install() if import_report_requested() else None
+
+import config.settings  # noqa: E402, F401
+
+startup.mark("settings load")
+
+from logic.selection_manager import SelectionManager  # noqa: E402
+from logic.status_manager import (  # noqa: E402
+    install_exception_handler,
+    progress,
+    report_config,
+    report_result,
+)
+from PySide6.QtCore import QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication, QMessageBox, QWidget  # noqa: E402
+from qasync import QEventLoop  # noqa: E402
+from ui.ui_builder import UIBuilder  # noqa: E402
+from ui.ui_handler import UIHandler  # noqa: E402
+
+startup.mark("import")
+if imports:
+    imports.report()
 
 
 class SideSuction(QWidget, UIBuilder, UIHandler):
@@ -23,9 +48,12 @@ class SideSuction(QWidget, UIBuilder, UIHandler):
         self.selectedExts = set()
         self.selectedFilePaths = []
         self.selectedFileIndexes = {}
+        self.rawContent = ""
+        self.isContentMinified = False
+        self.currentMatchIndex = 0
+        self.selection_manager = SelectionManager()
         self.init_ui_builder()
         progress.set_progress_bar(self.progressBar)
-        self.selection_manager = SelectionManager()
 
         self.init_ui_handler()
         self.setWindowProps()
@@ -42,6 +70,10 @@ class SideSuction(QWidget, UIBuilder, UIHandler):
         self.y = (self.full_height - self.height) >> 1
         self.setGeometry(self.x, self.y, self.width, self.height)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        startup.finish("first paint")
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.adjustPanelSizes()
@@ -73,10 +105,16 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
+    install_exception_handler(loop)
+    report_config.loop = loop
+    report_config.alert = QMessageBox.warning
     window = SideSuction()
     report_config.parent = window
     report_config.callback = window.setHighlightColor
+    startup.mark("widget build")
     window.show()
+    # Автодополнение проектов заполняется уже после показа окна
+    QTimer.singleShot(0, window.loadProjectsAutoComplete)
     try:
         with loop:
             loop.run_forever()
@@ -0,0 +1,10 @@
+# .side_suction/tests/conftest.py
+
+import pytest
+from logic.status_manager import report_config
+
+
+@pytest.fixture(autouse=True)
+def restore_report_stream(monkeypatch):
+    # cli.main направляет сообщения в sys.stderr теста, который после теста закрыт
+    monkeypatch.setattr(report_config, "stream", report_config.stream)
@@ -0,0 +1,143 @@
+# .side_suction/tests/test_archive_source.py
+
+import asyncio
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from logic.archive_source import TarSource, ZipSource, member_path
+from logic.project_manager import ProjectManager
+from logic.project_source import FileTooLarge, parse_source_spec
+
+FILES = {
+    "proj/src/a.py": "print(1)\r\n",
+    "proj/src/b.py": "x = 'ü'\n",
+    "proj/big.txt": "z" * 500,
+    "proj/README.md": "# doc\n",
+}
+
+
+def write_archive(path: Path):
+    name = path.name
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("proj/", "")
+            for member, text in FILES.items():
+                zf.writestr(member, text.encode("utf-8"))
+        return
+    mode = "w:gz" if name.endswith(".tar.gz") else "w"
+    with tarfile.open(path, mode) as tar:
+        for member, text in FILES.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture(params=["drop.zip", "drop.tar", "drop.tar.gz"])
+def archive(request, tmp_path):
+    path = tmp_path / request.param
+    write_archive(path)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_list_and_read_in_requested_order(archive):
+    source = parse_source_spec(str(archive))
+    assert isinstance(source, ZipSource if archive.suffix == ".zip" else TarSource)
+    paths = await source.list_files()
+    assert sorted(p.as_posix() for p in paths) == sorted(FILES)
+    # порядок запроса обратный порядку в архиве
+    wanted = [
+        Path(p) for p in ("proj/src/b.py", "proj/missing.py", "proj/big.txt", "proj/src/a.py")
+    ]
+    results = [r async for r in source.read_files(wanted, max_size=100)]
+    assert [r[0] for r in results] == wanted
+    assert results[0][1:] == ("x = 'ü'\n", 9)
+    assert isinstance(results[1][1], FileNotFoundError)
+    assert isinstance(results[2][1], FileTooLarge)
+    assert results[3][1] == "print(1)\n"
+    assert await source.read_file(Path("proj/README.md")) == "# doc\n"
+    identities = await source.file_identities(wanted)
+    assert identities[Path("proj/big.txt")][1] == 500
+    await source.close()
+
+
+@pytest.mark.asyncio
+async def test_early_close_stops_reading(archive):
+    source = parse_source_spec(str(archive))
+    paths = await source.list_files()
+    reads = source.read_files(paths)
+    first = await reads.__anext__()
+    assert first[0] == paths[0]
+    await reads.aclose()
+    await source.close()
+
+
+@pytest.mark.asyncio
+async def test_extract_from_archive(tmp_path):
+    path = tmp_path / "drop.tar.gz"
+    write_archive(path)
+    manager = ProjectManager(parse_source_spec(str(path)))
+    await manager.scan_project()
+    items = manager.get_globbed_files(manager.filteredFiles, ["proj/src/*"])
+    content = await manager.extract_content(items)
+    assert "```proj/src/a.py\nprint(1)\n\n```" in content
+    assert "README" not in content
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_of_plain_tar(tmp_path):
+    # два чтения одновременно (граф импортов и выгрузка) не путают содержимое
+    path = tmp_path / "many.tar"
+    texts = {f"m/{i}.py": f"n = {i}\n" * (i % 7 + 1) for i in range(300)}
+    with tarfile.open(path, "w") as tar:
+        for member, text in texts.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    source = parse_source_spec(str(path))
+    paths = await source.list_files()
+
+    async def read_all(order):
+        return {rel.as_posix(): text async for rel, text, _ in source.read_files(order)}
+
+    first, second = await asyncio.gather(read_all(paths), read_all(paths[::-1]))
+    assert first == second == texts
+    await source.close()
+
+
+@pytest.mark.asyncio
+async def test_compressed_tar_bounds_buffered_reads(tmp_path, monkeypatch):
+    # сжатый tar в обратном порядке: без места в буфере — по проходу на файл
+    path = tmp_path / "drop.tar.gz"
+    write_archive(path)
+    source = parse_source_spec(str(path))
+    paths = await source.list_files()
+    passes = []
+    stream = TarSource._stream
+
+    def counting(self, wanted, max_size, stop=None):
+        passes.append(set(wanted))
+        return stream(self, wanted, max_size, stop)
+
+    monkeypatch.setattr(TarSource, "_stream", counting)
+    order = paths[::-1]
+    expected = [(rel, FILES[rel.as_posix()].replace("\r\n", "\n")) for rel in order]
+    results = [r[:2] async for r in source.read_files(order)]
+    assert results == expected and len(passes) == 1
+    passes.clear()
+    monkeypatch.setattr(TarSource, "READY_BYTES", 0)
+    results = [r[:2] async for r in source.read_files(order)]
+    assert results == expected and len(passes) == len(order)
+    await source.close()
+
+
+def test_member_path():
+    assert member_path("./a/b.py") == Path("a/b.py")
+    assert member_path("/abs/c.py") == Path("abs/c.py")
+    assert member_path("../evil.py") is None
+    assert parse_source_spec(__file__) is None
@@ -0,0 +1,66 @@
+# .side_suction/tests/test_batch_runner.py
+
+from config.settings import settings
+from logic.batch_runner import (
+    extract_selection,
+    filter_selections,
+    format_summary,
+    output_name,
+    worker_options,
+)
+
+
+def test_output_name_is_unique_per_project():
+    first = output_name("C:\\Users\\me\\proj")
+    second = output_name("/home/me/proj")
+    assert first.startswith("proj-") and first.endswith(".md")
+    assert first != second
+
+
+def test_filter_selections():
+    selections = {"C:\\work\\Tauri_App": {}, "/home/me/side": {}}
+    assert list(filter_selections(selections, ["*tauri*"])) == ["C:\\work\\Tauri_App"]
+    assert filter_selections(selections) == selections
+
+
+def test_extract_selection_writes_bundle(tmp_path):
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "a.py").write_text("print(1)", encoding="utf-8")
+    (root / "b.txt").write_text("skip", encoding="utf-8")
+    selection = {"project_path": str(root), "extensions": [".py"], "files": []}
+
+    # Вызываем рабочую функцию в текущем процессе — так же она работает в пуле
+    summary = extract_selection(str(root), selection, str(tmp_path / "out"))
+
+    assert summary["failure"] is None
+    assert (summary["files"], summary["errors"]) == (1, 0)
+    bundle = (tmp_path / "out" / output_name(str(root))).read_text(encoding="utf-8")
+    assert bundle == "```a.py\nprint(1)\n```\n"
+
+
+def test_extract_selection_reports_failure(tmp_path):
+    summary = extract_selection("missing", {"project_path": "nowhere"}, str(tmp_path))
+    assert summary["failure"]
+    assert summary["errors"] == 1
+    assert "missing" in format_summary([summary], 0.1)
+
+
+def test_extract_selection_applies_worker_options(tmp_path, monkeypatch):
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "a.py").write_text('def f():\n    """Doc."""\n    return 1\n', encoding="utf-8")
+    (root / "b.py").write_text("print(2)", encoding="utf-8")
+    (root / "c.js").write_text("x  \n\n\n\ny", encoding="utf-8")
+    monkeypatch.setattr(settings, "outlineMode", True)
+    options = worker_options(include=["*.py", "*.js"], exclude=["b.py"], minify=True)
+    # процесс пула начинает с настроек по умолчанию: флаги CLI приходят в options
+    monkeypatch.setattr(settings, "outlineMode", False)
+    selection = {"project_path": str(root), "files": []}
+    summary = extract_selection(str(root), selection, str(tmp_path / "out"), options)
+
+    assert summary["failure"] is None
+    assert settings.outlineMode is True
+    bundle = (tmp_path / "out" / output_name(str(root))).read_text(encoding="utf-8")
+    # скелет без тела, затем минификация без докстроки
+    assert bundle == "```a.py\ndef f():\n    ...\n```\n```c.js\nx\n\ny\n```\n"
@@ -0,0 +1,81 @@
+# .side_suction/tests/test_cli.py
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import cli
+import pytest
+from config.settings import settings
+from logic.project_source import GitHubSource, LocalSource, parse_source_spec
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "src").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "a.py").write_text("print(1)", encoding="utf-8")
+    (root / "src" / "b.py").write_text("x = 1", encoding="utf-8")
+    (root / "docs" / "readme.md").write_text("# doc", encoding="utf-8")
+    return root
+
+
+def test_parse_source_spec(project):
+    assert isinstance(parse_source_spec(str(project)), LocalSource)
+    github = parse_source_spec("owner/repo#dev")
+    assert isinstance(github, GitHubSource)
+    assert str(github) == "owner/repo#dev"
+    assert parse_source_spec("nothing-here") is None
+
+
+def test_extract_with_globs(project, capsys, monkeypatch):
+    monkeypatch.setattr(settings, "databasePath", project / "missing.json")
+    code = cli.main([str(project), "--include", "src/*", "--exclude", "*b.py"])
+    out = capsys.readouterr().out
+    assert code == 0
+    assert out == "```src/a.py\nprint(1)\n```\n"
+
+
+def test_extract_saved_selection_to_file(project, tmp_path, monkeypatch):
+    # Выборка сохранена под Windows — пути с обратными слэшами
+    db = tmp_path / "selections.json"
+    db.write_text(
+        json.dumps(
+            {"demo": {"project_path": str(project), "files": ["docs\\readme.md"]}}
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(settings, "databasePath", db)
+    output = tmp_path / "bundle.md"
+    assert cli.main(["--selection", "demo", "-o", str(output)]) == 0
+    assert output.read_text(encoding="utf-8") == "```docs/readme.md\n# doc\n```\n"
+
+
+def test_dedup_flag(project, capsys, monkeypatch):
+    monkeypatch.setattr(settings, "databasePath", project / "missing.json")
+    monkeypatch.setattr(settings, "dedupFiles", False)
+    (project / "src" / "copy.py").write_text("print(1)", encoding="utf-8")
+    assert cli.main([str(project), "--include", "src/*", "--dedup"]) == 0
+    assert "```src/copy.py\n[duplicate of src/a.py]\n```" in capsys.readouterr().out
+
+
+def test_unknown_selection(project, monkeypatch):
+    monkeypatch.setattr(settings, "databasePath", project / "missing.json")
+    assert cli.main(["--selection", "nope"]) == 2
+
+
+def test_cli_does_not_import_qt():
+    # Отдельный процесс: в сессии pytest PySide6 уже загружен другими тестами
+    check = "import sys, cli; sys.exit(any(m.startswith('PySide6') for m in sys.modules))"
+    root = Path(cli.__file__).parent
+    assert subprocess.run([sys.executable, "-c", check], cwd=root).returncode == 0
+
+
+def test_closure_flag(project, capsys, monkeypatch):
+    monkeypatch.setattr(settings, "databasePath", project / "missing.json")
+    (project / "src" / "a.py").write_text("from b import x\nprint(x)", encoding="utf-8")
+    assert cli.main([str(project), "--include", "src/a.py", "--closure"]) == 0
+    out = capsys.readouterr().out
+    assert out == "```src/a.py\nfrom b import x\nprint(x)\n```\n```src/b.py\nx = 1\n```\n"
@@ -0,0 +1,72 @@
+# .side_suction/tests/test_content_classifier.py
+
+from pathlib import Path
+
+import pytest
+from logic.content_classifier import (
+    BINARY,
+    GENERATED,
+    TEXT,
+    classify_name,
+    classify_sample,
+)
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+
+@pytest.mark.parametrize(
+    "name, kind",
+    [
+        ("img/logo.PNG", BINARY),
+        ("target/debug/libfoo.rlib", BINARY),
+        ("Cargo.lock", GENERATED),
+        ("web/package-lock.json", GENERATED),
+        ("dist/app.min.js", GENERATED),
+        ("src/main.py", None),
+    ],
+)
+def test_classify_name(name, kind):
+    result = classify_name(Path(name))
+    assert (result[0] if result else None) == kind
+
+
+def test_classify_sample():
+    assert classify_sample(b"")[0] == TEXT
+    assert classify_sample(b"def f():\n    return 1\n")[0] == TEXT
+    assert classify_sample("привет\n".encode("cp1251"))[0] == TEXT
+    assert classify_sample(b"\x7fELF\x02\x01\x00\x00")[0] == BINARY
+    assert classify_sample(bytes(range(1, 8)) * 10)[0] == BINARY
+    assert classify_sample(b"// Code generated by protoc. DO NOT EDIT.\n")[0] == GENERATED
+    assert classify_sample(b"var a=1;" * 400)[0] == GENERATED
+
+
+@pytest.mark.asyncio
+async def test_classification_is_cached_by_identity(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("text", encoding="utf-8")
+    (tmp_path / "b.dat").write_bytes(b"\x00\x01")
+    manager = ProjectManager(LocalSource(str(tmp_path)))
+    kinds = await manager.classify_files([Path("a.txt"), Path("b.dat")])
+    assert kinds[Path("a.txt")] == (TEXT, "", 4)
+    assert kinds[Path("b.dat")][0] == BINARY
+
+    # Неизменённые файлы повторно не читаются
+    async def no_reads(rel_paths, limit):
+        assert not rel_paths, "head read again"
+        return
+        yield
+
+    monkeypatch.setattr(manager.source, "read_heads", no_reads)
+    assert await manager.classify_files([Path("a.txt"), Path("b.dat")]) == kinds
+
+
+@pytest.mark.asyncio
+async def test_extraction_summarizes_binary(tmp_path):
+    (tmp_path / "a.txt").write_text("text", encoding="utf-8")
+    (tmp_path / "b.dat").write_bytes(b"\x00\x01")
+    manager = ProjectManager(LocalSource(str(tmp_path)))
+    items = [(Path("a.txt"), None), (Path("b.dat"), None)]
+    content = await manager.extract_content(items)
+    assert content == (
+        "```a.txt\ntext\n```\n```b.dat\n[binary file skipped: NUL bytes, 2 bytes]\n```"
+    )
+    assert manager.extractStats["skipped"] == 1
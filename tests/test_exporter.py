@@ -0,0 +1,64 @@
+# .side_suction/tests/test_exporter.py
+
+import io
+from pathlib import Path
+
+import cli
+import pytest
+from config.settings import settings
+from logic.exporter import export_to_clipboard, export_to_file, iter_chunks, write_chunks
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+
+class FakeClipboard:
+    def __init__(self):
+        self.text = None
+
+    def clear(self):
+        self.text = ""
+
+    def setText(self, text):
+        self.text = text
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "a.py").write_text("x = 1  # one\n", encoding="utf-8")
+    (root / "b.txt").write_text("b,\nc", encoding="utf-8")
+    return root
+
+
+@pytest.mark.asyncio
+async def test_chunks_match_extracted_content(project, tmp_path):
+    manager = ProjectManager(LocalSource(str(project)))
+    content = await manager.extract_content([(Path("a.py"), None), (Path("b.txt"), None)])
+    files = await manager.export_files()
+    assert "".join(iter_chunks(files)) == content
+
+    # Буфер обмена и файл получают то же, что показывал бы редактор
+    clipboard = FakeClipboard()
+    assert export_to_clipboard(iter_chunks(files), clipboard) == len(content)
+    assert clipboard.text == content
+    output = tmp_path / "out.md"
+    export_to_file(iter_chunks(files), output)
+    assert output.read_text(encoding="utf-8") == content + "\n"
+
+    minified = await manager.export_files(minified=True)
+    assert "".join(iter_chunks(minified)) == manager.minify_content(content)
+
+
+def test_write_chunks_minifies_on_the_fly():
+    out = io.StringIO()
+    chunks = ["```a.py\nx = 1  # c\n", "\n```", "\n```b.js\nb,  \nc\n```"]
+    written = write_chunks(chunks, out, minify=True, final_newline=True)
+    assert out.getvalue() == "```a.py\nx = 1\n```\n```b.js\nb,\nc\n```\n"
+    assert written == len(out.getvalue())
+
+
+def test_cli_minify(project, capsys, monkeypatch):
+    monkeypatch.setattr(settings, "databasePath", project / "missing.json")
+    assert cli.main([str(project), "--include", "*.py", "--minify"]) == 0
+    assert capsys.readouterr().out == "```a.py\nx = 1\n```\n"
@@ -0,0 +1,131 @@
+# .side_suction/tests/test_extraction_manifest.py
+
+import os
+from pathlib import Path
+
+import pytest
+from config.settings import settings
+from logic.extraction_manifest import ExtractionManifest, unified_diff
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "manifestsPath", tmp_path / "db" / "manifests")
+    root = tmp_path / "proj"
+    root.mkdir()
+    for name in "abc":
+        (root / f"{name}.txt").write_text(f"{name}1\n{name}2\n{name}3", encoding="utf-8")
+    return root
+
+
+def items(*names):
+    return [(Path(f"{name}.txt"), None) for name in names]
+
+
+async def changes(root, *names):
+    manager = ProjectManager(LocalSource(str(root)))
+    pieces = [piece async for piece in manager.iter_changes(items(*names))]
+    return manager, pieces
+
+
+@pytest.mark.asyncio
+async def test_changes_since_previous_run(project):
+    # первый запуск — всё новое
+    manager, pieces = await changes(project, "a", "b", "c")
+    assert len(pieces) == 3 and manager.changeStats["added"] == 3
+    (project / "b.txt").write_text("b1\nB2\nb3", encoding="utf-8")
+    (project / "d.txt").write_text("d", encoding="utf-8")
+    (project / "c.txt").unlink()
+    manager, pieces = await changes(project, "a", "b", "d")
+    assert pieces == [
+        "```b.txt\n--- a/b.txt\n+++ b/b.txt\n@@ -1,3 +1,3 @@\n b1\n-b2\n+B2\n b3\n```",
+        "```d.txt\nd\n```",
+        "```c.txt\n[removed]\n```",
+    ]
+    stats = manager.changeStats
+    assert (stats["unchanged"], stats["modified"], stats["added"], stats["removed"]) == (1, 1, 1, 1)
+    # выведенное — основа для копирования и экспорта
+    assert [path for path, _ in manager.extractedFiles] == ["b.txt", "d.txt", "c.txt"]
+    _, pieces = await changes(project, "a", "b", "d")
+    assert pieces == []
+
+
+@pytest.mark.asyncio
+async def test_touched_file_is_read_but_not_emitted(project):
+    await changes(project, "a")
+    # та же длина, другой mtime — читается, но хеш тот же
+    path = project / "a.txt"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    manager, pieces = await changes(project, "a")
+    assert pieces == [] and manager.changeStats["unchanged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_extraction_records_manifest(project):
+    manager = ProjectManager(LocalSource(str(project)))
+    await manager.extract_content(items("a", "b"))
+    await manager.record_manifest()
+    manifest = ExtractionManifest.load(str(manager.source))
+    assert sorted(manifest.files) == ["a.txt", "b.txt"]
+    assert manifest.read_blob(manifest.files["a.txt"].hash) == "a1\na2\na3"
+    _, pieces = await changes(project, "a", "b")
+    assert pieces == []
+    # тела, на которые манифест больше не ссылается, удаляются
+    (project / "a.txt").write_text("new", encoding="utf-8")
+    await changes(project, "a")
+    assert len(list((manifest.root / "blobs").glob("*.z"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_other_selection_is_not_removed(project):
+    await changes(project, "a", "b")
+    # другая выборка того же проекта не объявляет файлы первой удалёнными
+    manager, pieces = await changes(project, "c")
+    assert pieces == ["```c.txt\nc1\nc2\nc3\n```"] and manager.changeStats["removed"] == 0
+    _, pieces = await changes(project, "a", "b")
+    assert pieces == []
+
+
+def test_unified_diff_without_trailing_newline():
+    assert unified_diff("x", "a", "b") == "--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n+b"
+
+
+@pytest.mark.asyncio
+async def test_outline_run_records_source_text(project, monkeypatch):
+    source = "def f():\n    return 1\n\n\ndef g():\n    return 2\n"
+    (project / "m.py").write_text(source, encoding="utf-8")
+    manager = ProjectManager(LocalSource(str(project)))
+    monkeypatch.setattr(settings, "outlineMode", True)
+    pieces = [piece async for piece in manager.iter_changes([(Path("m.py"), None)])]
+    assert "return" not in pieces[0]  # вывод — скелет
+    monkeypatch.setattr(settings, "outlineMode", False)
+    (project / "m.py").write_text(source.replace("return 2", "return 3"), encoding="utf-8")
+    pieces = [piece async for piece in manager.iter_changes([(Path("m.py"), None)])]
+    # diff к исходному тексту: нетронутая f не выглядит изменённой
+    assert pieces == [
+        "```m.py\n--- a/m.py\n+++ b/m.py\n@@ -3,4 +3,4 @@\n \n \n def g():\n"
+        "-    return 2\n+    return 3\n```"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_truncated_run_then_edit(project, monkeypatch):
+    (project / "long.txt").write_text("".join(f"line {i}\n" for i in range(200)), encoding="utf-8")
+    monkeypatch.setattr(settings, "tokenBudget", 50)
+    monkeypatch.setattr(settings, "budgetPolicy", "truncate")
+    manager = ProjectManager(LocalSource(str(project)))
+    await manager.extract_content([(Path("long.txt"), None)])
+    assert "truncated" in manager.extractedFiles[0][1]
+    await manager.record_manifest()
+
+    monkeypatch.setattr(settings, "tokenBudget", 0)
+    text = (project / "long.txt").read_text(encoding="utf-8")
+    (project / "long.txt").write_text(text.replace("line 150\n", "line 150!\n"), encoding="utf-8")
+    pieces = [piece async for piece in manager.iter_changes([(Path("long.txt"), None)])]
+    assert len(pieces) == 1
+    assert "-line 150\n+line 150!\n" in pieces[0]
+    # основа — полный текст, а не обрезанный бюджетом
+    assert "truncated" not in pieces[0] and "line 199" not in pieces[0]
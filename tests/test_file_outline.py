@@ -0,0 +1,71 @@
+# .side_suction/tests/test_file_outline.py
+
+import random
+from pathlib import Path
+
+import pytest
+from logic.exporter import iter_chunks
+from logic.file_outline import FileOutline, OutlineEntry, fuzzy_score
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+
+def test_outline_from_files_matches_text():
+    rnd = random.Random(40)
+    for _ in range(100):
+        files = [
+            (f"dir/f{i}.py", "\n".join("ü" * rnd.randint(0, 3) for _ in range(rnd.randint(1, 4))))
+            for i in range(rnd.randint(0, 6))
+        ]
+        text = "".join(iter_chunks(files))
+        assert FileOutline.from_files(files).entries == FileOutline.from_text(text).entries
+        # номера строк совпадают с номерами блоков документа
+        lines = text.split("\n")
+        for entry in FileOutline.from_files(files):
+            assert lines[entry.start] == f"```{entry.path}" and lines[entry.end] == "```"
+
+
+def test_append_grows_outline_as_pieces_arrive():
+    # оглавление потоковой выгрузки совпадает с оглавлением готового текста на каждом шаге
+    files = [("a.py", "x\ny"), ("b.md", ""), ("c/d.txt", "1\n2\n3")]
+    outline = FileOutline()
+    for size, (path, body) in enumerate(files, 1):
+        entry = outline.append(path, body)
+        text = "\n".join(f"```{p}\n{b}\n```" for p, b in files[:size])
+        assert outline.entries == FileOutline.from_text(text).entries
+        assert outline.file_at(entry.end) is entry and outline.starting_at(entry.start) is entry
+
+
+def test_outline_lookup():
+    outline = FileOutline.from_files([("a.py", "x\ny"), ("b.md", "z")])
+    assert [outline.file_at(line) for line in range(7)] == [
+        outline.entries[0]] * 4 + [outline.entries[1]] * 3
+    assert outline.file_at(7) is None
+    assert outline.starting_at(4).path == "b.md"
+    assert outline.starting_at(1) is None
+
+
+def test_unclosed_fence_runs_to_the_end():
+    outline = FileOutline.from_text("intro\n```a.py\nx\n\n")
+    assert outline.entries == [OutlineEntry("a.py", 1, 4, 3, 3)]
+    assert outline.file_at(0) is None
+
+
+def test_fuzzy_ranking():
+    paths = ["src/main.py", "src/ui/main_window.py", "docs/domain.md", "tests/test_main.py"]
+    outline = FileOutline(OutlineEntry(p, i * 10, i * 10 + 5, 0, 1) for i, p in enumerate(paths))
+    assert [e.path for e in outline.fuzzy("main")][0] == "src/main.py"
+    assert [e.path for e in outline.fuzzy("mwin")] == ["src/ui/main_window.py"]
+    assert fuzzy_score("xyz", "src/main.py") is None
+    assert len(outline.fuzzy("", limit=2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_outline_is_built_from_extraction(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "b.json").write_text('{ "b": 2 }', encoding="utf-8")
+    manager = ProjectManager(LocalSource(str(tmp_path)))
+    raw = await manager.extract_content([(Path("a.py"), None), (Path("b.json"), None)])
+    assert manager.build_outline().entries == FileOutline.from_text(raw).entries
+    minified = await manager.start_minify()
+    assert manager.build_outline(minified=True).entries == FileOutline.from_text(minified).entries
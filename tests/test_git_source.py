@@ -0,0 +1,90 @@
+# .side_suction/tests/test_git_source.py
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from logic.git_source import GitError, GitSource, apply_delta
+from logic.project_source import FileTooLarge, parse_source_spec
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-C", str(repo), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q", "-b", "main")
+    body = "".join(f"line {i}\n" for i in range(300))
+    (root / "src").mkdir()
+    (root / "src" / "a.py").write_text(body, encoding="utf-8")
+    (root / "README.md").write_text("# v1\n", encoding="utf-8")
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", "v1")
+    git(root, "tag", "-a", "v1", "-m", "release")
+    # похожая версия — при repack станет дельтой
+    (root / "src" / "a.py").write_text(body.replace("line 150", "LINE 150"), encoding="utf-8")
+    (root / "src" / "b.txt").write_text("ü\r\n", encoding="utf-8")
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", "v2")
+    return root
+
+
+async def snapshot(source):
+    paths = await source.list_files()
+    texts = {rel.as_posix(): text async for rel, text, _ in source.read_files(paths)}
+    await source.close()
+    return texts
+
+
+def expected(repo, ref):
+    paths = git(repo, "ls-tree", "-r", "--name-only", ref).splitlines()
+    return {
+        path: git(repo, "show", f"{ref}:{path}").replace("\r\n", "\n") + "\n" for path in paths
+    }
+
+
+@pytest.mark.asyncio
+async def test_loose_and_packed_objects_match_git(repo):
+    for ref in ("main", "v1", git(repo, "rev-parse", "--short", "v1^{commit}")):
+        assert await snapshot(GitSource(str(repo), ref)) == expected(repo, ref)
+    # pack с дельтами и packed-refs вместо loose-ссылок
+    git(repo, "repack", "-a", "-d", "-f", "--depth=10", "--window=10")
+    git(repo, "pack-refs", "--all")
+    git(repo, "prune")
+    assert not list((repo / ".git" / "objects").glob("??/*"))
+    for ref in ("main", "v1", "tags/v1", git(repo, "rev-parse", "--short", "main~1")):
+        assert await snapshot(GitSource(str(repo), ref)) == expected(repo, ref)
+
+
+@pytest.mark.asyncio
+async def test_spec_identities_and_limits(repo):
+    source = parse_source_spec(f"{repo}#v1")
+    assert isinstance(source, GitSource) and str(source) == f"{repo}#v1"
+    paths = await source.list_files()
+    assert [p.as_posix() for p in paths] == ["README.md", "src/a.py"]
+    identities = await source.file_identities(paths)
+    readme = git(repo, "rev-parse", "v1:README.md")
+    assert identities[Path("README.md")] == (("git", readme), 5)
+    results = [r async for r in source.read_files(paths, max_size=100)]
+    assert results[0][1] == "# v1\n" and isinstance(results[1][1], FileTooLarge)
+    with pytest.raises(GitError):
+        await GitSource(str(repo), "no-such-branch").list_files()
+    await source.close()
+
+
+def test_apply_delta():
+    base = b"hello world"
+    # copy 6 байт с 0, insert "there", copy "world"
+    delta = bytes([11, 16, 0x90, 6]) + bytes([5]) + b"there" + bytes([0x91, 6, 5])
+    assert apply_delta(base, delta) == b"hello thereworld"
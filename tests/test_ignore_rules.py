@@ -0,0 +1,104 @@
+# .side_suction/tests/test_ignore_rules.py
+
+import os
+
+import pytest
+from config.settings import settings
+from logic.ignore_rules import IgnoreMatcher, parse_rules, walk_files
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+TREE = {
+    ".gitignore": "# комментарий\n*.log\n!keep.log\nbuild/\n/top.txt\ndocs/**/tmp\n",
+    ".git/info/exclude": "secret.txt\n",
+    ".git/HEAD": "ref: refs/heads/main\n",
+    "a.log": "",
+    "keep.log": "",
+    "top.txt": "",
+    "secret.txt": "",
+    "src/top.txt": "",
+    "src/build/out.js": "",
+    "src/build.py": "",
+    "docs/a/tmp/x.md": "",
+    "docs/readme.md": "",
+    "node_modules/pkg/index.js": "",
+    "web/.ignore": "!debug.log\n",
+    "web/.gitignore": "/node_modules\ncache\n",
+    "web/debug.log": "",
+    "web/cache": "",
+    "web/node_modules/pkg/index.js": "",
+    "web/lib/node_modules/pkg/index.js": "",
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name, text in TREE.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    (tmp_path / ".gitignore").write_text(
+        TREE[".gitignore"] + "node_modules/\n!web/lib/node_modules/\n!src/build/out.js\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+def test_matcher_last_rule_wins():
+    matcher = IgnoreMatcher(parse_rules("*.py\n!keep*.py\nkeep_not.py\n[!a]b.c\nfoo\\ \n"))
+    assert matcher.match("x/mod.py", False) is True
+    assert matcher.match("keep_me.py", False) is False
+    assert matcher.match("keep_not.py", False) is True
+    assert matcher.match("README.md", False) is None
+    assert matcher.match("zb.c", False) is True
+    assert matcher.match("ab.c", False) is None
+    assert matcher.match("foo ", False) is True
+    # правила "x/" — только для папок
+    dirs = IgnoreMatcher(parse_rules("out/\n"))
+    assert dirs.match("out", False) is None
+    assert dirs.match("a/out", True) is True
+
+
+def test_walk_prunes_ignored(project):
+    files = sorted(path.as_posix() for path in walk_files(project))
+    assert files == [
+        ".gitignore",
+        "docs/readme.md",
+        "keep.log",
+        "src/build.py",
+        "src/top.txt",
+        "web/.gitignore",
+        "web/.ignore",
+        "web/debug.log",
+        "web/lib/node_modules/pkg/index.js",
+    ]
+    # отрицание возвращает папку, но не файл из отсечённой папки (src/build) — как у git
+    assert len(walk_files(project, respect_ignore=False)) == len(TREE)
+
+
+def test_ignored_subtree_is_not_walked(project, monkeypatch):
+    walked = []
+    real_walk = os.walk
+
+    def spy(top):
+        for entry in real_walk(top):
+            walked.append(os.path.relpath(entry[0], project).replace(os.sep, "/"))
+            yield entry
+
+    monkeypatch.setattr("logic.ignore_rules.os.walk", spy)
+    walk_files(project)
+    assert not any(d.startswith(("node_modules", ".git", "src/build")) for d in walked)
+    assert "web/node_modules" not in walked
+
+
+@pytest.mark.asyncio
+async def test_scan_respects_setting(project, monkeypatch):
+    manager = ProjectManager(LocalSource(str(project)))
+    data = await manager.scan_project()
+    paths = {rel.as_posix() for rel, _ in data["filteredFiles"]}
+    assert "a.log" not in paths and "web/debug.log" in paths
+    dirs = {d.as_posix() for d in data["filteredDirs"]}
+    assert not dirs & {"node_modules", "src/build", ".git", "web/node_modules"}
+
+    monkeypatch.setattr(settings, "respectGitignore", False)
+    data = await manager.scan_project()
+    assert len(data["filteredFiles"]) == len(TREE)
@@ -0,0 +1,147 @@
+# .side_suction/tests/test_import_graph.py
+
+import asyncio
+import os
+
+import pytest
+from logic.import_graph import ImportGraph, parse_imports
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+from logic.status_manager import Listeners, progress
+
+FILES = {
+    "app.py": "from pkg import util\nimport pkg.models as m\nimport requests\n",
+    "pkg/__init__.py": "",
+    "pkg/util.py": "from .models import Model\nfrom . import helpers\n",
+    "pkg/models.py": "import os\n",
+    "pkg/helpers.py": "from ... import up\n",  # выше корня проекта — игнорируется
+    "src/lib/__init__.py": "",
+    "src/lib/core.py": "from lib import extra\n",
+    "src/lib/extra.py": "",
+    "web/main.ts": "import { a } from './a.js';\nimport b from './b';\nimport 'react';\n",
+    "web/a.ts": "export * from './widgets';\n",
+    "web/b.tsx": "const c = require('../web/c');\n",
+    "web/c.js": "",
+    "web/widgets/index.ts": "",
+    "docs/readme.md": "import nothing from './x'",
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name, text in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return tmp_path
+
+
+def test_parse_imports():
+    assert parse_imports("a.py", "from .. import x, y\nimport a.b\n") == (
+        ("py", 2, "", ("x", "y")),
+        ("py", 0, "a.b", ()),
+    )
+    assert parse_imports("a.py", "def broken(:\n") == ()
+    assert parse_imports("gen.py", "x = (" + "1 +\n" * 100_000 + "1)\n") == ()
+    assert parse_imports("a.ts", "export { x } from \"./x\";\nawait import('./lazy')") == (
+        ("js", "./x"),
+        ("js", "./lazy"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_closure_and_incremental_update(project):
+    source = LocalSource(str(project))
+    graph = ImportGraph()
+    paths = await source.list_files()
+    assert await graph.update(source, paths) == 13
+    assert graph.closure(["app.py"]) == [
+        "app.py",
+        "pkg/__init__.py",
+        "pkg/models.py",
+        "pkg/util.py",
+        "pkg/helpers.py",
+    ]
+    # корень src/ не является пакетом — "lib" разрешается от него
+    assert graph.closure(["src/lib/core.py"]) == [
+        "src/lib/core.py",
+        "src/lib/__init__.py",
+        "src/lib/extra.py",
+    ]
+    assert graph.closure(["web/main.ts"]) == [
+        "web/main.ts",
+        "web/a.ts",
+        "web/b.tsx",
+        "web/widgets/index.ts",
+        "web/c.js",
+    ]
+
+    # разбирается заново только изменённый файл
+    changed = project / "pkg" / "models.py"
+    changed.write_text("from pkg import helpers\nimport os\n", encoding="utf-8")
+    stat = changed.stat()
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert await graph.update(source, paths) == 1
+    assert "pkg/helpers.py" in graph.edges["pkg/models.py"]
+
+    # удалённый файл пропадает из графа и рёбер
+    (project / "web" / "c.js").unlink()
+    paths = await source.list_files()
+    assert await graph.update(source, paths) == 0
+    assert graph.closure(["web/b.tsx"]) == ["web/b.tsx"]
+
+
+@pytest.mark.asyncio
+async def test_import_closure_in_process_pool(project, monkeypatch):
+    monkeypatch.setattr("logic.project_manager.IMPORT_POOL_FILES", 0)
+    manager = ProjectManager(LocalSource(str(project)))
+    await manager.scan_project()
+    items = await manager.import_closure(["pkg\\util.py", "docs/readme.md"])
+    assert [rel.as_posix() for rel, _ in items] == [
+        "pkg/util.py",
+        "docs/readme.md",
+        "pkg/__init__.py",
+        "pkg/helpers.py",
+        "pkg/models.py",
+    ]
+    assert all(full == project / rel for rel, full in items)
+
+
+@pytest.mark.asyncio
+async def test_failed_graph_build_is_retried(project, monkeypatch):
+    manager = ProjectManager(LocalSource(str(project)))
+    await manager.scan_project()
+
+    def broken(files):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr("logic.import_graph.parse_batch", broken)
+    with pytest.raises(OSError):
+        await manager.import_closure(["app.py"])
+    assert manager._graphTask is None
+    monkeypatch.undo()
+    items = await manager.import_closure(["pkg/models.py"])
+    assert [rel.as_posix() for rel, _ in items] == ["pkg/models.py"]
+
+
+@pytest.mark.asyncio
+async def test_rescan_cancels_stale_graph_build(project, monkeypatch):
+    monkeypatch.setattr(progress, "updated", Listeners())
+    emitted, graph_status = [], []
+    progress.updated.connect(lambda value, status: emitted.append(status))
+    manager = ProjectManager(LocalSource(str(project)))
+    manager.graphUpdated.connect(graph_status.append)
+    await manager.scan_project()
+    empty = manager.importGraph
+    stale = manager.start_import_graph()
+    closure = asyncio.ensure_future(manager.import_closure(["pkg/models.py"]))
+    await asyncio.sleep(0)
+    # пересканирование отменяет сборку, а ожидающее замыкание дожидается новой
+    await manager.scan_project()
+    items = await closure
+    assert stale.cancelled()
+    assert [rel.as_posix() for rel, _ in items] == ["pkg/models.py"]
+    # прежний граф не дополнялся: новый подменил его целиком
+    assert not empty.parsed and manager.importGraph is not empty
+    assert len(graph_status) == 1 and graph_status[0].startswith("Import Graph |")
+    assert not any(status.startswith("Import Graph") for status in emitted)
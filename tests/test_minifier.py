@@ -0,0 +1,239 @@
+# .side_suction/tests/test_minifier.py
+
+import random
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from logic.minifier import (
+    StreamingMinifier,
+    format_savings,
+    minify_files,
+    minify_stream,
+    minify_text,
+    profile_for,
+    strip_python,
+)
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+
+
+def legacy_minify(content: str) -> str:
+    """Прежняя реализация ProjectManager.minify_content — эталон для сравнения."""
+    if not content:
+        return content
+    content = ", ".join([line.strip() for line in content.split(",\n")])
+    content = content.replace("\n\n", "\n")
+    tag_pattern = re.compile(r"<(/?[A-Za-z][A-Za-z0-9\-]*)(.*?)(/?)>", re.DOTALL)
+
+    def repl(m):
+        tag_name, inner, slash = m.groups()
+        inner = re.sub(r"[\r\n]+", " ", inner)
+        inner = re.sub(r"\s{2,}", " ", inner).strip()
+        return f"<{tag_name} {inner}{slash}>" if inner else f"<{tag_name}{slash}>"
+
+    content = tag_pattern.sub(repl, content)
+    return re.sub(r"^[ \t]+(?=<)", "", content, flags=re.MULTILINE)
+
+
+def feed_in_chunks(text, sizes, **kwargs):
+    minifier = StreamingMinifier(**kwargs)
+    out, pos = [], 0
+    for size in sizes:
+        out.append(minifier.feed(text[pos : pos + size]))
+        pos += size
+    out.append(minifier.feed(text[pos:]))
+    out.append(minifier.close())
+    return "".join(out)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "line1,\nline2,\nline3",
+        "  a ,\n  b,\n\n\n c  \n",
+        "a,\n",
+        "a,\n  ,\n",
+        ",\nb",
+        "<div\n   class='x'\n\n   id=1  />\n  <span>t</span>",
+        "x\n\n\n  <a\n,\n b>\n\n",
+        "some text without comma",
+        "",
+    ],
+)
+def test_parity_with_legacy(text):
+    assert minify_text(text) == legacy_minify(text)
+
+
+def test_parity_fuzz_with_chunking():
+    # Текст без оград: результат совпадает с прежним при любой нарезке на куски
+    rnd = random.Random(33)
+    alphabet = ["a", "b", ",", " ", "\t", "\n", "\n", "<", ">", "/", "p", "=", "'"]
+    for _ in range(400):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 120)))
+        expected = legacy_minify(text)
+        assert minify_text(text) == expected, repr(text)
+        sizes = [rnd.randint(1, 9) for _ in range(rnd.randint(0, 20))]
+        assert feed_in_chunks(text, sizes, chunk_size=8) == expected, repr(text)
+
+
+def test_extraction_output_matches_legacy():
+    # Обычная выгрузка: тело файла заканчивается переводом строки перед "```"
+    text = "```web/index.html\n<div\n  class='a'\n  id='b'>\n    <p>x</p>\n</div>\n```"
+    assert minify_text(text) == legacy_minify(text)
+
+
+def test_code_profile_does_not_join_lines():
+    # Склейка по запятой переносила следующие строки внутрь "//"-комментария
+    rust = "```a.rs\nlet v = [\n    1, // one,\n    2,   \n];\n\n\n\nfn f() {}\n```"
+    assert minify_text(rust) == "```a.rs\nlet v = [\n    1, // one,\n    2,\n];\n\nfn f() {}\n```"
+    # в YAML перевод строки после запятой — граница значения
+    yaml = "```ci.yml\nname: build,\non: push\n```"
+    assert minify_text(yaml) == yaml
+    # .jsx/.tsx — код, а не разметка: тег не склеивает строки после "//"
+    tsx = "```a.tsx\n// a <b\nconst c = 1;\nconst d = <div\n  id={1}>;\n```"
+    assert minify_text(tsx) == tsx
+
+
+def test_prose_and_data_pass_through():
+    # "  \n" в Markdown — жёсткий перенос строки, пустые строки в YAML-блоке значимы
+    markdown = "```README.md\nfirst line  \nsecond line\n\n\n\nnext\n```"
+    yaml = "```ci.yml\nscript: |\n  echo a\n\n\n  echo b\n```"
+    assert minify_text(markdown) == markdown
+    assert minify_text(yaml) == yaml
+    assert profile_for("notes.TXT").name == "verbatim"
+
+
+def test_code_profile_keeps_string_literals():
+    # пустые строки и пробелы внутри многострочного литерала — часть значения
+    js = "```a.js\nconst s = `a  \n\n\n\nb`;   \n\n\n\nf(\"x\n\n\ny\");\n```"
+    assert minify_text(js) == "```a.js\nconst s = `a  \n\n\n\nb`;\n\nf(\"x\n\n\ny\");\n```"
+    # "'" в Rust и в комментарии не открывает многострочный литерал
+    rust = "```a.rs\nfn f<'a>(x: &'a str) {}   \n// don't\n\n\n\ng();\n```"
+    assert minify_text(rust) == "```a.rs\nfn f<'a>(x: &'a str) {}\n// don't\n\ng();\n```"
+
+
+def test_fences_are_kept_verbatim():
+    # Прежняя склейка по запятой съедала ограду: "x,\n```" -> "x, ```"
+    text = "```a.py\nx = (1,\n```\n```b.py\ny\n```"
+    assert legacy_minify(text).startswith("```a.py\nx = (1, ```")
+    assert minify_text(text) == "```a.py\nx = (1,\n```\n```b.py\ny\n```"
+
+
+def test_tags_collapsed_only_in_markup():
+    text = "```a.py\nif a <b and\n  c > d:\n```\n```b.vue\n<div\n  id=1>\n```"
+    assert minify_text(text) == "```a.py\nif a <b and\n  c > d:\n```\n```b.vue\n<div id=1>\n```"
+    assert profile_for("x.HTML").name == "markup"
+    assert profile_for("x.py").name == "python"
+    assert profile_for("x.rs").name == "code"
+    assert profile_for(None).name == "legacy"
+
+
+def test_stream_yields_before_end():
+    # Большой файл отдаётся по мере поступления, а не одним куском в конце
+    chunks = ["```a.txt\n"] + ["word,\nnext\n\n"] * 2000 + ["```"]
+    pieces = list(minify_stream(iter(chunks), chunk_size=1024))
+    assert len(pieces) > 10
+    assert "".join(pieces) == minify_text("".join(chunks))
+
+
+def test_unclosed_tag_is_held_until_closed():
+    text = "<div\n" + "  a=1\n" * 50 + ">\n"
+    assert feed_in_chunks(text, [7] * 60, chunk_size=16) == legacy_minify(text)
+
+
+PYTHON_SOURCE = '''#!/usr/bin/env python
+"""Module doc."""
+
+import os  # comment
+
+
+class Empty:
+    """Only a docstring."""
+
+
+def f(x):
+    """Doc
+
+    more."""
+    s = """keep
+
+      this"""   # trailing
+    return s, x  # done
+'''
+
+
+def test_python_profile_keeps_semantics():
+    stripped = strip_python(PYTHON_SOURCE)
+    assert stripped == (
+        "import os\n"
+        "class Empty:\n"
+        "    pass\n"
+        "def f(x):\n"
+        '    s = """keep\n'
+        "\n"
+        '      this"""\n'
+        "    return s, x\n"
+    )
+    scope = {}
+    exec(compile(stripped, "stripped", "exec"), scope)
+    assert scope["f"](1) == ("keep\n\n      this", 1)
+
+
+def test_python_profile_leaves_broken_code_alone():
+    text = "```a.py\ndef f(:\n    (1,\n\n\n```"
+    assert minify_text(text) == text
+
+
+def test_json_profile():
+    text = '```a.json\n{ "a" : [1, 2,\n  "b  c\\" "] }\n```\n```b.json\n{ oops,\n\n\n}\n```'
+    assert minify_text(text) == (
+        '```a.json\n{"a":[1,2,"b  c\\" "]}\n```\n```b.json\n{ oops,\n\n\n}\n```'
+    )
+
+
+def test_markup_profile_keeps_raw_blocks():
+    text = "```a.vue\n<div>\n  <!-- note -->\n  <pre>\n  x,\n\n</pre>\n</div>\n<script>\nif (a <b) {}\n</script>\n```"
+    assert minify_text(text) == (
+        "```a.vue\n<div>\n<pre>\n  x,\n\n</pre>\n</div>\n<script>\nif (a <b) {}\n</script>\n```"
+    )
+
+
+def test_savings_are_reported_per_profile():
+    minifier = StreamingMinifier()
+    minifier.minify("```a.py\n# comment\nx = 1\n```\n```b.json\n{ }\n```")
+    assert minifier.stats["python"] == [16, 6]
+    assert minifier.stats["json"] == [4, 3]
+    assert format_savings(minifier.stats) == "saved 11 bytes (52%): json -25%, python -62%"
+
+
+def test_minify_files_in_process_pool():
+    files = [("a.py", "x = 1  # c\n"), ("b.json", "[ 1 ]"), ("c.txt", "a,\nb")]
+    expected = [("x = 1", 11, 5), ("[1]", 5, 3), ("a,\nb", 4, 4)]
+    assert minify_files(files) == expected
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert minify_files(files, pool) == expected
+
+
+@pytest.mark.asyncio
+async def test_minified_variant_is_cached_per_file(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("x = 1  # one\n\n", encoding="utf-8")
+    (tmp_path / "b.json").write_text('{ "b": 2 }', encoding="utf-8")
+    manager = ProjectManager(LocalSource(str(tmp_path)))
+    items = [(Path("a.py"), None), (Path("b.json"), None)]
+    raw = await manager.extract_content(items)
+    minified = await manager.start_minify()
+    # Сборка из кэша по файлам совпадает с минификацией всего документа
+    assert minified == manager.minify_content(raw) == '```a.py\nx = 1\n```\n```b.json\n{"b":2}\n```'
+    assert await manager.get_minified_content() is minified
+    assert manager.minifyStats["python"][0] > manager.minifyStats["python"][1]
+
+    # Повторная выгрузка тех же файлов не минифицирует их заново
+    calls = []
+    monkeypatch.setattr(
+        "logic.project_manager.minify_files", lambda files, pool=None: calls.append(files) or []
+    )
+    await manager.extract_content(items)
+    assert await manager.get_minified_content() == minified
+    assert calls == []
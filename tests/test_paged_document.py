@@ -0,0 +1,41 @@
+# .side_suction/tests/test_paged_document.py
+
+from logic.exporter import iter_chunks
+from logic.paged_document import PagedDocument
+
+
+def make_files(count):
+    return [(f"src/f{i}.py", "\n".join(["x" * i] * (i % 7 + 1))) for i in range(count)]
+
+
+def test_windows_are_slices_of_the_virtual_document():
+    files = make_files(50)
+    full = "".join(iter_chunks(files))
+    lines = full.split("\n")
+    paged = PagedDocument(files, page_lines=20)
+    assert len(paged.pages) > 5
+    assert (paged.length, paged.lines) == (len(full), len(lines))
+    for line in range(paged.lines):
+        window = paged.window(line)
+        text = paged.text(window)
+        # окно — точный фрагмент полного текста, начинающийся с его строки window.line
+        assert full[window.char : window.char + len(text)] == text
+        assert lines[window.line] == text.split("\n")[0]
+        assert paged.contains(window, line)
+        assert window.line <= line < window.line + text.count("\n") + 1
+
+
+def test_pages_never_split_files_and_respect_char_limit():
+    files = make_files(30)
+    paged = PagedDocument(files, page_lines=10**9, page_chars=200)
+    assert [p.first for p in paged.pages] == sorted({p.first for p in paged.pages})
+    assert paged.pages[0].first == 0 and paged.pages[-1].last == len(files)
+    for page, following in zip(paged.pages, paged.pages[1:]):
+        assert page.last == following.first
+    window = paged.window(0, radius=0)
+    assert not paged.contains(window, paged.outline.entries[window.last].start)
+
+
+def test_empty_document():
+    paged = PagedDocument([])
+    assert paged.lines == 1 and paged.text(paged.window(0)) == ""
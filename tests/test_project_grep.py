@@ -0,0 +1,86 @@
+# .side_suction/tests/test_project_grep.py
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import cli
+import pytest
+from config.settings import settings
+from logic.project_grep import grep_items, grep_selections, grep_text
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+from logic.search_cache import SearchQuery
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "a.py").write_text("def main():\n    main_loop()\n", encoding="utf-8")
+    (root / "src" / "b.py").write_text("x = 1\n\n  main()  # main\n", encoding="utf-8")
+    (root / "src" / "c.bin").write_bytes(b"main\x00\x00")
+    (root / "notes.md").write_text("main notes", encoding="utf-8")
+    return root
+
+
+def test_grep_text_reports_first_match_per_line():
+    text = "a\n  foo bar foo\nbaz\nFoo"
+    assert grep_text(SearchQuery("foo"), text) == [(2, 3, "foo bar foo"), (4, 1, "Foo")]
+    assert grep_text(SearchQuery("foo", case=True), text) == [(2, 3, "foo bar foo")]
+    assert grep_text(SearchQuery(r"^b\w+", regex=True), text) == []
+
+
+@pytest.mark.asyncio
+async def test_grep_items_in_process_pool_keeps_read_order(project, monkeypatch):
+    # Пакеты по одному файлу: результаты всё равно идут в порядке чтения
+    monkeypatch.setattr("logic.project_grep.GREP_BATCH_BYTES", 1)
+    manager = ProjectManager(LocalSource(str(project)))
+    await manager.scan_project()
+    items = sorted(manager.filteredFiles)
+    query = SearchQuery("main", word=True)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        hits = [hit async for hit in grep_items(manager, items, query, "p", pool)]
+    # двоичный c.bin пропущен, как при выгрузке
+    assert [(h.path, h.line, h.column) for h in hits] == [
+        ("notes.md", 1, 1),
+        ("src/a.py", 1, 5),
+        ("src/b.py", 3, 3),
+    ]
+    assert hits[0].format() == "p:notes.md:1:1: main notes"
+
+
+@pytest.mark.asyncio
+async def test_grep_selections_uses_saved_filters(project, tmp_path, capsys):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "main.txt").write_text("no match here", encoding="utf-8")
+    selections = {
+        str(project): {"project_path": str(project), "extensions": [".py"], "files": []},
+        str(other): {"project_path": str(other), "files": ["main.txt"]},
+        "broken": {"project_path": "nowhere"},
+    }
+    hits = [hit async for hit in grep_selections(selections, SearchQuery("main()"))]
+    assert sorted((h.path, h.line) for h in hits) == [("src/a.py", 1), ("src/b.py", 3)]
+    assert {h.project for h in hits} == {str(project)}
+    # ошибки по проектам — одним сообщением в конце
+    assert capsys.readouterr().out == "broken: Invalid source: 'nowhere'\n"
+
+    errors = []
+    selections["gone"] = {"project_path": "also-nowhere"}
+    query = SearchQuery("main()")
+    hits = [hit async for hit in grep_selections(selections, query, errors=errors)]
+    assert len(hits) == 2
+    assert sorted(name for name, _ in errors) == ["broken", "gone"]
+    assert capsys.readouterr().out == ""
+
+
+def test_cli_grep(project, tmp_path, capsys, monkeypatch):
+    db = tmp_path / "selections.json"
+    db.write_text(json.dumps({"demo": {"project_path": str(project)}}), encoding="utf-8")
+    monkeypatch.setattr(settings, "databasePath", db)
+    assert cli.main([str(project), "--grep", "main_loop", "-j", "1"]) == 0
+    assert capsys.readouterr().out == "src/a.py:2:5: main_loop()\n"
+    assert cli.main(["--grep", "x = 1", "--include", "src/*", "-j", "1"]) == 0
+    assert capsys.readouterr().out == "demo:src/b.py:1:1: x = 1\n"
+    assert cli.main(["--grep", "absent", "-j", "1"]) == 1
+    assert cli.main(["--grep", "(", "--regex"]) == 2
@@ -0,0 +1,80 @@
+# .side_suction/tests/test_project_source.py
+
+from pathlib import Path
+
+import pytest
+from logic.project_source import FileTooLarge, LocalSource
+
+
+async def read_all(source, paths, max_size=None):
+    return [item async for item in source.read_files(paths, max_size)]
+
+
+@pytest.mark.asyncio
+async def test_read_files_enforces_size_before_reading(tmp_path):
+    (tmp_path / "small.txt").write_bytes(b"ok")
+    (tmp_path / "big.txt").write_bytes(b"x" * 100)
+    source = LocalSource(str(tmp_path))
+    results = await read_all(source, [Path("small.txt"), Path("big.txt")], max_size=10)
+    assert results[0] == (Path("small.txt"), "ok", 2)
+    rel, error, size = results[1]
+    assert isinstance(error, FileTooLarge) and size is None
+
+
+@pytest.mark.asyncio
+async def test_read_matches_text_mode(tmp_path):
+    # Как у open(..., "r", errors="replace"): универсальные переводы строк и замена
+    (tmp_path / "mixed.txt").write_bytes(b"a\r\nb\rc\n\xff")
+    source = LocalSource(str(tmp_path))
+    text = await source.read_file(Path("mixed.txt"))
+    assert text == "a\nb\nc\n�"
+
+
+@pytest.mark.asyncio
+async def test_large_files_and_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(LocalSource, "MMAP_THRESHOLD", 8)
+    monkeypatch.setattr(LocalSource, "BATCH_FILES", 2)
+    names = []
+    for i in range(5):
+        name = f"f{i}.txt"
+        (tmp_path / name).write_text("строка " * (i + 1), encoding="utf-8")
+        names.append(Path(name))
+    source = LocalSource(str(tmp_path))
+    results = await read_all(source, names + [Path("missing.txt")])
+    for i, (rel, text, size) in enumerate(results[:5]):
+        assert text == "строка " * (i + 1)
+        assert size == len(text.encode("utf-8"))
+    assert isinstance(results[5][1], FileNotFoundError)
+
+
+@pytest.mark.asyncio
+async def test_default_read_files_is_concurrent_and_ordered():
+    # Источник без своего read_files: чтения идут одновременно, порядок сохраняется
+    import asyncio
+
+    from logic.project_source import IProjectSource
+
+    class SlowSource(IProjectSource):
+        CONCURRENT_READS = 3
+        active = peak = 0
+
+        def __str__(self):
+            return "slow"
+
+        async def list_files(self):
+            return []
+
+        async def read_file(self, rel_path):
+            SlowSource.active += 1
+            SlowSource.peak = max(SlowSource.peak, SlowSource.active)
+            await asyncio.sleep(0.01 * (5 - int(rel_path)))
+            SlowSource.active -= 1
+            if rel_path == "3":
+                raise OSError("gone")
+            return f"text {rel_path}"
+
+    results = await read_all(SlowSource(), [str(i) for i in range(5)])
+    assert [r[0] for r in results] == ["0", "1", "2", "3", "4"]
+    assert results[1] == ("1", "text 1", None)
+    assert isinstance(results[3][1], OSError)
+    assert SlowSource.peak == 3
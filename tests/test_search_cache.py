@@ -0,0 +1,105 @@
+# .side_suction/tests/test_search_cache.py
+
+import random
+import re
+
+import pytest
+from logic.search_cache import SearchCache, SearchQuery
+
+TEXT = "```a.py\nfoo = Foo()\nfoo_bar(foo)\n```\n```b.py\n(foo) FOO\n```"
+
+
+def positions(cache, query):
+    matches = cache.find_all(query)
+    return [cache.text[start:end] for start, end in zip(matches.starts, matches.ends)]
+
+
+def test_options():
+    cache = SearchCache(TEXT)
+    assert positions(cache, SearchQuery("foo")) == ["foo", "Foo", "foo", "foo", "foo", "FOO"]
+    assert positions(cache, SearchQuery("foo", case=True)) == ["foo", "foo", "foo", "foo"]
+    # целое слово: "foo_bar" не подходит, "(foo)" — подходит
+    assert len(positions(cache, SearchQuery("foo", case=True, word=True))) == 3
+    # "bar(foo)" не подходит: перед "(" стоит буква, а "\n(foo) " — подходит
+    matches = cache.find_all(SearchQuery("(foo)", word=True))
+    assert len(matches) == 1 and cache.line_of(matches.starts[0]) == 5
+    assert positions(cache, SearchQuery(r"f\w+\(", regex=True)) == ["Foo(", "foo_bar("]
+    # пустые совпадения не считаются
+    assert positions(cache, SearchQuery("x*", regex=True)) == []
+    with pytest.raises(re.error):
+        cache.find_all(SearchQuery("(", regex=True))
+
+
+def test_matches_are_cached_and_stepped_by_bisect():
+    cache = SearchCache(TEXT)
+    query = SearchQuery("foo", case=True)
+    matches = cache.find_all(query)
+    assert cache.find_all(query) is matches
+    starts = matches.starts
+    assert matches.next_index(0) == 0
+    assert matches.next_index(starts[0]) == 1
+    assert matches.next_index(starts[-1]) == 0  # по кругу
+    assert matches.next_index(starts[0], backwards=True) == len(starts) - 1
+    assert list(matches.between(starts[1], starts[2] + 1)) == [1, 2]
+
+
+def test_cache_is_bounded():
+    cache = SearchCache(TEXT, cache_size=2)
+    first = cache.find_all(SearchQuery("a"))
+    cache.find_all(SearchQuery("b"))
+    cache.find_all(SearchQuery("c"))
+    assert cache.find_all(SearchQuery("a")) is not first
+
+
+def test_line_offsets():
+    cache = SearchCache("ab\n\ncd\n")
+    assert cache.line_starts == [0, 3, 4, 7]
+    assert [cache.line_of(pos) for pos in (0, 2, 3, 4, 6, 7)] == [0, 0, 1, 2, 2, 3]
+
+
+def test_utf16_positions_after_astral_characters():
+    # QTextDocument считает эмодзи за две позиции
+    text = "a😀b😀😀c"
+    cache = SearchCache(text)
+    utf16 = [len(text[:pos].encode("utf-16-le")) // 2 for pos in range(len(text) + 1)]
+    assert [cache.to_document(pos) for pos in range(len(text) + 1)] == utf16
+    assert [cache.from_document(doc) for doc in utf16] == list(range(len(text) + 1))
+    assert SearchCache("plain").to_document(3) == 3
+
+
+def test_typed_prefix_refines_previous_matches(monkeypatch):
+    # Уточнение по совпадениям префикса даёт то же, что полный проход
+    monkeypatch.setattr("logic.search_cache.REFINE_RATIO", 0)
+    refine = SearchCache._refine
+    calls = []
+    monkeypatch.setattr(SearchCache, "_refine", lambda *a: calls.append(1) or refine(*a))
+    rnd = random.Random(38)
+    for _ in range(300):
+        text = "".join(rnd.choice("abAB\n") for _ in range(rnd.randint(200, 400)))
+        pattern = "".join(rnd.choice("abAB") for _ in range(rnd.randint(2, 5)))
+        case = rnd.random() < 0.5
+        cache = SearchCache(text)
+        for size in range(1, len(pattern) + 1):
+            refined = cache.find_all(SearchQuery(pattern[:size], case=case))
+        full = SearchCache(text).find_all(SearchQuery(pattern, case=case))
+        assert (refined.starts, refined.ends) == (full.starts, full.ends), (text, pattern)
+    assert calls
+
+
+def test_refine_only_for_literals_without_border():
+    assert SearchQuery("abc").refines(SearchQuery("ab"))
+    assert SearchQuery("ABC").refines(SearchQuery("ab"))
+    assert not SearchQuery("ABC", case=True).refines(SearchQuery("ab", case=True))
+    # вхождения "aa" перекрываются: в "aaab" finditer пропустит позицию 1
+    assert not SearchQuery("aab").refines(SearchQuery("aa"))
+    assert not SearchQuery("abc", regex=True).refines(SearchQuery("ab"))
+    assert not SearchQuery("abc").refines(SearchQuery(""))
+
+
+def test_density_counts_matches_per_line_band():
+    cache = SearchCache("x\n" * 7 + "x")
+    matches = cache.find_all(SearchQuery("x"))
+    assert cache.density(matches, 4) == [2, 2, 2, 2]
+    assert cache.density(matches, 4) is matches.density
+    empty = cache.find_all(SearchQuery("y"))
+    assert cache.density(empty, 2) == [0, 0]
@@ -0,0 +1,52 @@
+# .side_suction/tests/test_startup_timer.py
+
+import io
+import sys
+
+from logic.startup_timer import ImportTimer, StartupTimer, startup_report_requested
+
+
+def test_report_requested_by_flag_or_env(monkeypatch):
+    monkeypatch.delenv("SIDE_SUCTION_STARTUP_REPORT", raising=False)
+    assert startup_report_requested(["main.py", "--startup-report"])
+    assert not startup_report_requested(["main.py"])
+    monkeypatch.setenv("SIDE_SUCTION_STARTUP_REPORT", "1")
+    assert startup_report_requested(["main.py"])
+
+
+def test_phases_are_reported_once():
+    stream = io.StringIO()
+    timer = StartupTimer(enabled=True, stream=stream)
+    timer.mark("import")
+    timer.mark("widget build")
+    timer.finish("first paint")
+    # Повторная отрисовка не должна печатать отчёт ещё раз
+    timer.finish("first paint")
+    report = stream.getvalue()
+    assert report.count("Startup timing:") == 1
+    for phase in ("import", "widget build", "first paint", "total"):
+        assert phase in report
+    assert [name for name, _ in timer.phases] == ["import", "widget build", "first paint"]
+
+
+def test_disabled_timer_prints_nothing():
+    stream = io.StringIO()
+    timer = StartupTimer(enabled=False, stream=stream)
+    timer.finish("first paint")
+    assert stream.getvalue() == ""
+
+
+def test_import_timer_records_fresh_imports(monkeypatch):
+    # Выгружаем модуль, чтобы импорт действительно прошёл через загрузчик
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    stream = io.StringIO()
+    timer = ImportTimer(stream=stream).install()
+    try:
+        import colorsys  # noqa: F401
+    finally:
+        timer.report(top=5)
+    names = [name for _, name, _, _ in timer.records]
+    assert "colorsys" in names
+    assert "import time:" in stream.getvalue()
+    # После отчёта перехват снят
+    assert timer._original is None
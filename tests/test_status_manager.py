@@ -0,0 +1,26 @@
+# .side_suction/tests/test_status_manager.py
+
+import asyncio
+import threading
+
+import pytest
+from logic.status_manager import Listeners, report_config
+
+
+@pytest.mark.asyncio
+async def test_emit_from_worker_runs_on_gui_thread(monkeypatch):
+    listeners = Listeners()
+    calls = []
+    listeners.connect(lambda value: calls.append((value, threading.current_thread())))
+
+    # CLI: цикла GUI нет — слушатель вызывается в потоке emit
+    await asyncio.to_thread(listeners.emit, 1)
+    assert calls[-1][0] == 1 and calls[-1][1] is not threading.main_thread()
+
+    # GUI: emit из рабочего потока передаётся в главный
+    monkeypatch.setattr(report_config, "loop", asyncio.get_running_loop())
+    await asyncio.to_thread(listeners.emit, 2)
+    await asyncio.sleep(0)
+    assert calls[-1] == (2, threading.main_thread())
+    listeners.emit(3)  # из главного потока — сразу
+    assert calls[-1] == (3, threading.main_thread())
@@ -0,0 +1,110 @@
+# .side_suction/tests/test_symbol_outline.py
+
+from pathlib import Path
+
+import pytest
+from config.settings import settings
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+from logic.symbol_outline import outline_text, python_skeleton
+
+SOURCE = '''"""Модуль."""
+import os
+
+LIMIT = 10
+TABLE = {"k" + str(i): i for i in range(100)} | {"a": 1, "b": 2, "c": 3, "d": 4}
+
+
+class Cache(dict):
+    """Кэш."""
+
+    size: int = 0
+
+    @property
+    def full(self) -> bool:
+        """Заполнен ли."""
+        return len(self) >= LIMIT
+
+    async def load(self, path, *, force=False):
+        for line in open(path):
+            self[line] = os.sep
+
+
+def main(argv=None):
+    print(argv)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def test_python_skeleton_keeps_signatures_and_docstrings():
+    assert python_skeleton(SOURCE) == (
+        '"""Модуль."""\nimport os\nLIMIT = 10\nTABLE = ...\n\n'
+        'class Cache(dict):\n    """Кэш."""\n    size: int = 0\n\n'
+        '    @property\n    def full(self) -> bool:\n        """Заполнен ли."""\n        ...\n\n'
+        "    async def load(self, path, *, force=False):\n        ...\n\n"
+        "def main(argv=None):\n    ..."
+    )
+    assert python_skeleton("def broken(:\n") is None
+    # сгенерированное выражение в 100k слагаемых: RecursionError не прерывает выгрузку
+    assert python_skeleton("x = (" + "1 +\n" * 100_000 + "1)\n") is None
+    assert outline_text("a.js", "function f() {}") is None
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "a.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "bad.py").write_text("def broken(:\n", encoding="utf-8")
+    (tmp_path / "c.md").write_text("# doc", encoding="utf-8")
+    return ProjectManager(LocalSource(str(tmp_path)))
+
+
+def items(*names):
+    return [(Path(name), None) for name in names]
+
+
+@pytest.mark.asyncio
+async def test_outline_mode_is_cached_by_content(project, monkeypatch):
+    monkeypatch.setattr(settings, "outlineMode", True)
+    calls = []
+    monkeypatch.setattr(
+        "logic.project_manager.outline_text", lambda *a: calls.append(a[0]) or outline_text(*a)
+    )
+    content = await project.extract_content(items("a.py", "bad.py", "c.md"))
+    # неразбираемый и неподдерживаемый файлы выводятся целиком
+    assert content == (
+        f"```a.py\n{python_skeleton(SOURCE)}\n```\n"
+        "```bad.py\ndef broken(:\n\n```\n```c.md\n# doc\n```"
+    )
+    assert project.extractStats["outlined"] == 1
+    assert project.extractStats["tokens"] < len(SOURCE) // 4
+    again = await project.extract_content(items("a.py", "bad.py"))
+    assert again == content.rsplit("\n```c.md", 1)[0]
+    assert calls == ["a.py", "bad.py"]
+
+
+@pytest.mark.asyncio
+async def test_outline_in_process_pool(project, monkeypatch):
+    monkeypatch.setattr(settings, "outlineMode", True)
+    monkeypatch.setattr("logic.project_manager.OUTLINE_POOL_BYTES", 0)
+    content = await project.extract_content(items("c.md", "a.py"))
+    assert content.endswith(f"```a.py\n{python_skeleton(SOURCE)}\n```")
+
+
+@pytest.mark.asyncio
+async def test_identical_bodies_are_parsed_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "outlineMode", True)
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "deep.py").write_text("x = (" + "1 +\n" * 100_000 + "1)\n", encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(
+        "logic.project_manager.outline_text", lambda *a: calls.append(a[0]) or outline_text(*a)
+    )
+    manager = ProjectManager(LocalSource(str(tmp_path)))
+    content = await manager.extract_content(items("a.py", "b.py", "c.py", "deep.py"))
+    assert content.count(python_skeleton(SOURCE)) == 3
+    assert content.endswith("1 +\n1)\n\n```")
+    assert len(calls) == 2
@@ -0,0 +1,99 @@
+# .side_suction/tests/test_token_estimator.py
+
+from pathlib import Path
+
+import pytest
+from config.settings import settings
+from logic.project_manager import ProjectManager
+from logic.project_source import LocalSource
+from logic.status_manager import Listeners, progress
+from logic.token_estimator import TokenEstimator, estimate_tokens, format_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 25) == 25
+    # Кириллица дороже: каждый символ занимает два байта
+    assert estimate_tokens("абвг" * 25) > estimate_tokens("abcd" * 25)
+    assert estimate_tokens("абвг", size=8) == estimate_tokens("абвг")
+
+
+def test_estimator_cache_and_truncate():
+    estimator = TokenEstimator()
+    text = "line of code\n" * 100
+    assert estimator.estimate(text) == estimate_tokens(text)
+    assert not estimator.cache  # без готового хеша текст не хешируется
+    assert estimator.estimate(text, digest="d") == estimate_tokens(text)
+    assert estimator.estimate("", digest="d") == estimate_tokens(text)
+    assert len(estimator.cache) == 1
+    head = estimator.truncate(text, 20)
+    assert text.startswith(head) and estimate_tokens(head) <= 20
+    assert format_tokens(12345) == "12.3k" and format_tokens(999) == "999"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    for name in "abc":
+        (tmp_path / f"{name}.txt").write_text(name * 400, encoding="utf-8")
+    return ProjectManager(LocalSource(str(tmp_path)))
+
+
+def items(*names):
+    return [(Path(f"{name}.txt"), None) for name in names]
+
+
+@pytest.mark.asyncio
+async def test_budget_stop(manager, monkeypatch):
+    monkeypatch.setattr(settings, "tokenBudget", 250)
+    monkeypatch.setattr(settings, "budgetPolicy", "stop")
+    content = await manager.extract_content(items("a", "b", "c"))
+    assert content == f"```a.txt\n{'a' * 400}\n```\n```b.txt\n{'b' * 400}\n```"
+    assert manager.extractStats["tokens"] == 200
+
+
+@pytest.mark.asyncio
+async def test_budget_truncate_then_summary(manager, monkeypatch):
+    monkeypatch.setattr(settings, "tokenBudget", 150)
+    monkeypatch.setattr(settings, "budgetPolicy", "truncate")
+    content = await manager.extract_content(items("a", "b", "c"))
+    pieces = content.split("\n```\n")
+    assert "[... truncated: ~" in pieces[1]
+    assert pieces[2].endswith("[over token budget: ~100 tokens]\n```")
+
+
+@pytest.mark.asyncio
+async def test_dedup_references_identical_files(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "dedupFiles", True)
+    (tmp_path / "copy.txt").write_text("a" * 400, encoding="utf-8")
+    content = await manager.extract_content(items("a", "b", "copy"))
+    # тело выводится один раз, копия ссылается на первый путь
+    assert content.endswith("```copy.txt\n[duplicate of a.txt]\n```")
+    assert content.count("a" * 400) == 1
+    stats = manager.extractStats
+    assert stats["duplicates"] == 1 and stats["tokens"] == 200
+    assert stats["savedBytes"] == 400 - len("[duplicate of a.txt]")
+    assert 0 < stats["savedTokens"] < 100
+
+
+class FullBar:
+    """Шкала, уже дошедшая до 100%: update() больше ничего не выдаёт."""
+
+    def value(self):
+        return 100
+
+    def format(self):
+        return ""
+
+
+@pytest.mark.asyncio
+async def test_final_status_is_emitted(manager, monkeypatch):
+    monkeypatch.setattr(settings, "dedupFiles", True)
+    monkeypatch.setattr(progress, "progress_bar", FullBar())
+    monkeypatch.setattr(progress, "updated", Listeners())
+    emitted = []
+    progress.updated.connect(lambda value, status: emitted.append((value, status)))
+    await manager.extract_content(items("a", "a", "b"))
+    assert emitted[-1] == (
+        100,
+        "Extracting Content | 200 tokens | 1 duplicates, saved 380 bytes / 95 tokens",
+    )
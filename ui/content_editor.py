@@ -1,14 +1,43 @@
 # .side_suction/ui/content_editor.py
 
+import asyncio
+import time
+from collections import deque
 from contextlib import contextmanager
 from typing import Any, Dict, Iterator, Optional, Tuple
 
 from config.icons import FLDF, FLDT
 from config.settings import settings
+from logic.file_outline import FileOutline
+from logic.minifier import utf8_len
+from logic.paged_document import Page, PagedDocument
+from logic.search_cache import SearchCache
 from logic.status_manager import progress
-from PySide6.QtCore import QPoint, QRect, QSize, Qt
-from PySide6.QtGui import QColor, QCursor, QFont, QPainter, QTextCharFormat, QTextOption
-from PySide6.QtWidgets import QPlainTextEdit, QTextEdit, QWidget
+from PySide6.QtCore import QPoint, QRect, QSignalBlocker, QSize, Qt, Signal
+from PySide6.QtGui import (
+    QColor,
+    QCursor,
+    QFont,
+    QKeySequence,
+    QPainter,
+    QShortcut,
+    QStaticText,
+    QTextCharFormat,
+    QTextCursor,
+    QTextOption,
+    QTransform,
+)
+from PySide6.QtWidgets import (
+    QDialog,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPlainTextEdit,
+    QScrollBar,
+    QTextEdit,
+    QVBoxLayout,
+    QWidget,
+)
 from qasync import asyncSlot
 from ui.syntax_parser import SyntaxParser
 
@@ -17,6 +46,11 @@ BACK_COLOR = QColor("#234")
 FORE_COLOR = QColor("#9cf")
 FONT_SIZE = settings.defaultFontSize
 PANEL_SIZE = FONT_SIZE << 1
+DENSITY_WIDTH = 8
+MATCH_COLOR = QColor("#ffaa00")
+MAX_SEARCH_SELECTIONS = 2000  # больше совпадений на экране не помещается
+STREAM_BUDGET = 0.008  # секунд вставки за кадр при потоковой выгрузке
+STREAM_INTERVAL = 0.016  # копим куски не дольше кадра перед вставкой
 
 
 # Utility functions
@@ -46,14 +80,31 @@ class Ribbon(QWidget):
 
 # Area classes for UI components
 class LineNumberArea(Ribbon):
+    MAX_GLYPHS = 8192  # номеров в кэше; при прокрутке используются одни и те же
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.glyphs: Dict[int, QStaticText] = {}
+
     def sizeHint(self) -> QSize:
         return QSize(self.contentEditor.lineNumberWidth(), 0)
 
+    def glyph(self, number: int) -> QStaticText:
+        """Номер строки, разложенный один раз: повторная отрисовка не считает раскладку текста."""
+        glyph = self.glyphs.get(number)
+        if glyph is None:
+            if len(self.glyphs) >= self.MAX_GLYPHS:
+                self.glyphs.clear()
+            glyph = self.glyphs[number] = QStaticText(str(number))
+            glyph.prepare(QTransform(), self.font())
+        return glyph
+
     def drawContent(self, painter: QPainter, rect: QRect) -> None:
+        width = self.width()
+        offset = self.contentEditor.lineOffset + 1
         for block, block_number, top in self.contentEditor.iterate_visible_blocks(rect):
-            number = str(block_number + 1)
-            height = self.contentEditor.lineHeight
-            painter.drawText(0, int(top), self.width(), height, Qt.AlignRight, number)
+            glyph = self.glyph(block_number + offset)
+            painter.drawStaticText(int(width - glyph.size().width()), int(top), glyph)
 
 
 class FoldMarkerArea(Ribbon):
@@ -63,15 +114,14 @@ class FoldMarkerArea(Ribbon):
     def visible_foldable_blocks(
         self, rect: QRect = None, pos: QPoint = None
     ) -> Iterator[Tuple[int, QRect, str]]:
+        contentMap = self.contentEditor.contentMap
         for block, block_number, top in self.contentEditor.iterate_visible_blocks(rect):
-            filename = self.contentEditor.contentMap.get_current_file(block_number)
+            filename = contentMap.file_starting_at(block_number)
             if filename:
-                first_line = self.contentEditor.contentMap.fileStartLines[filename]
-                if block_number == first_line:
-                    height = self.contentEditor.lineHeight
-                    marker_rect = QRect(0, int(top), PANEL_SIZE, height)
-                    if pos is None or marker_rect.contains(pos):
-                        yield block_number, marker_rect, filename
+                height = self.contentEditor.lineHeight
+                marker_rect = QRect(0, int(top), PANEL_SIZE, height)
+                if pos is None or marker_rect.contains(pos):
+                    yield block_number, marker_rect, filename
 
     def drawContent(self, painter: QPainter, rect: QRect):
         for _, marker_rect, filename in self.visible_foldable_blocks(rect=rect):
@@ -88,8 +138,7 @@ class FoldMarkerArea(Ribbon):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            for blockNumber, _, _ in self.visible_foldable_blocks(pos=event.pos()):
-                filename = self.contentEditor.contentMap.get_current_file(blockNumber)
+            for _, _, filename in self.visible_foldable_blocks(pos=event.pos()):
                 self.contentEditor.toggleFold(filename)
                 break  # Обрабатываем только первый подходящий блок
         super().mousePressEvent(event)
@@ -106,15 +155,94 @@ class TopInfoArea(Ribbon):
 
 class BotInfoArea(Ribbon):
     def drawContent(self, painter: QPainter, rect: QRect) -> None:
-        cursorChar = self.contentEditor.textCursor().position()
-        totalChars = len(self.contentEditor.toPlainText())
-        cursorLine = self.contentEditor.textCursor().blockNumber() + 1
-        totalLines = self.contentEditor.document().blockCount()
+        editor = self.contentEditor
+        cursorChar = editor.textCursor().position() + editor.windowDocStart
+        totalChars = editor.totalChars
+        cursorLine = editor.textCursor().blockNumber() + editor.lineOffset + 1
+        totalLines = editor.totalLines()
         totalSize = self.contentEditor.computedFileSize
         infoText = f"Line: {cursorLine} of {totalLines} | Pos: {cursorChar} of {totalChars} | {totalSize} bytes"
         painter.drawText(rect, Qt.AlignCenter | Qt.AlignVCenter, infoText)
 
 
+class SearchDensityArea(Ribbon):
+    """Миникарта совпадений поиска: плотность по полосам документа и текущее совпадение."""
+
+    def sizeHint(self) -> QSize:
+        return QSize(DENSITY_WIDTH, 0)
+
+    def drawContent(self, painter: QPainter, rect: QRect) -> None:
+        density = self.contentEditor.searchDensity
+        if not density:
+            return
+        height = self.height()
+        peak = max(density)
+        color = QColor(MATCH_COLOR)
+        for bucket, count in enumerate(density):
+            if count:
+                color.setAlpha(96 + 159 * count // peak)
+                top = bucket * height // len(density)
+                bottom = (bucket + 1) * height // len(density)
+                painter.fillRect(0, top, self.width(), max(1, bottom - top), color)
+        editor = self.contentEditor
+        line = editor.textCursor().blockNumber() + editor.lineOffset
+        lines = max(1, editor.totalLines())
+        painter.fillRect(0, line * height // lines, self.width(), 2, self.foreColor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            lines = self.contentEditor.totalLines()
+            line = int(event.position().y()) * lines // max(1, self.height())
+            self.contentEditor.jumpToLine(line)
+        super().mousePressEvent(event)
+
+
+class FilePalette(QDialog):
+    """Переход к файлу выгрузки: нечёткий поиск по путям из оглавления."""
+
+    fileChosen = Signal(int)
+
+    def __init__(self, outline: FileOutline, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.outline = outline
+        self.setWindowTitle("Go to File")
+        self.resize(640, 420)
+        layout = QVBoxLayout(self)
+        self.queryLineEdit = QLineEdit()
+        self.queryLineEdit.setPlaceholderText(f"{len(outline)} files")
+        self.resultsList = QListWidget()
+        self.resultsList.setUniformItemSizes(True)
+        layout.addWidget(self.queryLineEdit)
+        layout.addWidget(self.resultsList)
+        self.queryLineEdit.textChanged.connect(self.refresh)
+        self.queryLineEdit.returnPressed.connect(self.choose)
+        self.resultsList.itemActivated.connect(self.choose)
+        self.refresh("")
+
+    def refresh(self, query: str) -> None:
+        self.resultsList.clear()
+        for entry in self.outline.fuzzy(query):
+            item = QListWidgetItem(f"{entry.path}  ·  {entry.lines} lines, {entry.size} bytes")
+            item.setData(Qt.UserRole, entry.start)
+            self.resultsList.addItem(item)
+        self.resultsList.setCurrentRow(0)
+
+    def keyPressEvent(self, event) -> None:
+        # стрелки из строки запроса двигают выбор в списке
+        if event.key() in (Qt.Key_Up, Qt.Key_Down):
+            step = -1 if event.key() == Qt.Key_Up else 1
+            row = self.resultsList.currentRow() + step
+            self.resultsList.setCurrentRow(max(0, min(row, self.resultsList.count() - 1)))
+            return
+        super().keyPressEvent(event)
+
+    def choose(self, *_) -> None:
+        item = self.resultsList.currentItem()
+        if item is not None:
+            self.fileChosen.emit(item.data(Qt.UserRole))
+        self.accept()
+
+
 # Main editor class
 class ContentEditor(QPlainTextEdit):
     """Элементы UI (ленты нумерации строк и маркеров, верхняя и нижняя инфопанели) и взаимодействие с пользователем"""
@@ -123,19 +251,45 @@ class ContentEditor(QPlainTextEdit):
         super().__init__(parent)
         # Initialize metrics
         self.lineHeight = self.fontMetrics().height()
+        self.digitWidth = self.fontMetrics().horizontalAdvance("8")
+        self.layoutKey = None  # ключ кадра, для которого посчитан visibleLayout
+        self.visibleLayout = []
+        self.foldRevision = 0
         # Initialize ribbons (UI areas)
         self.topInfoArea = TopInfoArea(self)
         self.botInfoArea = BotInfoArea(self)
         self.lineNumberArea = LineNumberArea(self)
         self.foldMarkerArea = FoldMarkerArea(self)
         self.foldMarkerArea.setMouseTracking(True)
+        self.searchDensityArea = SearchDensityArea(self)
         # Connect signals
         self.updateRequest.connect(self.updateAreas)
+        QShortcut(QKeySequence("Ctrl+P"), self, self.openFilePalette)
         self.cursorPositionChanged.connect(self.highlightCurrentLine)
         # Initialize properties
         self.topMarginHeight = PANEL_SIZE
         self.botMarginHeight = PANEL_SIZE
         self.computedFileSize = 0
+        self.totalChars = 0  # длина документа ведётся по изменениям, без toPlainText
+        self.document().contentsChange.connect(self.countChars)
+        self._searchCache = SearchCache("")
+        self.searchMatches = None  # (SearchCache, Matches) текущего запроса
+        self.searchDensity = []
+        self.searchSelections = []
+        # Постраничный режим: в документе только окно страниц вокруг видимой строки
+        self.paged: Optional[PagedDocument] = None
+        self.pageWindow: Optional[Page] = None
+        self.lineOffset = 0  # номер первой строки окна в виртуальном документе
+        self.windowDocStart = 0  # позиция (UTF-16) первого символа окна
+        self.syncingScroll = False
+        # Потоковая выгрузка: куски дописываются в конец документа по мере чтения
+        self.streamPending = deque()  # (путь, тело, текст куска)
+        self.streamChars = 0
+        self.streamFlushed = 0.0
+        self.pagedScrollBar = QScrollBar(Qt.Vertical, self)
+        self.pagedScrollBar.hide()
+        self.pagedScrollBar.valueChanged.connect(self.onPagedScroll)
+        self.verticalScrollBar().valueChanged.connect(self.onWindowScroll)
         # Setup highlighter
         self.contentMap = ContentMap(self.document())
         self.highlighter = SyntaxParser(self.document())
@@ -148,6 +302,10 @@ class ContentEditor(QPlainTextEdit):
         """Устанавливает шрифты для редактора и его компонентов."""
         font = QFont(fontName, fontSize)
         self.setFont(font)  # For the editor content
+        # метрики нужны на каждой отрисовке и изменении размеров — считаем при смене шрифта
+        self.lineHeight = self.fontMetrics().height()
+        self.digitWidth = self.fontMetrics().horizontalAdvance("8")
+        self.updateEditorMargins()
 
     def setTabSize(self, spaces=4):
         """Устанавливает размер табуляции в пробелах."""
@@ -157,16 +315,20 @@ class ContentEditor(QPlainTextEdit):
 
     def lineNumberWidth(self) -> int:
         """Вычисляет ширину области номеров строк."""
-        digits = len(str(max(1, self.blockCount()))) + 1.5
-        # Use the font's metrics for accurate width calculation
-        width = self.fontMetrics().horizontalAdvance("8")
-        return width * digits
+        digits = len(str(max(1, self.totalLines()))) + 1.5
+        return int(self.digitWidth * digits)
+
+    def totalLines(self) -> int:
+        return self.paged.lines if self.paged else self.blockCount()
 
     # Geometry and area management methods
     def updateEditorMargins(self) -> None:
         """Обновляет отступы редактора."""
+        right = DENSITY_WIDTH
+        if self.paged:
+            right += self.pagedScrollBar.sizeHint().width()
         self.setViewportMargins(
-            self.lineNumberWidth() + PANEL_SIZE, PANEL_SIZE, 0, PANEL_SIZE
+            self.lineNumberWidth() + PANEL_SIZE, PANEL_SIZE, right, PANEL_SIZE
         )
 
     @asyncSlot(QRect, int)
@@ -175,6 +337,7 @@ class ContentEditor(QPlainTextEdit):
         if dy:
             self.lineNumberArea.scroll(0, dy)
             self.foldMarkerArea.scroll(0, dy)
+            self.updateSearchSelections()
         elif rect.contains(self.viewport().rect()):
             self.updateEditorMargins()
         self.update()
@@ -194,6 +357,21 @@ class ContentEditor(QPlainTextEdit):
         self.foldMarkerArea.setGeometry(
             QRect(cr.left() + ribbonWidth, ribbonTop, PANEL_SIZE, ribbonHeight)
         )
+        # Search density area (между текстом и полосой прокрутки)
+        viewport = self.viewport().geometry()
+        self.searchDensityArea.setGeometry(
+            QRect(viewport.right() + 1, ribbonTop, DENSITY_WIDTH, ribbonHeight)
+        )
+        # Virtual scrollbar of the paged mode (на месте скрытой полосы окна)
+        self.pagedScrollBar.setGeometry(
+            QRect(
+                viewport.right() + 1 + DENSITY_WIDTH,
+                ribbonTop,
+                self.pagedScrollBar.sizeHint().width(),
+                ribbonHeight,
+            )
+        )
+        self.updateSearchSelections()
         # Top info area
         self.topInfoArea.setGeometry(QRect(cr.left(), cr.top(), cr.width(), PANEL_SIZE))
         # Bottom info area
@@ -201,18 +379,250 @@ class ContentEditor(QPlainTextEdit):
             QRect(cr.left(), cr.bottom() - PANEL_SIZE + 1, cr.width(), PANEL_SIZE)
         )
 
+    def countChars(self, position: int, removed: int, added: int) -> None:
+        if self.paged:
+            return  # сменилось окно страниц; полный текст, его длина и кэш совпадений те же
+        # characterCount() поддерживается документом за O(1); последний символ — конец абзаца
+        self.totalChars = self.document().characterCount() - 1
+        # после правки кэш совпадений пересобирается при следующем запросе,
+        # а позиции прежних совпадений больше не действительны
+        self._searchCache = None
+        self.searchMatches = None
+        self.searchDensity = []
+
+    @property
+    def searchCache(self) -> SearchCache:
+        if self._searchCache is None:
+            self._searchCache = SearchCache(self.toPlainText())
+        return self._searchCache
+
+    def setSearchMatches(self, cache=None, matches=None) -> None:
+        """Запоминает совпадения запроса; подсвечиваются только видимые из них."""
+        self.searchMatches = (cache, matches) if matches else None
+        self.searchDensity = cache.density(matches) if matches else []
+        self.searchDensityArea.update()
+        self.updateSearchSelections()
+
+    def visibleRange(self) -> Tuple[int, int]:
+        """Позиции документа (UTF-16) от первой до последней видимой строки."""
+        first = self.firstVisibleBlock()
+        last = self.cursorForPosition(QPoint(0, self.viewport().height())).block()
+        return first.position(), last.position() + last.length()
+
+    def textPosition(self, docPosition: int) -> int:
+        """Позиция документа (окна) -> позиция в полном тексте кэша совпадений."""
+        return self.searchCache.from_document(docPosition + self.windowDocStart)
+
+    def docPosition(self, textPosition: int) -> int:
+        """Позиция в полном тексте -> позиция документа (окна)."""
+        return self.searchCache.to_document(textPosition) - self.windowDocStart
+
+    def selectText(self, start: int, end: int) -> None:
+        """Выделяет [start, end) полного текста, при необходимости загрузив его окно."""
+        if self.paged:
+            line = self.searchCache.line_of(start)
+            if not self.paged.contains(self.pageWindow, line):
+                self.loadWindow(line)
+        cursor = self.textCursor()
+        cursor.setPosition(self.docPosition(start))
+        cursor.setPosition(self.docPosition(end), QTextCursor.KeepAnchor)
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
+
+    def updateSearchSelections(self) -> None:
+        selections = []
+        if self.searchMatches:
+            cache, matches = self.searchMatches
+            start, end = map(self.textPosition, self.visibleRange())
+            visible = matches.between(start, end)
+            doc = self.document()
+            for i in visible[:MAX_SEARCH_SELECTIONS]:
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(MATCH_COLOR)
+                selection.format.setForeground(Qt.black)
+                selection.cursor = QTextCursor(doc)
+                selection.cursor.setPosition(self.docPosition(matches.starts[i]))
+                selection.cursor.setPosition(
+                    self.docPosition(matches.ends[i]), QTextCursor.KeepAnchor
+                )
+                selections.append(selection)
+        if selections or self.searchSelections:
+            self.searchSelections = selections
+            self.highlightCurrentLine()
+
     def setComputedFileSize(self, size: int) -> None:
         """Устанавливает вычисленный размер файла."""
         self.computedFileSize = size
         self.update()
 
-    def setContent(self, content: str) -> None:
-        """Асинхронно устанавливает содержимое редактора и обновляет структуру."""
+    def setContent(
+        self, content: str, outline: Optional[FileOutline] = None, files=None
+    ) -> None:
+        """Устанавливает содержимое редактора и оглавление (готовое из выгрузки или по тексту).
+
+        Выгрузка длиннее settings.pagedThreshold при известных телах файлов (files)
+        открывается постранично: в документе только окно, остальное — в files.
+        """
+        if files is not None and len(content) > settings.pagedThreshold:
+            self.setPagedContent(content, PagedDocument(files))
+            return
+        self.setPaged(None)
         self.setPlainText(content)
-        self.contentMap.update_structure(content)
-        self.setComputedFileSize(len(content.encode("utf-8")))
+        self._searchCache = SearchCache(content)
+        self.setSearchMatches()
+        if outline is None:
+            outline = FileOutline.from_text(content)
+        self.contentMap.set_outline(outline)
+        self.setComputedFileSize(utf8_len(content))
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def beginContent(self) -> None:
+        """Очищает редактор перед потоковой выгрузкой (appendContent / finishContent)."""
+        self.setPaged(None)
+        self.streamPending.clear()
+        self.streamChars = 0
+        self.streamFlushed = 0.0  # первый кусок вставляется сразу
+        self.document().setUndoRedoEnabled(False)
+        self.clear()
+        # сворачивание тех же файлов сохраняется, как и в setContent
+        self.contentMap.set_outline(FileOutline(), paths=list(self.contentMap.folded_blocks))
+
+    async def appendContent(self, path, body: str, piece: str) -> None:
+        """Дописывает кусок "```path" выгрузки; вставка идёт пакетами раз в кадр.
+
+        После settings.pagedThreshold символов куски в документ не пишутся:
+        finishContent всё равно откроет такую выгрузку постранично.
+        """
+        text = f"\n{piece}" if self.streamChars else piece
+        self.streamChars += len(text)
+        if self.streamChars > settings.pagedThreshold:
+            self.streamPending.clear()
+            return
+        self.streamPending.append((path, body, text))
+        if time.perf_counter() - self.streamFlushed >= STREAM_INTERVAL:
+            await self.flushContent()
+
+    async def flushContent(self) -> None:
+        """Вставляет накопленные куски блоками правки не дольше STREAM_BUDGET каждый."""
+        doc = self.document()
+        while self.streamPending:
+            deadline = time.perf_counter() + STREAM_BUDGET
+            cursor = QTextCursor(doc)
+            cursor.movePosition(QTextCursor.End)
+            cursor.beginEditBlock()
+            while self.streamPending and time.perf_counter() < deadline:
+                path, body, text = self.streamPending.popleft()
+                cursor.insertText(text)
+                self.contentMap.append_file(path, body)
+            cursor.endEditBlock()
+            # между блоками цикл событий отрисовывает уже вставленное
+            await asyncio.sleep(0)
+        self.streamFlushed = time.perf_counter()
+
+    async def finishContent(self, content: str, files) -> None:
+        """Завершает потоковую выгрузку: остаток кусков, кэш совпадений и размер."""
+        if len(content) > settings.pagedThreshold:
+            self.streamPending.clear()
+            self.document().setUndoRedoEnabled(True)
+            self.setContent(content, None, files)
+            return
+        await self.flushContent()
+        doc = self.document()
+        doc.setUndoRedoEnabled(True)
+        doc.setModified(False)  # вставка курсором помечает документ правленым
+        self._searchCache = SearchCache(content)
+        self.setSearchMatches()
+        self.setComputedFileSize(utf8_len(content))
         self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
+    def setPaged(self, paged: Optional[PagedDocument]) -> None:
+        """Включает или выключает постраничный режим (только чтение, своя полоса прокрутки)."""
+        self.paged = paged
+        self.pageWindow = None
+        self.lineOffset = self.windowDocStart = 0
+        self.setReadOnly(paged is not None)
+        self.setVerticalScrollBarPolicy(
+            Qt.ScrollBarAlwaysOff if paged else Qt.ScrollBarAsNeeded
+        )
+        self.pagedScrollBar.setVisible(paged is not None)
+        self.updateEditorMargins()
+
+    def setPagedContent(self, content: str, paged: PagedDocument) -> None:
+        self.setPaged(paged)
+        self._searchCache = SearchCache(content)
+        # в единицах UTF-16, как characterCount() и windowDocStart в обычном режиме
+        self.totalChars = self._searchCache.to_document(len(content))
+        self.setSearchMatches()
+        # сворачивание хранится по путям всего документа, окна применяют его к своим файлам
+        self.contentMap.set_outline(FileOutline(), paths=[e.path for e in paged.outline])
+        self.setComputedFileSize(utf8_len(content))
+        with QSignalBlocker(self.pagedScrollBar):
+            self.pagedScrollBar.setRange(0, paged.lines - 1)
+        self.jumpToLine(paged.lines - 1)
+
+    def loadWindow(self, line: int) -> None:
+        """Загружает в документ окно страниц вокруг строки line виртуального документа."""
+        window = self.paged.window(line)
+        if window == self.pageWindow:
+            return
+        self.pageWindow = window
+        self.lineOffset = window.line
+        self.windowDocStart = self.searchCache.to_document(window.char)
+        self.syncingScroll = True
+        try:
+            self.setPlainText(self.paged.text(window))
+        finally:
+            self.syncingScroll = False
+        outline = FileOutline.from_files(self.paged.window_files(window))
+        self.contentMap.set_outline(outline, paths=self.contentMap.folded_blocks)
+        self.updateBlockVisibility()
+        self.updateSearchSelections()
+
+    def scrollToLine(self, line: int) -> None:
+        """Первая видимая строка — line виртуального документа (или документа без страниц)."""
+        if self.paged:
+            self.loadWindow(line)
+        block = self.document().findBlockByNumber(line - self.lineOffset)
+        self.verticalScrollBar().setValue(block.firstLineNumber())
+
+    def onPagedScroll(self, value: int) -> None:
+        if not self.syncingScroll:
+            self.scrollToLine(value)
+
+    def onWindowScroll(self, value: int) -> None:
+        """Прокрутка внутри окна: двигает виртуальную полосу и сдвигает окно при выходе со страницы."""
+        if not self.paged or self.syncingScroll:
+            return
+        line = self.firstVisibleBlock().blockNumber() + self.lineOffset
+        self.syncingScroll = True
+        try:
+            self.pagedScrollBar.setValue(line)
+        finally:
+            self.syncingScroll = False
+        if self.paged.window(line) != self.pageWindow:
+            self.scrollToLine(line)
+
+    def fileOutline(self) -> FileOutline:
+        return self.paged.outline if self.paged else self.contentMap.outline
+
+    def openFilePalette(self) -> None:
+        palette = FilePalette(self.fileOutline(), self)
+        palette.fileChosen.connect(self.jumpToFile)
+        palette.open()
+
+    def jumpToLine(self, line: int) -> None:
+        """Ставит курсор на строку виртуального документа и показывает её по центру."""
+        if self.paged:
+            self.loadWindow(line)
+        block = self.document().findBlockByNumber(line - self.lineOffset)
+        self.setTextCursor(QTextCursor(block))
+        self.centerCursor()
+
+    def jumpToFile(self, line: int) -> None:
+        """Ставит курсор на заголовок файла; заголовок виден и у свёрнутого файла."""
+        self.jumpToLine(line)
+        self.setFocus()
+
     def toggleFold(self, filename: str):
         """Асинхронно сворачивает/разворачивает блок, начинающийся с start_line."""
         self.contentMap.toggle_fold(filename)
@@ -259,20 +669,47 @@ class ContentEditor(QPlainTextEdit):
             while block != end_block:
                 block.setVisible(state)
                 block = block.next()
+        self.foldRevision += 1
         self.update()
         doc.markContentsDirty(0, doc.characterCount())
 
-    def iterate_visible_blocks(self, rect: QRect = None):
-        block = self.firstVisibleBlock()
-        block_number = block.blockNumber()
+    def visibleBlocks(self):
+        """(блок, номер, верх) видимых строк; считается один раз за кадр на все ленты."""
+        viewport = self.viewport()
+        first = self.firstVisibleBlock()
         offset = self.contentOffset()
-        top = self.blockBoundingGeometry(block).translated(offset).top()
-        while block.isValid() and (rect is None or top <= rect.bottom()):
-            if block.isVisible():
-                yield block, block_number, top
-            block = block.next()
-            block_number += 1
+        key = (
+            first.blockNumber(),
+            offset.y(),
+            viewport.width(),
+            viewport.height(),
+            self.document().revision(),
+            self.foldRevision,
+        )
+        if key != self.layoutKey:
+            self.layoutKey = key
+            self.visibleLayout = list(self.walkVisibleBlocks(first, offset, viewport.height()))
+        return self.visibleLayout
+
+    def walkVisibleBlocks(self, block, offset, bottom):
+        doc = self.document()
+        while block.isValid():
+            if not block.isVisible():
+                # тело свёрнутого файла пропускается целиком: сразу к закрывающей ограде
+                end = self.contentMap.folded_end(block.blockNumber())
+                block = doc.findBlockByNumber(end) if end is not None else block.next()
+                continue
             top = self.blockBoundingGeometry(block).translated(offset).top()
+            if top > bottom:
+                break
+            yield block, block.blockNumber(), top
+            block = block.next()
+
+    def iterate_visible_blocks(self, rect: QRect = None):
+        for item in self.visibleBlocks():
+            if rect is not None and item[2] > rect.bottom():
+                break
+            yield item
 
     # UI update and rendering methods
     def highlightCurrentLine(self) -> None:
@@ -282,51 +719,59 @@ class ContentEditor(QPlainTextEdit):
         selection.format.setProperty(QTextCharFormat.FullWidthSelection, True)
         selection.cursor = self.textCursor()
         selection.cursor.clearSelection()
-        self.setExtraSelections([selection])
+        self.setExtraSelections([selection, *self.searchSelections])
+        self.searchDensityArea.update()
 
 
 class ContentMap:
-    """Управление структурой документа: маппинг строк на файлы, границы файлов в номерах строк"""
+    """Управление структурой документа: оглавление файлов, границы файлов в номерах строк"""
 
     def __init__(self, document):
         self.document = document
-        self.fileLineMap: Dict[int, str] = {}
+        self.outline = FileOutline()
         self.fileStartLines: Dict[str, int] = {}
         self.fileEndLines: Dict[str, int] = {}
         self.folded_blocks: Dict[str, bool] = {}
 
-    @asyncSlot()
-    async def update_structure(self, content: str) -> None:
-        lines = content.splitlines()
-        current_file = None
-        line_number = 0
-        async for line in progress(lines, "Updating Structure"):
-            if line.startswith("```") and not line.endswith("```") and not current_file:
-                current_file = line.strip("`").strip()
-                self.fileStartLines[current_file] = line_number
-                self.fileLineMap[line_number] = current_file
-            elif line.startswith("```") and current_file:
-                self.fileLineMap[line_number] = current_file
-                self.fileEndLines[current_file] = line_number
-                current_file = None
-            elif current_file:
-                self.fileLineMap[line_number] = current_file
-            line_number += 1
-        await self.apply_folded_blocks()
-
-    async def apply_folded_blocks(self):
-        unique_files = set(self.fileLineMap.values())
-        async for filename in progress(unique_files, "Applying Folded Blocks"):
-            if filename not in self.folded_blocks:
-                self.folded_blocks[filename] = False
-
-    def set_file_line_map(self, mapping: Dict[int, str]) -> None:
-        """Устанавливает маппинг строк на файлы и обновляет список начальных строк."""
-        self.fileLineMap = mapping
+    def set_outline(self, outline: FileOutline, paths=None) -> None:
+        """Оглавление из выгрузки; состояние сворачивания сохраняется для тех же файлов.
+
+        paths — все файлы документа, если в outline только их часть (окно страниц).
+        """
+        self.outline = outline
+        self.fileStartLines = {entry.path: entry.start for entry in outline}
+        self.fileEndLines = {entry.path: entry.end for entry in outline}
+        self.folded_blocks = {
+            path: self.folded_blocks.get(path, False)
+            for path in (self.fileStartLines if paths is None else paths)
+        }
+
+    def append_file(self, path, body: str) -> None:
+        """Дописывает в оглавление следующий файл потоковой выгрузки."""
+        entry = self.outline.append(path, body)
+        self.fileStartLines[entry.path] = entry.start
+        self.fileEndLines[entry.path] = entry.end
+        self.folded_blocks.setdefault(entry.path, False)
+
+    def update_structure(self, content: str) -> None:
+        self.set_outline(FileOutline.from_text(content))
 
     def get_current_file(self, lineNumber: int) -> Optional[str]:
-        """Возвращает имя файла для указанной строки."""
-        return self.fileLineMap.get(lineNumber)
+        """Возвращает имя файла для указанной строки (бинарный поиск по оглавлению)."""
+        entry = self.outline.file_at(lineNumber)
+        return entry.path if entry else None
+
+    def file_starting_at(self, lineNumber: int) -> Optional[str]:
+        """Имя файла, если строка — его заголовок "```path"."""
+        entry = self.outline.starting_at(lineNumber)
+        return entry.path if entry else None
+
+    def folded_end(self, lineNumber: int) -> Optional[int]:
+        """Строка закрывающей ограды, если строка лежит в свёрнутом файле."""
+        entry = self.outline.file_at(lineNumber)
+        if entry and entry.start < lineNumber < entry.end and self.folded_blocks.get(entry.path):
+            return entry.end
+        return None
 
     def get_file_boundaries(self, filename: str):
         return (self.fileStartLines[filename], self.fileEndLines[filename])
@@ -1,14 +1,15 @@
 # .side_suction/ui/ui_builder.py
 
-import json
+from functools import lru_cache
 
-from config.icons import CHKT, CNFG, COPY, FIND, LOAD, READ, SAVE
+from config.icons import CHKF, CHKT, CNFG, COPY, FIND, LOAD, READ, SAVE
 from config.settings import settings
 from PySide6.QtCore import QRect, Qt
 from PySide6.QtGui import QPainter
 from PySide6.QtWidgets import (
     QComboBox,
     QCompleter,
+    QDialog,
     QHBoxLayout,
     QLabel,
     QLineEdit,
@@ -22,11 +23,19 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
+from qasync import asyncSlot
 from ui.content_editor import ContentEditor
 
 LABEL_HEIGHT = 26
 
 
+@lru_cache(maxsize=None)
+def load_stylesheet(path):
+    """Читает styles.qss один раз за процесс."""
+    with open(path, "r") as file:
+        return file.read()
+
+
 class CustomProgressBar(QProgressBar):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -77,6 +86,21 @@ class CustomProgressBar(QProgressBar):
         style.drawControl(QStyle.CE_ProgressBarContents, opt, painter, self)
 
 
+class GrepResultsDialog(QDialog):
+    """Совпадения поиска по сохранённым выборкам; строки добавляются по мере поиска."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search Projects")
+        self.resize(parent.width() * 2 // 3 if parent else 800, 480)
+        layout = QVBoxLayout(self)
+        self.statusLabel = QLabel()
+        self.resultsList = QListWidget()
+        self.resultsList.setUniformItemSizes(True)  # десятки тысяч строк без пересчёта высот
+        layout.addWidget(self.statusLabel)
+        layout.addWidget(self.resultsList)
+
+
 class BrowserPanel:
     def init_browser_panel(self):
         self.browserPanel = QWidget()
@@ -128,6 +152,9 @@ class BrowserPanel:
             (f"{SAVE} Save Selection", "saveSelectionButton"),
             (f"{LOAD} Load Selection", "loadSelectionButton"),
             (f"{READ} Extract Content", "extractContentButton"),
+            (f"{CHKT} Select Closure", "selectClosureButton"),
+            (f"{READ} Extract Changes", "extractChangesButton"),
+            (f"{CHKT} Outline Only", "outlineModeButton"),
         ]
         controls_layout = QHBoxLayout()
         for ctrl_text, ctrl_name in controls_config:
@@ -135,6 +162,12 @@ class BrowserPanel:
             setattr(self, ctrl_name, control)
             controls_layout.addWidget(control, stretch=1)
         self.toggleSelectionButton.setCheckable(True)
+        self.selectClosureButton.setToolTip("Add every project file the selection imports")
+        self.outlineModeButton.setCheckable(True)
+        if settings.outlineMode:
+            self.outlineModeButton.setChecked(True)
+            self.outlineModeButton.setText(f"{CHKF} Full Bodies")
+        self.outlineModeButton.setToolTip("Extract signatures and docstrings instead of bodies")
         self.browserPanelLayout.addLayout(controls_layout)
 
 
@@ -151,8 +184,23 @@ class ContentPanel:
         search_layout = QHBoxLayout()
         self.searchLineEdit = QLineEdit()
         self.searchButton = QPushButton(f"{FIND} Search Text ")
+        self.searchCountLabel = QLabel()
         search_layout.addWidget(self.searchLineEdit, 1)
+        search_layout.addWidget(self.searchCountLabel)
+        options_config = [
+            ("Aa", "Match Case", "searchCaseButton"),
+            ("ab", "Whole Word", "searchWordButton"),
+            (".*", "Regular Expression", "searchRegexButton"),
+        ]
+        for opt_text, opt_tip, opt_name in options_config:
+            option = QPushButton(opt_text)
+            option.setCheckable(True)
+            option.setToolTip(opt_tip)
+            setattr(self, opt_name, option)
+            search_layout.addWidget(option)
         search_layout.addWidget(self.searchButton)
+        self.searchProjectsButton = QPushButton(f"{FIND} Search Projects ")
+        search_layout.addWidget(self.searchProjectsButton)
         self.contentPanelLayout.addLayout(search_layout)
 
     def addContentEditorLayout(self):
@@ -163,8 +211,10 @@ class ContentPanel:
         """Создает секцию контролов редактора"""
         controls_config = [
             (f"{CHKT} Fold All", None, "toggleFoldingButton", QPushButton),
+            (f"{CHKT} Minified View", None, "toggleMinifiedButton", QPushButton),
             (None, settings.allFontNames, "fontNameComboBox", QComboBox),
             (None, settings.allFontSizes, "fontSizeComboBox", QComboBox),
+            (f"{SAVE} Export Content", None, "exportContentButton", QPushButton),
             (f"{COPY} Copy Content", None, "copyContentButton", QPushButton),
         ]
         controls_layout = QHBoxLayout()
@@ -175,6 +225,7 @@ class ContentPanel:
                 control.addItems(ctrl_items)
             controls_layout.addWidget(control)
         self.toggleFoldingButton.setCheckable(True)
+        self.toggleMinifiedButton.setCheckable(True)
         self.fontSizeComboBox.setCurrentText(str(settings.defaultFontSize))
         self.contentPanelLayout.addLayout(controls_layout)
 
@@ -201,27 +252,32 @@ class UIBuilder(BrowserPanel, ContentPanel):
         self.applyStylesheet()
 
     def setProjectsAutoComplete(self):
+        """Создаёт пустой completer; проекты подгружаются после показа окна."""
         projectCompleter = QCompleter([], self)
-        if settings.databasePath.exists():
-            with open(settings.databasePath, "r", encoding="utf-8") as f:
-                content = f.read()
-                all_selections = json.loads(content) if content else {}
-            projects = list(all_selections.keys())
-            projectCompleter = QCompleter(projects, self)
-            projectCompleter.setCaseSensitivity(Qt.CaseInsensitive)
-            projectCompleter.setFilterMode(Qt.MatchContains)
-            projectCompleter.setCompletionMode(QCompleter.PopupCompletion)
-            model = projectCompleter.popup().model()
-            if model.rowCount() > 0:
-                index = model.index(0, 0)
-                projectCompleter.popup().setCurrentIndex(index)
+        projectCompleter.setCaseSensitivity(Qt.CaseInsensitive)
+        projectCompleter.setFilterMode(Qt.MatchContains)
+        projectCompleter.setCompletionMode(QCompleter.PopupCompletion)
         self.projectPathLineEdit.setCompleter(projectCompleter)
         self.projectCompleter = projectCompleter
 
+    @asyncSlot()
+    async def loadProjectsAutoComplete(self):
+        """Асинхронно заполняет completer проектами из базы выборок."""
+        self.saved_projects = await self.selection_manager.listProjects()
+        self.projectCompleter.model().setStringList(self.saved_projects)
+        model = self.projectCompleter.popup().model()
+        if model.rowCount() > 0:
+            index = model.index(0, 0)
+            self.projectCompleter.popup().setCurrentIndex(index)
+
     def applyStylesheet(self):
-        path_to_stylesheet = settings.stylesheetPath
-        with open(path_to_stylesheet, "r") as file:
-            styles = file.read()
-            self.setStyleSheet(styles)
-            self.projectPathLineEdit.completer().popup().setStyleSheet(styles)
-            self.contentEditor.verticalScrollBar().setStyleSheet(styles)
+        styles = load_stylesheet(settings.stylesheetPath)
+        targets = (
+            self,
+            self.projectCompleter.popup(),
+            self.contentEditor.verticalScrollBar(),
+        )
+        for widget in targets:
+            # Повторная установка того же текста заставляет Qt заново разбирать стили
+            if widget.styleSheet() != styles:
+                widget.setStyleSheet(styles)
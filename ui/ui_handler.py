@@ -1,23 +1,36 @@
 # .side_suction/ui/ui_handler.py
 
+import asyncio
+import re
+from contextlib import aclosing
 from pathlib import Path
 
 from config.colors import Colors
 from config.icons import CHKF, CHKT
 from config.settings import settings
+from logic.exporter import export_to_clipboard, export_to_file, iter_chunks
+from logic.project_grep import grep_selections
 from logic.project_manager import ProjectManager
-from logic.project_source import GitHubSource, LocalSource
+from logic.project_source import LocalSource, parse_source_spec
+from logic.search_cache import SearchQuery
 from logic.status_manager import progress, report_result
-from PySide6.QtCore import QSignalBlocker, Qt
-from PySide6.QtGui import QColor, QTextCursor
-from PySide6.QtWidgets import QApplication, QFileDialog, QListWidgetItem, QTextEdit
+from PySide6.QtCore import QSignalBlocker, Qt, QTimer
+from PySide6.QtWidgets import QApplication, QFileDialog, QListWidgetItem
 from qasync import asyncSlot
+from ui.ui_builder import GrepResultsDialog
+
+SEARCH_DEBOUNCE_MS = 250
 
 
 class UIHandler:
     def init_ui_handler(self):
         self.fontSize = settings.defaultFontSize
         self.fontName = settings.defaultFontName
+        # поиск по мере ввода запускается после паузы в наборе
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.searchTimer.timeout.connect(self.searchAsYouType)
         self.connectSignals()
 
     def connectSignals(self):
@@ -31,31 +44,25 @@ class UIHandler:
         self.saveSelectionButton.clicked.connect(self.saveSelection)
         self.loadSelectionButton.clicked.connect(self.loadSelection)
         self.extractContentButton.clicked.connect(self.extractContent)
+        self.extractChangesButton.clicked.connect(self.extractChanges)
+        self.outlineModeButton.toggled.connect(self.toggleOutlineMode)
+        self.selectClosureButton.clicked.connect(self.selectClosure)
         self.toggleSelectionButton.clicked.connect(self.toggleSelection)
         self.toggleFoldingButton.toggled.connect(self.toggleFolding)
         self.copyContentButton.clicked.connect(self.copyContent)
+        self.exportContentButton.clicked.connect(self.exportContent)
+        self.toggleMinifiedButton.toggled.connect(self.toggleMinifiedView)
         self.searchButton.clicked.connect(self.searchInCode)
         self.searchLineEdit.returnPressed.connect(self.searchInCode)
+        self.searchProjectsButton.clicked.connect(self.searchProjects)
+        self.searchLineEdit.textChanged.connect(lambda _: self.searchTimer.start())
+        for option in (self.searchCaseButton, self.searchWordButton, self.searchRegexButton):
+            option.toggled.connect(lambda _: self.searchTimer.start())
         self.fontNameComboBox.activated.connect(self.updateFontName)
         self.fontSizeComboBox.currentIndexChanged.connect(self.updateFontSize)
 
     def _parse_source_spec(self, spec: str):
-        # 1) Локальная папка
-        if Path(spec).is_dir():
-            return LocalSource(spec)
-
-        # 2) owner/repo[#branch]
-        if "/" in spec and not spec.startswith("http"):
-            owner_repo, _, branch = spec.partition("#")
-            owner, _, repo = owner_repo.partition("/")
-            return GitHubSource(owner, repo, branch or "main")
-
-        # 3) GitHub API URL
-        if spec.startswith("https://api.github.com/"):
-            # Предполагаем, что есть конструктор from_tree_url
-            return GitHubSource.from_tree_url(spec)
-
-        return None
+        return parse_source_spec(spec)
 
     @asyncSlot()
     async def _init_and_scan(self, source):
@@ -69,7 +76,10 @@ class UIHandler:
 
         self.projectSrc = source
         self.projectPath = str(source)
+        if getattr(self, "project_manager", None) is not None:
+            self.project_manager.cancel_import_graph()
         self.project_manager = ProjectManager(source)
+        self.project_manager.graphUpdated.connect(self.onImportGraphUpdated)
 
         # Сбрасываем UI
         self.resetSelections()
@@ -85,6 +95,8 @@ class UIHandler:
             report_result(str(e), "Scan Error", Levels.FAIL)
             return
         await self.updateUIWithData(data)
+        # граф импортов для "Select Closure" строится, пока выбираются файлы
+        self.project_manager.start_import_graph()
 
     @asyncSlot()
     async def onSourceDialog(self):
@@ -145,6 +157,7 @@ class UIHandler:
         data = await self.project_manager.scan_project()
         self.projectPathLineEdit.setText(self.projectPath)
         await self.updateUIWithData(data)
+        self.project_manager.start_import_graph()
         report_result()
 
     async def updateUIWithData(self, data):
@@ -268,61 +281,182 @@ class UIHandler:
         if not self.selectedFilePaths:
             report_result("Select a File", "File Error")
             return
+        items = self.project_manager.get_selected_items(self.selectedFilePaths)
+        await self.showExtraction(self.project_manager.iter_content(items))
+        # основа для следующего "Extract Changes"
+        await self.project_manager.record_manifest()
+        report_result()
+
+    @asyncSlot()
+    async def extractChanges(self):
+        """Только файлы, изменённые с прошлой выгрузки проекта (unified diff или целиком)."""
+        if not self.selectedFilePaths:
+            report_result("Select a File", "File Error")
+            return
+        items = self.project_manager.get_selected_items(self.selectedFilePaths)
+        await self.showExtraction(self.project_manager.iter_changes(items))
+        report_result()
+
+    async def showExtraction(self, pieces):
+        """Выводит куски выгрузки в редактор по мере их поступления."""
+        with QSignalBlocker(self.toggleMinifiedButton):
+            self.toggleMinifiedButton.setChecked(False)
+            self.toggleMinifiedButton.setText(f"{CHKT} Minified View")
         self.isContentMinified = False
-        # Подбираем из self.project_manager.filteredFiles только те rel, которые юзер выбрал
-        items: list[tuple[Path, str]] = []
-        for rel, ref in self.project_manager.filteredFiles:
-            if str(rel) in self.selectedFilePaths:
-                items.append((rel, ref))
-        content = await self.project_manager.extract_content(items)
-        self.contentEditor.setContent(content)
+        self.rawContent = ""
+        # куски появляются в редакторе по мере чтения, а не после всей выгрузки
+        self.contentEditor.beginContent()
+        chunks = []
+        async for piece in pieces:
+            chunks.append(piece)
+            # кусок — "```path\nтело\n```"
+            path, body = piece[3:-4].split("\n", 1)
+            await self.contentEditor.appendContent(path, body, piece)
+        self.rawContent = "\n".join(chunks)
+        await self.contentEditor.finishContent(
+            self.rawContent, self.project_manager.extractedFiles
+        )
+        # минифицированный вариант готовится в фоне, к копированию он уже в кэше
+        self.project_manager.start_minify()
+
+    async def exportChunks(self, minified):
+        """Куски для экспорта: выгрузка из ProjectManager или правленый текст редактора."""
+        if self.contentEditor.document().isModified() or not self.rawContent:
+            # правки в редакторе важнее кэша выгрузки
+            return [self.contentEditor.toPlainText()], minified
+        files = await self.project_manager.export_files(minified)
+        return iter_chunks(files), False
+
+    @asyncSlot()
+    async def copyContent(self):
+        chunks, minify = await self.exportChunks(minified=True)
+        export_to_clipboard(chunks, QApplication.clipboard(), minify)
+        self.setHighlightColor(Colors.INFO)
+
+    @asyncSlot()
+    async def exportContent(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Content", "", "Markdown (*.md);;All Files (*)"
+        )
+        if not path:
+            return
+        chunks, minify = await self.exportChunks(self.isContentMinified)
+        try:
+            await asyncio.to_thread(export_to_file, chunks, path, minify)
+        except OSError as e:
+            report_result(str(e), "Export Error", 0)
+            return
         report_result()
 
-    def copyContent(self):
-        if not self.isContentMinified:
-            self.isContentMinified = True
-            content = self.project_manager.minify_content(
-                self.contentEditor.toPlainText()
-            )
-            self.contentEditor.setContent(content)
-            self.setHighlightColor(Colors.INFO)
-        textToCopy = self.contentEditor.toPlainText()
-        clipboard = QApplication.clipboard()
-        clipboard.clear()
-        clipboard.setText(textToCopy)
+    @asyncSlot()
+    async def toggleMinifiedView(self, checked):
+        """Переключает редактор между сырой и минифицированной выгрузкой из кэша."""
+        if checked:
+            content = await self.project_manager.get_minified_content()
+            self.toggleMinifiedButton.setText(f"{CHKF} Raw View")
+        else:
+            content = self.rawContent
+            self.toggleMinifiedButton.setText(f"{CHKT} Minified View")
+        self.isContentMinified = checked
+        outline = self.project_manager.build_outline(minified=checked)
+        files = await self.project_manager.export_files(minified=checked)
+        self.contentEditor.setContent(content, outline, files)
+
+    def searchQuery(self) -> SearchQuery:
+        return SearchQuery(
+            self.searchLineEdit.text(),
+            regex=self.searchRegexButton.isChecked(),
+            case=self.searchCaseButton.isChecked(),
+            word=self.searchWordButton.isChecked(),
+        )
+
+    @asyncSlot()
+    async def searchAsYouType(self):
+        """Подсветка и счётчик по мере ввода; совпадения ищутся в фоновом потоке."""
+        query = self.searchQuery()
+        cache = self.contentEditor.searchCache
+        if not query.pattern:
+            self.contentEditor.setSearchMatches()
+            self.searchCountLabel.clear()
+            return
+        try:
+            matches = await asyncio.to_thread(cache.find_all, query)
+        except re.error:
+            self.searchCountLabel.setText("Invalid pattern")
+            return
+        if query != self.searchQuery() or cache is not self.contentEditor.searchCache:
+            return  # пока искали, запрос или текст уже сменились
+        self.contentEditor.setSearchMatches(cache, matches)
+        self.searchCountLabel.setText(f"{len(matches):,} matches" if matches else "No results")
 
     def searchInCode(self):
-        searchTerm = self.searchLineEdit.text()
-        if not searchTerm:
+        """Переходит к следующему совпадению: позиции берутся из кэша совпадений, документ не сканируется."""
+        self.searchTimer.stop()
+        query = self.searchQuery()
+        if not query.pattern:
             report_result("Enter a valid search term", "Input Error", 0)
             return
-        self.contentEditor.setExtraSelections([])
-        self.contentEditor.moveCursor(QTextCursor.Start)
-        extraSelections = []
-        matches = []
-        while self.contentEditor.find(searchTerm):
-            cursor = self.contentEditor.textCursor()
-            selection = QTextEdit.ExtraSelection()
-            selection.format.setBackground(QColor("#ffaa00"))
-            selection.format.setForeground(QColor("#000000"))
-            selection.cursor = cursor
-            extraSelections.append(selection)
-            matches.append(cursor.blockNumber())
-        if matches:
-            if not hasattr(self, "currentMatchIndex"):
-                self.currentMatchIndex = 0
-            else:
-                self.currentMatchIndex = (self.currentMatchIndex + 1) % len(matches)
-            match_block = self.contentEditor.document().findBlockByNumber(
-                matches[self.currentMatchIndex]
-            )
-            cursor = QTextCursor(match_block)
-            self.contentEditor.setTextCursor(cursor)
-            self.contentEditor.ensureCursorVisible()
-            self.setHighlightColor(Colors.INFO)
-        else:
+        cache = self.contentEditor.searchCache
+        try:
+            matches = cache.find_all(query)
+        except re.error as e:
+            report_result(f"Invalid regular expression: {e}", "Input Error", 0)
+            return
+        if not matches:
+            self.contentEditor.setSearchMatches()
+            self.searchCountLabel.setText("No results")
             report_result("Nothing found for this search term", "Empty Result", 1)
-        self.contentEditor.setExtraSelections(extraSelections)
+            return
+        cursor = self.contentEditor.textCursor()
+        self.currentMatchIndex = matches.next_index(
+            self.contentEditor.textPosition(cursor.selectionStart())
+        )
+        self.contentEditor.selectText(*matches[self.currentMatchIndex])
+        self.contentEditor.setSearchMatches(cache, matches)
+        self.searchCountLabel.setText(f"{self.currentMatchIndex + 1:,} of {len(matches):,}")
+        self.setHighlightColor(Colors.INFO)
+
+    @asyncSlot()
+    async def searchProjects(self):
+        """Ищет запрос во всех сохранённых выборках, не выгружая их в редактор."""
+        query = self.searchQuery()
+        if not query.pattern:
+            report_result("Enter a valid search term", "Input Error", 0)
+            return
+        try:
+            query.compile()
+        except re.error as e:
+            report_result(f"Invalid regular expression: {e}", "Input Error", 0)
+            return
+        selections = await self.selection_manager.loadSelections()
+        dialog = GrepResultsDialog(self)
+        dialog.resultsList.itemDoubleClicked.connect(self.openGrepResult)
+        dialog.show()
+        found, label = 0, f"Searching {len(selections)} projects"
+        dialog.statusLabel.setText(label)
+        errors = []  # недоступные проекты — в строке состояния окна, а не окном на каждый
+        async with aclosing(grep_selections(selections, query, errors=errors)) as hits:
+            async for hit in hits:
+                if not dialog.isVisible():
+                    return  # окно закрыто — поиск прекращается
+                item = QListWidgetItem(hit.format())
+                item.setData(Qt.UserRole + 1, hit.project)
+                dialog.resultsList.addItem(item)
+                found += 1
+                if found % 100 == 0:
+                    dialog.statusLabel.setText(f"{label} | {found:,} matches")
+        status = f"{found:,} matches in {len(selections)} projects"
+        if errors:
+            status += f" | {len(errors)} failed: {', '.join(name for name, _ in errors)}"
+            dialog.statusLabel.setToolTip(
+                "\n".join(f"{name}: {message}" for name, message in errors)
+            )
+        dialog.statusLabel.setText(status)
+
+    def openGrepResult(self, item):
+        """Открывает проект найденной строки так же, как ввод пути вручную."""
+        self.projectPathLineEdit.setText(item.data(Qt.UserRole + 1))
+        self.onSourceInput()
 
     # Управление выборкой файлов
     def toggleSelection(self, checked):
@@ -341,6 +475,39 @@ class UIHandler:
             self.contentEditor.unfoldAll()
             self.toggleFoldingButton.setText(f"{CHKT} Fold All")
 
+    def onImportGraphUpdated(self, status):
+        """Фоновая сборка графа показывается в подсказке кнопки, а не в общей шкале."""
+        self.selectClosureButton.setToolTip(
+            f"Add every project file the selection imports\n{status}"
+        )
+
+    @asyncSlot()
+    async def selectClosure(self):
+        """Добавляет к выборке всё, что выбранные файлы импортируют (транзитивно)."""
+        if not self.selectedFilePaths:
+            report_result("Select a File", "File Error")
+            return
+        closure = await self.project_manager.import_closure(self.selectedFilePaths)
+        added = [str(rel) for rel, _ in closure if str(rel) not in self.selectedFilePaths]
+        self.selectedFilePaths.extend(added)
+        wanted = set(added)
+        with QSignalBlocker(self.fileListWidget):
+            for i in range(self.fileListWidget.count()):
+                item = self.fileListWidget.item(i)
+                if item.data(Qt.UserRole + 1) in wanted:
+                    item.setSelected(True)
+        self.updateLabels()
+        self.refreshIndexedFileList()
+        report_result()
+
+    def toggleOutlineMode(self, checked):
+        """Следующие выгрузки — сигнатуры и docstring вместо тел (settings.outlineMode)."""
+        settings.outlineMode = checked
+        if checked:
+            self.outlineModeButton.setText(f"{CHKF} Full Bodies")
+        else:
+            self.outlineModeButton.setText(f"{CHKT} Outline Only")
+
     def resetSelections(self):
         with (
             QSignalBlocker(self.dirListWidget),